@@ -0,0 +1,289 @@
+"""A local stand-in for the TWS API used by the benchmarks."""
+
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union, cast
+from urllib.parse import parse_qs, urlsplit
+
+PUBLIC_KEY = (
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9."
+    "eyJyb2xlIjoiYW5vbiIsImlhdCI6MTczMzc3MDg4OCwiZXhwIjoyMDQ5MzAzNjg4fQ."
+    "geVaN_7Yg1tTj2UjibuSpV1_qTzyEjoBXoVR01X0s_M"
+)
+SECRET_KEY = "123e4567-e89b-4d3c-8456-426614174000"
+USER_ID = "benchmark-user"
+RESUMABLE_UPLOAD_PATH = "/storage/v1/upload/resumable"
+
+
+class Distribution:
+    """A distribution of durations in seconds, sampled by the server.
+
+    Parsed from a specification, so it can be given on the command line:
+
+    - "0.05": always 0.05 seconds
+    - "uniform:0.01,0.1": uniformly between 0.01 and 0.1 seconds
+    - "exponential:0.05": exponentially with a mean of 0.05 seconds
+    - "lognormal:0.05,0.5": log-normally with a median of 0.05 seconds and a
+      shape of 0.5, which gives a long tail
+    """
+
+    KINDS = ("fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(self, kind: str, *params: float, seed: Optional[int] = None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown distribution: {kind}")
+        expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}[kind]
+        if len(params) != expected or any(param < 0 for param in params):
+            raise ValueError(
+                f"A {kind} distribution takes {expected} non-negative parameters"
+            )
+        self.kind = kind
+        self.params = params
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: Union[str, int, float]) -> "Distribution":
+        if isinstance(spec, (int, float)):
+            return cls("fixed", float(spec))
+        kind, _, params = spec.partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        return cls(kind, *(float(param) for param in params.split(",")))
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._rng.uniform(*self.params)
+        if self.kind == "exponential":
+            mean = self.params[0]
+            return self._rng.expovariate(1 / mean) if mean else 0.0
+        median, shape = self.params
+        return self._rng.lognormvariate(math.log(median), shape) if median else 0.0
+
+    def __str__(self) -> str:
+        if self.kind == "fixed":
+            return f"{self.params[0]:g}"
+        return f"{self.kind}:{','.join(f'{param:g}' for param in self.params)}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep connections open between requests, so clients can reuse them. Each
+    # response is sent in a single write without Nagle's algorithm, otherwise
+    # every request on a kept-alive connection waits for a delayed ACK.
+    protocol_version = "HTTP/1.1"
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    @property
+    def api(self) -> "FakeTWSServer":
+        return cast(FakeTWSServer, self.server)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.api.delay()
+        url = urlsplit(self.path)
+        if url.path == "/rest/v1/users_private":
+            self._send_json([{"user_id": USER_ID}])
+        elif url.path == "/rest/v1/workflow_instances":
+            query = parse_qs(url.query)
+            instance_ids = _instance_ids(query.get("id", [""])[0])
+            self._send_json(self.api.instances(instance_ids))
+        else:
+            self._send_json({"message": "Not found"}, status=404)
+
+    def do_OPTIONS(self) -> None:
+        self.api.delay()
+        self._send_tus(204, {"Tus-Extension": "creation,concatenation"})
+
+    def do_HEAD(self) -> None:
+        self.api.delay()
+        offset = self.api.upload_offset(self._upload_id())
+        if offset is None:
+            self._send_tus(404)
+        else:
+            self._send_tus(200, {"Upload-Offset": str(offset)})
+
+    def do_PATCH(self) -> None:
+        self.api.delay()
+        upload_id = self._upload_id()
+        offset = self.api.upload_offset(upload_id)
+        if offset is None or offset != int(self.headers.get("Upload-Offset", -1)):
+            self._read_body()
+            self._send_tus(404 if offset is None else 409)
+            return
+        offset = self.api.receive_part(upload_id, self._read_body())
+        self._send_tus(204, {"Upload-Offset": str(offset)})
+
+    def do_POST(self) -> None:
+        self.api.delay()
+        path = urlsplit(self.path).path
+        if path == "/rest/v1/rpc/start_workflow":
+            self._read_body()
+            workflow_instance_id = self.api.start_workflow()
+            self._send_json({"workflow_instance_id": workflow_instance_id})
+            return
+
+        if path == RESUMABLE_UPLOAD_PATH:
+            # Partial and final uploads alike, the parts of a final upload are
+            # not joined as their data is not kept
+            self._read_body()
+            upload_id = self.api.create_upload()
+            self._send_tus(201, {"Location": f"{RESUMABLE_UPLOAD_PATH}/{upload_id}"})
+            return
+
+        prefix = "/storage/v1/object/"
+        if not path.startswith(prefix):
+            self._read_body()
+            self._send_json({"message": "Not found"}, status=404)
+            return
+
+        self.api.bytes_received += self._read_body()
+        self._send_json({"Key": path[len(prefix) :]})
+
+    def _upload_id(self) -> str:
+        return urlsplit(self.path).path.rsplit("/", 1)[1]
+
+    def _read_body(self) -> int:
+        # Discard the body as it arrives so the server's memory use stays flat
+        remaining = int(self.headers.get("Content-Length", 0))
+        received = 0
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            received += len(chunk)
+        return received
+
+    def _send_json(self, body, status: int = 200) -> None:
+        encoded = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _send_tus(self, status: int, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Tus-Resumable", "1.0.0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class FakeTWSServer(ThreadingHTTPServer):
+    """Serves the endpoints used to run workflows on localhost.
+
+    These are the user lookup, storage uploads, `rpc/start_workflow` and
+    `workflow_instances`. Every started workflow completes after a time drawn
+    from `completion_time`, and is reported as running until then. Large files
+    are uploaded to the resumable upload endpoint, which supports the creation
+    and concatenation extensions of the tus protocol and, like the other
+    storage endpoint, only counts the bytes it receives.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        latency: Union[float, str, Distribution] = 0,
+        completion_time: Union[float, str, Distribution] = 0,
+    ):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        # Time in seconds the server takes to answer a request
+        self.latency = _distribution(latency)
+        # Time in seconds a started workflow takes to complete
+        self.completion_time = _distribution(completion_time)
+        self.bytes_received = 0
+        self._completes_at: Dict[str, float] = {}
+        self._instance_ids = itertools.count(1)
+        # Number of bytes received by each resumable upload
+        self._upload_offsets: Dict[str, int] = {}
+        self._upload_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def delay(self) -> None:
+        latency = self.latency.sample()
+        if latency:
+            time.sleep(latency)
+
+    def start_workflow(self) -> str:
+        completes_at = time.monotonic() + self.completion_time.sample()
+        with self._lock:
+            workflow_instance_id = f"instance-{next(self._instance_ids)}"
+            self._completes_at[workflow_instance_id] = completes_at
+        return workflow_instance_id
+
+    def create_upload(self) -> str:
+        with self._lock:
+            upload_id = f"upload-{next(self._upload_ids)}"
+            self._upload_offsets[upload_id] = 0
+        return upload_id
+
+    def upload_offset(self, upload_id: str) -> Optional[int]:
+        with self._lock:
+            return self._upload_offsets.get(upload_id)
+
+    def receive_part(self, upload_id: str, size: int) -> int:
+        with self._lock:
+            self.bytes_received += size
+            self._upload_offsets[upload_id] += size
+            return self._upload_offsets[upload_id]
+
+    def instances(self, instance_ids: List[str]) -> List[dict]:
+        now = time.monotonic()
+        with self._lock:
+            found = [
+                (instance_id, self._completes_at[instance_id])
+                for instance_id in instance_ids
+                if instance_id in self._completes_at
+            ]
+        return [
+            {"id": instance_id, "status": "COMPLETED", "result": {"ok": True}}
+            if completes_at <= now
+            else {"id": instance_id, "status": "RUNNING", "result": None}
+            for instance_id, completes_at in found
+        ]
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeTWSServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def _distribution(value: Union[float, str, Distribution]) -> Distribution:
+    return value if isinstance(value, Distribution) else Distribution.parse(value)
+
+
+def _instance_ids(condition: str) -> List[str]:
+    """Parse the instance IDs of an `eq.<id>` or `in.(<id>,...)` filter."""
+    operator, _, value = condition.partition(".")
+    if operator == "eq":
+        return [value]
+    if operator == "in":
+        return [
+            instance_id for instance_id in value.strip("()").split(",") if instance_id
+        ]
+    return []
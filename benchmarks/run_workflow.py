@@ -0,0 +1,270 @@
+"""Measure the throughput and latency of `AsyncClient.run_workflow`.
+
+Runs workflows against a local stand-in server at each combination of
+concurrency, input file size and polling policy, and reports the completed
+runs per second, the 50th, 95th and 99th percentile run latency, the status
+polls per run and the number of runs that failed. The server answers every
+request after a latency drawn from `--latency`, and completes each workflow
+after a time drawn from `--completion-time`, see `fake_server.Distribution`
+for the accepted specifications.
+
+Results can be written to a JSON file with `--output`, and compared against an
+earlier results file with `--baseline`. Scenarios whose throughput dropped or
+whose 95th percentile latency grew by more than `--tolerance` are reported as
+regressions, and make the benchmark exit with status 1.
+
+Usage, with the package installed (`poetry install`):
+    python benchmarks/run_workflow.py [--runs 50] [--concurrency 1 16 64]
+        [--sizes 0 64 4096] [--policies fixed backoff learned batched]
+        [--output results.json] [--baseline previous.json]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from fake_server import PUBLIC_KEY, SECRET_KEY, Distribution, FakeTWSServer
+from tws import (
+    AsyncClient,
+    ClientException,
+    ExponentialBackoff,
+    FixedDelay,
+    LearnedPolling,
+    PollingPolicy,
+)
+
+KIB = 1024
+WORKFLOW_DEFINITION_ID = "benchmark-workflow"
+
+# Polling policies by name, with whether status polls are batched. Policies
+# are created anew for each scenario, so learned latencies do not carry over.
+POLICIES: Dict[str, Tuple[Callable[[], PollingPolicy], bool]] = {
+    "fixed": (lambda: FixedDelay(0.1), False),
+    "backoff": (lambda: ExponentialBackoff(initial_delay=0.05, min_delay=0.05), False),
+    "learned": (lambda: LearnedPolling(min_samples=5), False),
+    "batched": (lambda: ExponentialBackoff(initial_delay=0.05, min_delay=0.05), True),
+}
+
+# Fields identifying a scenario, when comparing results
+SCENARIO = ("concurrency", "size_kib", "policy")
+
+
+def _percentile(values: Sequence[float], percentile: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _run_scenario(
+    api_url: str, runs: int, concurrency: int, path: Optional[str], policy: str
+) -> dict:
+    create_policy, batch_polling = POLICIES[policy]
+    polling_policy = create_policy()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    polls: List[int] = []
+    failures = 0
+
+    async def run(client: AsyncClient) -> None:
+        nonlocal failures
+        async with semaphore:
+            try:
+                _, report = await client.run_workflow(
+                    WORKFLOW_DEFINITION_ID,
+                    {},
+                    timeout=60,
+                    files={"file": path} if path is not None else None,
+                    polling_policy=polling_policy,
+                    return_report=True,
+                )
+            except ClientException:
+                failures += 1
+                return
+            latencies.append(report.total_seconds)
+            polls.append(report.polls)
+
+    async with AsyncClient(
+        PUBLIC_KEY,
+        SECRET_KEY,
+        api_url,
+        batch_polling=batch_polling,
+        batch_polling_window=0.05,
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(run(client) for _ in range(runs)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "runs": runs,
+        "failures": failures,
+        "runs_per_second": len(latencies) / elapsed,
+        "p50_seconds": _percentile(latencies, 50),
+        "p95_seconds": _percentile(latencies, 95),
+        "p99_seconds": _percentile(latencies, 99),
+        "polls_per_run": sum(polls) / len(polls) if polls else None,
+    }
+
+
+def _serve(latency: str, completion_time: str, urls: "multiprocessing.Queue[str]"):
+    with FakeTWSServer(latency=latency, completion_time=completion_time) as server:
+        urls.put(server.api_url)
+        # Serve until the benchmark terminates the process
+        while True:
+            time.sleep(60)
+
+
+def _create_file(directory: str, size_kib: int) -> str:
+    path = os.path.join(directory, f"input-{size_kib}kib.bin")
+    with open(path, "wb") as f:
+        f.write(os.urandom(size_kib * KIB))
+    return path
+
+
+def _compare(results: List[dict], baseline: dict, tolerance: float) -> int:
+    """Print the change of each scenario against the baseline.
+
+    Returns:
+        The number of scenarios that regressed by more than the tolerance
+    """
+    previous = {
+        tuple(result[key] for key in SCENARIO): result for result in baseline["results"]
+    }
+    regressions = 0
+    print()
+    print(
+        f"{'concurrency':>11} {'size':>9} {'policy':>8} "
+        f"{'runs/s':>8} {'p95':>8}  compared to the baseline"
+    )
+    for result in results:
+        before = previous.get(tuple(result[key] for key in SCENARIO))
+        if before is None or not before["runs_per_second"] or not result["p95_seconds"]:
+            continue
+        throughput = result["runs_per_second"] / before["runs_per_second"] - 1
+        latency = result["p95_seconds"] / before["p95_seconds"] - 1
+        regressed = throughput < -tolerance or latency > tolerance
+        regressions += regressed
+        print(
+            f"{result['concurrency']:>11} {result['size_kib']:>5} KiB "
+            f"{result['policy']:>8} {throughput:>+8.1%} {latency:>+8.1%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--runs", type=int, default=50, help="runs per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[0, 64, 4096],
+        help="input file sizes in KiB, 0 for runs without a file",
+    )
+    parser.add_argument(
+        "--policies", nargs="+", choices=list(POLICIES), default=list(POLICIES)
+    )
+    parser.add_argument(
+        "--latency", default="0.005", help="server latency distribution in seconds"
+    )
+    parser.add_argument(
+        "--completion-time",
+        default="uniform:0.1,0.3",
+        help="workflow completion time distribution in seconds",
+    )
+    parser.add_argument("--output", help="file to write the results to, as JSON")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="relative change reported as a regression",
+    )
+    args = parser.parse_args()
+    # Fail on invalid distributions before starting the server
+    try:
+        latency = str(Distribution.parse(args.latency))
+        completion_time = str(Distribution.parse(args.completion_time))
+    except ValueError as e:
+        parser.error(str(e))
+
+    # The server runs in its own process, so it does not compete with the
+    # client for the interpreter
+    urls: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=_serve, args=(latency, completion_time, urls), daemon=True
+    )
+    server.start()
+    results = []
+    try:
+        api_url = urls.get(timeout=10)
+        with tempfile.TemporaryDirectory() as directory:
+            print(
+                f"{'concurrency':>11} {'size':>9} {'policy':>8} {'runs/s':>8} "
+                f"{'p50':>7} {'p95':>7} {'p99':>7} {'polls':>6} {'failed':>7}"
+            )
+            for concurrency in args.concurrency:
+                for size in args.sizes:
+                    path = _create_file(directory, size) if size else None
+                    for policy in args.policies:
+                        result = asyncio.run(
+                            _run_scenario(api_url, args.runs, concurrency, path, policy)
+                        )
+                        result = {
+                            "concurrency": concurrency,
+                            "size_kib": size,
+                            "policy": policy,
+                            **result,
+                        }
+                        results.append(result)
+                        print(
+                            f"{concurrency:>11} {size:>5} KiB {policy:>8} "
+                            f"{result['runs_per_second']:>8.1f} "
+                            f"{result['p50_seconds'] or 0:>6.3f}s "
+                            f"{result['p95_seconds'] or 0:>6.3f}s "
+                            f"{result['p99_seconds'] or 0:>6.3f}s "
+                            f"{result['polls_per_run'] or 0:>6.2f} "
+                            f"{result['failures']:>7}"
+                        )
+    finally:
+        server.terminate()
+        server.join()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "settings": {
+                        "runs": args.runs,
+                        "latency": latency,
+                        "completion_time": completion_time,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if _compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
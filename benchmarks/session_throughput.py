@@ -0,0 +1,94 @@
+"""Measure API request throughput of `AsyncClient` under different session options.
+
+Sends concurrent requests to a local stand-in server that answers after a fixed
+latency, and reports the requests per second and the number of requests that
+failed, for example by running into the pool timeout.
+
+The local server speaks plain HTTP/1.1, so HTTP/2 multiplexing, which requires
+TLS, is not measured here.
+
+Usage, with the package installed (`poetry install`):
+    python benchmarks/session_throughput.py [--requests 2000] [--concurrency 200]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from typing import Dict
+
+from fake_server import PUBLIC_KEY, SECRET_KEY, FakeTWSServer
+from tws import AsyncClient, ClientException, SessionOptions
+
+CONFIGURATIONS: Dict[str, SessionOptions] = {
+    "defaults": SessionOptions(),
+    "1 connection": SessionOptions(max_connections=1),
+    "10 connections": SessionOptions(max_connections=10),
+    "no keepalive": SessionOptions(max_keepalive_connections=0),
+    "200 keepalive": SessionOptions(max_connections=200, max_keepalive_connections=200),
+    "200, 60s pool": SessionOptions(
+        max_connections=200, max_keepalive_connections=200, pool_timeout=60
+    ),
+}
+
+
+async def _run(api_url: str, options: SessionOptions, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def request(client: AsyncClient) -> None:
+        nonlocal failures
+        async with semaphore:
+            try:
+                await client._make_request("GET", "users_private")
+            except ClientException:
+                failures += 1
+
+    async with AsyncClient(
+        PUBLIC_KEY, SECRET_KEY, api_url, session_options=options
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(request(client) for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    return (requests - failures) / elapsed, failures
+
+
+def _serve(latency: float, urls: "multiprocessing.Queue[str]") -> None:
+    with FakeTWSServer(latency=latency) as server:
+        urls.put(server.api_url)
+        # Serve until the benchmark terminates the process
+        while True:
+            time.sleep(60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="server latency in seconds"
+    )
+    args = parser.parse_args()
+
+    # The server runs in its own process, so it does not compete with the
+    # client for the interpreter
+    urls: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=_serve, args=(args.latency, urls), daemon=True
+    )
+    server.start()
+    try:
+        api_url = urls.get(timeout=10)
+        print(f"{'configuration':>15} {'requests/s':>11} {'failed':>7}")
+        for name, options in CONFIGURATIONS.items():
+            rate, failures = asyncio.run(
+                _run(api_url, options, args.requests, args.concurrency)
+            )
+            print(f"{name:>15} {rate:>11.0f} {failures:>7}")
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure the peak memory use of `AsyncClient._upload_file` by file size.
+
+Each size is uploaded to a local stand-in server in a fresh process, which
+reports its peak resident set size. With uploads streamed from disk the peak
+should stay flat as the file size grows. Files above the resumable upload
+threshold of 50 MiB are sent in parts, in parallel segments.
+
+Usage, with the package installed (`poetry install`):
+    python benchmarks/upload_memory.py [--sizes 16 256 1024] [--concurrency 1]
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from fake_server import PUBLIC_KEY, SECRET_KEY, FakeTWSServer
+from tws import AsyncClient
+
+MIB = 1024 * 1024
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / MIB if sys.platform == "darwin" else peak / 1024
+
+
+def _create_file(directory: str, size_mib: int) -> str:
+    path = os.path.join(directory, f"upload-{size_mib}mib.bin")
+    block = os.urandom(MIB)
+    with open(path, "wb") as f:
+        for _ in range(size_mib):
+            f.write(block)
+    return path
+
+
+async def _upload(api_url: str, paths) -> None:
+    async with AsyncClient(PUBLIC_KEY, SECRET_KEY, api_url) as client:
+        await asyncio.gather(*(client._upload_file(path) for path in paths))
+
+
+def _child(size_mib: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as directory, FakeTWSServer() as server:
+        paths = [_create_file(directory, size_mib) for _ in range(concurrency)]
+        baseline = _peak_rss_mib()
+        asyncio.run(_upload(server.api_url, paths))
+        assert server.bytes_received >= size_mib * MIB * concurrency
+        print(f"{baseline:.1f} {_peak_rss_mib():.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 256, 1024])
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        _child(args.child, args.concurrency)
+        return
+
+    print(f"{'file size':>10} {'concurrency':>12} {'baseline RSS':>13} {'peak RSS':>9}")
+    for size in args.sizes:
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                str(size),
+                "--concurrency",
+                str(args.concurrency),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        baseline, peak = (float(value) for value in output.split())
+        print(
+            f"{size:>6} MiB {args.concurrency:>12} {baseline:>9.1f} MiB "
+            f"{peak:>5.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
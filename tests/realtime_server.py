@@ -0,0 +1,106 @@
+"""A local stand-in for the realtime websocket server used in tests."""
+
+import json
+import threading
+from typing import List, Optional
+
+from websockets.sync.server import ServerConnection, serve
+
+
+class FakeRealtimeServer:
+    """Accepts realtime subscriptions and pushes workflow instance updates."""
+
+    def __init__(self, reject: bool = False, silent: bool = False):
+        self.reject = reject
+        self.silent = silent
+        self.messages: List[dict] = []
+        self._connections: List[ServerConnection] = []
+        self._lock = threading.Lock()
+        self._joined = threading.Condition(self._lock)
+        self._server = serve(self._handle, "127.0.0.1", 0)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self._server.socket.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeRealtimeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.drop_connections()
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+
+    def wait_for_subscribers(self, count: int = 1, timeout: float = 5) -> None:
+        with self._joined:
+            if not self._joined.wait_for(
+                lambda: len(self._connections) >= count, timeout
+            ):
+                raise TimeoutError("No realtime subscriber connected")
+
+    def push_update(self, record: dict, table: str = "workflow_instances") -> None:
+        message = json.dumps(
+            {
+                "topic": "realtime:tws-workflow-instances",
+                "event": "postgres_changes",
+                "payload": {
+                    "data": {"type": "UPDATE", "table": table, "record": record},
+                    "ids": [1],
+                },
+                "ref": None,
+            }
+        )
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            connection.send(message)
+
+    def drop_connections(self, code: int = 1000) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close(code)
+
+    def _handle(self, connection: ServerConnection) -> None:
+        for raw in connection:
+            message = json.loads(raw)
+            with self._lock:
+                self.messages.append(message)
+            if message["event"] != "phx_join" or self.silent:
+                continue
+
+            # Unrelated messages may arrive before the reply to the join
+            connection.send(
+                json.dumps(
+                    {
+                        "topic": message["topic"],
+                        "event": "system",
+                        "payload": {"status": "ok"},
+                        "ref": None,
+                    }
+                )
+            )
+
+            # Registered before replying, so the connection can be dropped as
+            # soon as the client has joined
+            if not self.reject:
+                with self._joined:
+                    self._connections.append(connection)
+                    self._joined.notify_all()
+
+            status = "error" if self.reject else "ok"
+            connection.send(
+                json.dumps(
+                    {
+                        "topic": message["topic"],
+                        "event": "phx_reply",
+                        "payload": {"status": status, "response": {}},
+                        "ref": message["ref"],
+                    }
+                )
+            )
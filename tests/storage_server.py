@@ -0,0 +1,162 @@
+"""A local stand-in for the resumable upload endpoint of the storage service."""
+
+import base64
+import itertools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import AbstractSet, Dict, Optional, cast
+
+UPLOAD_PATH = "/storage/v1/upload/resumable"
+
+
+class _Upload:
+    def __init__(self, length: Optional[int], metadata: Dict[str, str], partial: bool):
+        self.length = length
+        self.metadata = metadata
+        self.partial = partial
+        self.data = bytearray()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def storage(self) -> "FakeStorageServer":
+        return cast(FakeStorageServer, self.server)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_OPTIONS(self) -> None:
+        extensions = "creation"
+        if self.storage.concatenation:
+            extensions += ",concatenation"
+        self._respond(204, {"Tus-Extension": extensions})
+
+    def do_POST(self) -> None:
+        if self.path != UPLOAD_PATH:
+            self._respond(404)
+            return
+
+        metadata = {}
+        for item in self.headers.get("Upload-Metadata", "").split(","):
+            if item:
+                key, value = item.split(" ")
+                metadata[key] = base64.b64decode(value).decode()
+
+        concat = self.headers.get("Upload-Concat")
+        with self.storage.lock:
+            if concat is not None and concat.startswith("final;"):
+                if not self.storage.concatenation:
+                    self._respond(400)
+                    return
+                upload = _Upload(None, metadata, partial=False)
+                for url in concat[len("final;") :].split(" "):
+                    upload.data += self.storage.uploads[url.rsplit("/", 1)[1]].data
+                self.storage.store(upload)
+            else:
+                upload = _Upload(
+                    int(self.headers["Upload-Length"]),
+                    metadata,
+                    partial=concat == "partial",
+                )
+            upload_id = str(next(self.storage.ids))
+            self.storage.uploads[upload_id] = upload
+            self.storage.requests.append(("POST", upload_id))
+        self._respond(
+            201, {"Location": f"{self.storage.api_url}{UPLOAD_PATH}/{upload_id}"}
+        )
+
+    def do_HEAD(self) -> None:
+        upload = self._upload()
+        if upload is not None:
+            with self.storage.lock:
+                self.storage.requests.append(("HEAD", len(upload.data)))
+            self._respond(200, {"Upload-Offset": str(len(upload.data))})
+
+    def do_PATCH(self) -> None:
+        upload = self._upload()
+        if upload is None:
+            return
+
+        length = int(self.headers["Content-Length"])
+        offset = int(self.headers["Upload-Offset"])
+        with self.storage.lock:
+            index = next(self.storage.patches)
+            self.storage.requests.append(("PATCH", offset))
+            if offset != len(upload.data):
+                self.rfile.read(length)
+                self._respond(409)
+                return
+
+        if index in self.storage.interrupt:
+            # Keep the first half of the part and drop the connection, like a
+            # network failure in the middle of a request
+            upload.data += self.rfile.read(length // 2)
+            self.close_connection = True
+            return
+
+        upload.data += self.rfile.read(length)
+        if len(upload.data) == upload.length and not upload.partial:
+            self.storage.store(upload)
+        self._respond(204, {"Upload-Offset": str(len(upload.data))})
+
+    def _upload(self) -> Optional[_Upload]:
+        upload = self.storage.uploads.get(self.path.rsplit("/", 1)[1])
+        if upload is None:
+            self._respond(404)
+        return upload
+
+    def _respond(self, status: int, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Tus-Resumable", "1.0.0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class FakeStorageServer(ThreadingHTTPServer):
+    """Implements the tus resumable upload protocol on localhost.
+
+    Args:
+        concatenation: Advertise and support the concatenation extension
+        interrupt: Indices of PATCH requests, counted from zero, whose
+            connection is dropped after receiving half of their data
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, concatenation: bool = False, interrupt: AbstractSet[int] = frozenset()
+    ):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.concatenation = concatenation
+        self.interrupt = interrupt
+        self.uploads: Dict[str, _Upload] = {}
+        self.objects: Dict[str, bytes] = {}
+        self.requests: list = []
+        self.lock = threading.Lock()
+        self.ids = itertools.count()
+        self.patches = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def store(self, upload: _Upload) -> None:
+        name = f"{upload.metadata['bucketName']}/{upload.metadata['objectName']}"
+        self.objects[name] = bytes(upload.data)
+
+    def __enter__(self) -> "FakeStorageServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from typing import Any
 
 import httpx
@@ -10,10 +12,23 @@ from tests.constants import (
     BAD_PUBLIC_KEY,
     GOOD_SECRET_KEY,
     BAD_SECRET_KEY,
+    OTHER_SECRET_KEY,
     GOOD_URL,
     BAD_URL,
 )
-from tws import AsyncClient, ClientException
+from tws import (
+    AsyncClient,
+    ClientException,
+    ExponentialBackoff,
+    LatencyModel,
+    LearnedPolling,
+    ResultCache,
+    UploadCache,
+    UserIdCache,
+    WorkflowRequest,
+    WorkflowTimeoutError,
+)
+from tws.base.multipart import MultipartFile
 
 
 @pytest.fixture
@@ -331,6 +346,8 @@ async def test_make_request_success(mock_request, good_async_client):
         json={"param": "value"},
         params={"query": "param"},
         files=None,
+        content=None,
+        headers=None,
     )
     assert result == {"data": "test"}
 
@@ -485,6 +502,57 @@ async def test_upload_file_success(
     assert call_args[1]["service"] == "storage"  # service parameter
 
 
+@patch("tws._async.client.UPLOAD_CHUNK_SIZE", 4)
+@patch("tws._async.client.AsyncClient._lookup_user_id")
+async def test_upload_file_streams_multipart_body(
+    mock_lookup_user_id, good_async_client, tmp_path
+):
+    test_file = tmp_path / 'report "final".pdf'
+    test_file.write_bytes(b"0123456789")
+    mock_lookup_user_id.return_value = "test-user-456"
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        return Response(200, json={"Key": "documents/test-user-456/file.pdf"})
+
+    good_async_client.session = httpx.AsyncClient(
+        base_url=GOOD_URL, transport=httpx.MockTransport(handler)
+    )
+    async with good_async_client:
+        file_path = await good_async_client._upload_file(str(test_file))
+
+    assert file_path == "test-user-456/file.pdf"
+    request = requests[0]
+    assert request.url.path.startswith("/storage/v1/object/documents/test-user-456/")
+    boundary = request.headers["Content-Type"].split("boundary=")[1]
+    body = request.content
+    assert (
+        body
+        == (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="upload-file"; '
+            'filename="report %22final%22.pdf"\r\n'
+            "Content-Type: application/pdf\r\n"
+            "\r\n"
+            "0123456789"
+            f"\r\n--{boundary}--\r\n"
+        ).encode()
+    )
+    assert int(request.headers["Content-Length"]) == len(body)
+    assert "Transfer-Encoding" not in request.headers
+
+    # The file is read from disk in chunks, never as a whole
+    multipart = MultipartFile("file.pdf", boundary="boundary")
+    chunks = [
+        chunk
+        async for chunk in good_async_client._stream_multipart(
+            str(test_file), multipart
+        )
+    ]
+    assert chunks == [multipart.preamble, b"0123", b"4567", b"89", multipart.epilogue]
+
+
 @patch("tws._async.client.AsyncClient._lookup_user_id")
 async def test_upload_file_nonexistent_file(mock_lookup_user_id, good_async_client):
     # Mock user ID lookup
@@ -596,3 +664,496 @@ async def test_run_workflow_with_files_and_tags(
         },
     )
     assert result == {"output": "success with file and tags"}
+
+
+@patch("tws._async.client.AsyncClient.run_workflow")
+async def test_run_workflows_success(mock_run_workflow, good_async_client):
+    async def run_workflow(workflow_definition_id, workflow_args, **kwargs):
+        return {"output": workflow_args["n"]}
+
+    mock_run_workflow.side_effect = run_workflow
+
+    requests = [
+        WorkflowRequest("workflow-id", {"n": 0}),
+        {"workflow_definition_id": "workflow-id", "workflow_args": {"n": 1}},
+    ]
+
+    async with good_async_client:
+        results = [r async for r in good_async_client.run_workflows(requests)]
+
+    results.sort(key=lambda r: r.index)
+    assert [r.result for r in results] == [{"output": 0}, {"output": 1}]
+    assert all(r.ok for r in results)
+    assert results[1].request == WorkflowRequest("workflow-id", {"n": 1})
+    mock_run_workflow.assert_any_call(
+        workflow_definition_id="workflow-id",
+        workflow_args={"n": 0},
+        timeout=600,
+        retry_delay=1,
+        tags=None,
+        files=None,
+        polling_policy=None,
+        use_cache=True,
+        refresh_cache=False,
+    )
+
+
+@patch("tws._async.client.AsyncClient.run_workflow")
+async def test_run_workflows_bounded_concurrency(mock_run_workflow, good_async_client):
+    in_flight = 0
+    max_in_flight = 0
+    consumed = 0
+
+    async def run_workflow(workflow_definition_id, workflow_args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if workflow_args["n"] == 3:
+            raise ClientException("Workflow execution failed")
+        return {"output": workflow_args["n"]}
+
+    async def requests():
+        nonlocal consumed
+        for n in range(10):
+            consumed += 1
+            yield WorkflowRequest("workflow-id", {"n": n})
+
+    mock_run_workflow.side_effect = run_workflow
+
+    async with good_async_client:
+        results = []
+        async for result in good_async_client.run_workflows(
+            requests(), max_concurrency=3
+        ):
+            # Requests are pulled lazily, never more than the window ahead
+            assert consumed - len(results) <= 3
+            results.append(result)
+
+    assert max_in_flight == 3
+    assert sorted(r.index for r in results) == list(range(10))
+    failed = [r for r in results if not r.ok]
+    assert len(failed) == 1
+    assert failed[0].index == 3
+    assert failed[0].result is None
+    assert "Workflow execution failed" in str(failed[0].error)
+
+
+@pytest.mark.parametrize(
+    "requests,max_concurrency,exception_message",
+    [
+        [[], 0, "Max concurrency must be a positive integer"],
+        [[], "3", "Max concurrency must be a positive integer"],
+        [
+            ["not a request"],
+            1,
+            "Workflow requests must be WorkflowRequest instances or dictionaries",
+        ],
+        [[{"workflow_definition_id": "id"}], 1, "Invalid workflow request"],
+    ],
+)
+async def test_run_workflows_validation(
+    good_async_client, requests, max_concurrency, exception_message
+):
+    with pytest.raises(ClientException) as exc_info:
+        async with good_async_client:
+            async for _ in good_async_client.run_workflows(
+                requests, max_concurrency=max_concurrency
+            ):
+                pass
+    assert exception_message in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient.run_workflow")
+async def test_run_workflows_cancels_pending_on_close(
+    mock_run_workflow, good_async_client
+):
+    cancelled = 0
+
+    async def run_workflow(workflow_definition_id, workflow_args, **kwargs):
+        nonlocal cancelled
+        if workflow_args["n"] == 0:
+            return {"output": 0}
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+
+    mock_run_workflow.side_effect = run_workflow
+    requests = [WorkflowRequest("workflow-id", {"n": n}) for n in range(3)]
+
+    async with good_async_client:
+        results = good_async_client.run_workflows(requests, max_concurrency=3)
+        first = await results.__anext__()
+        await results.aclose()
+
+    assert first.result == {"output": 0}
+    assert cancelled == 2
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+@patch("asyncio.sleep")
+async def test_run_workflow_with_polling_policy(
+    mock_sleep, mock_request, mock_rpc, good_async_client
+):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = [
+        [{"status": "RUNNING", "result": None}],
+        [{"status": "RUNNING", "result": None}],
+        [{"status": "COMPLETED", "result": {"output": "success"}}],
+    ]
+    policy = ExponentialBackoff(
+        initial_delay=0.05, min_delay=0.1, max_delay=1, jitter=0
+    )
+
+    async with good_async_client:
+        result = await good_async_client.run_workflow(
+            "workflow-id", {"arg": "value"}, polling_policy=policy
+        )
+
+    assert result == {"output": "success"}
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.05, 0.1, 0.2]
+
+
+class _ThreadRecordingModel(LatencyModel):
+    def save(self, path=None):
+        self.saved_on = threading.current_thread()
+        super().save(path)
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_run_workflow_saves_latency_model_off_the_loop(
+    mock_request, mock_rpc, good_async_client, tmp_path
+):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = [
+        {"status": "COMPLETED", "result": {"output": "success"}}
+    ]
+    model = _ThreadRecordingModel(path=str(tmp_path / "model.json"), autosave_every=1)
+
+    async with good_async_client:
+        await good_async_client.run_workflow(
+            "workflow-id", {"arg": "value"}, polling_policy=LearnedPolling(model=model)
+        )
+
+    # Writing the model to disk blocks, so it must not run on the event loop
+    assert model.saved_on is not threading.current_thread()
+    assert LatencyModel(path=model.path).count("workflow-id") == 1
+
+
+async def test_run_workflow_invalid_polling_policy(good_async_client):
+    with pytest.raises(ClientException) as exc_info:
+        async with good_async_client:
+            await good_async_client.run_workflow(
+                "workflow-id",
+                {"arg": "value"},
+                polling_policy=1,  # type: ignore
+            )
+    assert "Polling policy must be a PollingPolicy instance" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._upload_file")
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_run_workflow_uploads_files_concurrently(
+    mock_request, mock_rpc, mock_upload
+):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def upload(file_path):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f"user-123/{file_path}"
+
+    mock_upload.side_effect = upload
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = [{"status": "COMPLETED", "result": {}}]
+    files = {f"doc{n}": f"file{n}.pdf" for n in range(5)}
+
+    client = AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, max_concurrent_uploads=2
+    )
+    async with client:
+        # The limit is shared by all workflows started by the client
+        await asyncio.gather(
+            client.run_workflow("workflow-id", {"arg": "value"}, files=files),
+            client.run_workflow("workflow-id", {"arg": "value"}, files=files),
+        )
+
+    assert max_in_flight == 2
+    assert mock_upload.call_count == 10
+    assert mock_rpc.call_args[0][1]["request_body"] == {
+        "arg": "value",
+        **{f"doc{n}": f"user-123/file{n}.pdf" for n in range(5)},
+    }
+
+
+@patch("tws._async.client.AsyncClient._upload_file")
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+async def test_run_workflow_upload_failures(mock_rpc, mock_upload, good_async_client):
+    cancelled = []
+
+    async def upload(file_path):
+        if file_path.startswith("bad"):
+            raise ClientException(f"File upload failed: File not found: {file_path}")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(file_path)
+            raise
+        return f"user-123/{file_path}"
+
+    mock_upload.side_effect = upload
+
+    async with good_async_client:
+        with pytest.raises(ClientException) as exc_info:
+            await good_async_client.run_workflow(
+                "workflow-id", {}, files={"slow": "slow.pdf", "bad": "bad.pdf"}
+            )
+        assert str(exc_info.value) == "File upload failed: File not found: bad.pdf"
+        # The remaining uploads are cancelled rather than left running
+        assert cancelled == ["slow.pdf"]
+
+        with pytest.raises(ClientException) as exc_info:
+            await good_async_client.run_workflow(
+                "workflow-id", {}, files={"a": "bad1.pdf", "b": "bad2.pdf"}
+            )
+        assert str(exc_info.value) == (
+            "2 file uploads failed: a: File upload failed: File not found: "
+            "bad1.pdf; b: File upload failed: File not found: bad2.pdf"
+        )
+
+    mock_rpc.assert_not_called()
+
+
+async def test_client_max_concurrent_uploads_validation():
+    with pytest.raises(ClientException) as exc_info:
+        AsyncClient(
+            GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, max_concurrent_uploads=0
+        )
+    assert "Max concurrent uploads must be a positive integer" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._lookup_user_id")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_upload_file_reuses_cached_upload(
+    mock_request, mock_lookup_user_id, tmp_path
+):
+    test_file = tmp_path / "reference.pdf"
+    test_file.write_bytes(b"reference document")
+    mock_lookup_user_id.return_value = "test-user-456"
+    mock_request.return_value = {"Key": "documents/test-user-456/1-reference.pdf"}
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, upload_cache=UploadCache()
+    ) as client:
+        for _ in range(2):
+            file_path = await client._upload_file(str(test_file))
+            assert file_path == "test-user-456/1-reference.pdf"
+
+    assert mock_request.call_count == 1
+
+
+async def test_client_upload_cache_validation():
+    with pytest.raises(ClientException) as exc_info:
+        AsyncClient(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, upload_cache={})  # type: ignore
+    assert "Upload cache must be an UploadCache instance" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_run_workflow_result_cache(mock_request, mock_rpc):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = [
+        [{"status": "COMPLETED", "result": {"run": 1}}],
+        [{"status": "COMPLETED", "result": {"run": 2}}],
+    ]
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, result_cache=ResultCache()
+    ) as client:
+        assert await client.run_workflow("workflow-id", {"arg": 1}) == {"run": 1}
+        assert await client.run_workflow("workflow-id", {"arg": 1}) == {"run": 1}
+        result = await client.run_workflow(
+            "workflow-id", {"arg": 1}, refresh_cache=True
+        )
+        assert result == {"run": 2}
+        assert await client.run_workflow("workflow-id", {"arg": 1}) == {"run": 2}
+
+    assert mock_rpc.call_count == 2
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_run_workflow_result_cache_is_scoped_to_the_key(mock_request, mock_rpc):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = [
+        [{"status": "COMPLETED", "result": {"user": "a"}}],
+        [{"status": "COMPLETED", "result": {"user": "b"}}],
+    ]
+    cache = ResultCache()
+
+    results = []
+    for secret_key in (GOOD_SECRET_KEY, OTHER_SECRET_KEY):
+        async with AsyncClient(
+            GOOD_PUBLIC_KEY, secret_key, GOOD_URL, result_cache=cache
+        ) as client:
+            results.append(await client.run_workflow("workflow-id", {"arg": 1}))
+
+    # Clients with different keys sharing a cache do not see each other's results
+    assert results == [{"user": "a"}, {"user": "b"}]
+    assert mock_rpc.call_count == 2
+    assert len(cache) == 2
+
+
+async def test_client_result_cache_validation():
+    with pytest.raises(ClientException) as exc_info:
+        AsyncClient(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, result_cache={})  # type: ignore
+    assert "Result cache must be a ResultCache instance" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_run_workflow_coalesces_identical_requests(mock_request, mock_rpc):
+    async def start_workflow(function_name, payload):
+        await asyncio.sleep(0.05)
+        return {"workflow_instance_id": payload["request_body"]["arg"]}
+
+    async def get_instance(*args, **kwargs):
+        return [{"status": "COMPLETED", "result": {"output": 1}}]
+
+    mock_rpc.side_effect = start_workflow
+    mock_request.side_effect = get_instance
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, coalesce_requests=True
+    ) as client:
+        results = await asyncio.gather(
+            *[client.run_workflow("workflow-id", {"arg": "a"}) for _ in range(4)],
+            client.run_workflow("workflow-id", {"arg": "b"}),
+            client.run_workflow("workflow-id", {"arg": "a"}, tags={"k": "v"}),
+        )
+        assert client._in_flight == {}
+
+    assert results == [{"output": 1}] * 6
+    # Every caller receives its own copy of the result
+    assert len({id(result) for result in results}) == 6
+    assert mock_rpc.call_count == 3
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+async def test_run_workflow_coalesced_cancellation(mock_rpc):
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def start_workflow(function_name, payload):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    mock_rpc.side_effect = start_workflow
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, coalesce_requests=True
+    ) as client:
+        callers = [
+            asyncio.ensure_future(client.run_workflow("workflow-id", {"arg": "a"}))
+            for _ in range(2)
+        ]
+        await started.wait()
+
+        # The execution continues while a caller still waits for it
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+
+        callers[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert client._in_flight == {}
+
+    assert mock_rpc.call_count == 1
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_run_workflow_coalesced_timeout(mock_request, mock_rpc):
+    release = asyncio.Event()
+
+    async def start_workflow(function_name, payload):
+        await release.wait()
+        return {"workflow_instance_id": "instance-id"}
+
+    async def get_instance(*args, **kwargs):
+        return [{"status": "COMPLETED", "result": {"output": 1}}]
+
+    mock_rpc.side_effect = start_workflow
+    mock_request.side_effect = get_instance
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, coalesce_requests=True
+    ) as client:
+        leader = asyncio.ensure_future(client.run_workflow("workflow-id", {"arg": "a"}))
+        await asyncio.sleep(0)
+
+        # A caller waits no longer than its own timeout, without cancelling the
+        # execution the other caller waits for
+        with pytest.raises(WorkflowTimeoutError):
+            await client.run_workflow("workflow-id", {"arg": "a"}, timeout=1)
+        assert not leader.done()
+
+        follower = asyncio.ensure_future(
+            client.run_workflow("workflow-id", {"arg": "a"}, return_report=True)
+        )
+        await asyncio.sleep(0)
+        release.set()
+        result, report = await follower
+
+        assert await leader == {"output": 1}
+
+    assert result == {"output": 1}
+    assert report.coalesced
+    assert report.polls == 0
+    assert mock_rpc.call_count == 1
+
+
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_lookup_user_id_single_flight(mock_request):
+    async def lookup(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return [{"user_id": "test-user-456"}]
+
+    mock_request.side_effect = lookup
+
+    async with AsyncClient(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        user_ids = await asyncio.gather(*[client._lookup_user_id() for _ in range(100)])
+
+    assert user_ids == ["test-user-456"] * 100
+    assert mock_request.call_count == 1
+
+
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_lookup_user_id_shared_cache(mock_request):
+    mock_request.return_value = [{"user_id": "test-user-456"}]
+    cache = UserIdCache()
+
+    for _ in range(3):
+        async with AsyncClient(
+            GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, user_id_cache=cache
+        ) as client:
+            await client.prefetch()
+            assert client.user_id == "test-user-456"
+
+    assert mock_request.call_count == 1
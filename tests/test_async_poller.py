@@ -0,0 +1,199 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import AsyncClient, ClientException, LearnedPolling
+from tws._async.poller import chunk_instance_ids
+from tws.base.polling import FixedDelay
+
+
+@pytest.fixture
+def batch_client():
+    return AsyncClient(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        batch_polling=True,
+        batch_polling_window=1,
+    )
+
+
+@pytest.mark.parametrize(
+    "instance_ids,max_length,expected",
+    [
+        [[], 10, []],
+        [["a"], 10, [["a"]]],
+        [["aaa", "bbb", "ccc"], 7, [["aaa", "bbb"], ["ccc"]]],
+        [["aaa", "bbb", "ccc"], 11, [["aaa", "bbb", "ccc"]]],
+        # A single ID longer than the limit still gets its own chunk
+        [["aaaaaaaaaaaa", "b"], 5, [["aaaaaaaaaaaa"], ["b"]]],
+    ],
+)
+def test_chunk_instance_ids(instance_ids, max_length, expected):
+    assert list(chunk_instance_ids(instance_ids, max_length)) == expected
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_batch_polling_shares_requests(mock_request, mock_rpc, batch_client):
+    instance_ids = iter(["id-1", "id-2", "id-3"])
+    polls = []
+
+    async def start(function_name, payload):
+        return {"workflow_instance_id": next(instance_ids)}
+
+    async def poll(method, uri, params: dict):
+        polls.append(params["id"])
+        # Every instance is still running on the first poll
+        status = "RUNNING" if len(polls) == 1 else "COMPLETED"
+        ids = params["id"][len("in.(") : -1].split(",")
+        return [
+            {"id": instance_id, "status": status, "result": {"id": instance_id}}
+            for instance_id in ids
+        ]
+
+    mock_rpc.side_effect = start
+    mock_request.side_effect = poll
+
+    async with batch_client:
+        results = await asyncio.gather(
+            *(
+                batch_client.run_workflow("workflow-id", {"arg": "value"})
+                for _ in range(3)
+            )
+        )
+
+    assert results == [{"id": "id-1"}, {"id": "id-2"}, {"id": "id-3"}]
+    assert polls == ["in.(id-1,id-2,id-3)", "in.(id-1,id-2,id-3)"]
+    assert batch_client._poller is not None
+    assert batch_client._poller.pending == 0
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_batch_polling_failure(mock_request, mock_rpc, batch_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = [
+        {"id": "123", "status": "FAILED", "result": {"error": "workflow failed"}}
+    ]
+
+    with pytest.raises(ClientException) as exc_info:
+        async with batch_client:
+            await batch_client.run_workflow("workflow-id", {"arg": "value"})
+    assert "Workflow execution failed" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_batch_polling_instance_not_found(mock_request, mock_rpc, batch_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = []
+
+    with pytest.raises(ClientException) as exc_info:
+        async with batch_client:
+            await batch_client.run_workflow("workflow-id", {"arg": "value"})
+    assert "Workflow instance 123 not found" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_batch_polling_request_error(mock_request, mock_rpc, batch_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = ClientException("Request error occurred: boom")
+
+    with pytest.raises(ClientException) as exc_info:
+        async with batch_client:
+            await batch_client.run_workflow("workflow-id", {"arg": "value"})
+    assert "Request error occurred: boom" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_batch_polling_timeout(mock_request, mock_rpc, batch_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = [{"id": "123", "status": "RUNNING", "result": None}]
+
+    with pytest.raises(ClientException) as exc_info:
+        async with batch_client:
+            await batch_client.run_workflow("workflow-id", {"arg": "value"}, timeout=1)
+    assert "Workflow execution timed out after 1 seconds" in str(exc_info.value)
+
+
+async def test_batch_polling_abandoned_waiter(batch_client):
+    assert batch_client._poller is not None
+
+    async def never_completes(method, uri, params=None):
+        return [{"id": "123", "status": "RUNNING", "result": None}]
+
+    with patch(
+        "tws._async.client.AsyncClient._make_request", side_effect=never_completes
+    ):
+        async with batch_client:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    batch_client._poller.wait(
+                        "123", FixedDelay(1).delays("workflow-id")
+                    ),
+                    0.1,
+                )
+            # The instance is no longer polled once nobody waits on it
+            assert batch_client._poller.pending == 0
+
+
+async def test_batch_polling_shared_instance(batch_client):
+    assert batch_client._poller is not None
+    polls = []
+
+    async def complete(method, uri, params: dict):
+        polls.append(params["id"])
+        return [{"id": "123", "status": "COMPLETED", "result": {"output": "done"}}]
+
+    with patch("tws._async.client.AsyncClient._make_request", side_effect=complete):
+        async with batch_client:
+            results = await asyncio.gather(
+                batch_client._poller.wait("123", FixedDelay(5).delays("workflow-id")),
+                batch_client._poller.wait("123", FixedDelay(1).delays("workflow-id")),
+            )
+
+    # Neither waiter saw the instance running
+    assert results == [({"output": "done"}, None), ({"output": "done"}, None)]
+    assert polls == ["in.(123)"]
+
+
+async def test_batch_polling_close_fails_waiters(batch_client):
+    assert batch_client._poller is not None
+
+    async def never_completes(method, uri, params=None):
+        return [{"id": "123", "status": "RUNNING", "result": None}]
+
+    with patch(
+        "tws._async.client.AsyncClient._make_request", side_effect=never_completes
+    ):
+        async with batch_client:
+            waiter = asyncio.ensure_future(
+                batch_client._poller.wait("123", FixedDelay(1).delays("workflow-id"))
+            )
+            await asyncio.sleep(0)
+
+        with pytest.raises(ClientException) as exc_info:
+            await waiter
+    assert "Client closed while waiting for workflow" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_batch_polling_records_latency(mock_request, mock_rpc, batch_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = [
+        {"id": "123", "status": "COMPLETED", "result": {"output": "success"}}
+    ]
+    policy = LearnedPolling()
+
+    async with batch_client:
+        await batch_client.run_workflow(
+            "workflow-id", {"arg": "value"}, polling_policy=policy
+        )
+
+    assert policy.model.count("workflow-id") == 1
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_benchmark(name, *args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, os.path.join(ROOT, "benchmarks", name), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=120,
+    ).stdout
+
+
+def test_upload_memory_above_resumable_threshold():
+    # 64 MiB is above the resumable upload threshold, so the file is sent in
+    # parallel segments to the stand-in server's resumable upload endpoint
+    output = _run_benchmark("upload_memory.py", "--sizes", "64")
+
+    header, row = output.strip().splitlines()
+    assert "peak RSS" in header
+    size, unit, concurrency, baseline, _, peak, _ = row.split()
+    assert (size, unit, concurrency) == ("64", "MiB", "1")
+    # Parts are streamed from disk, so the file is never held in memory
+    assert float(peak) - float(baseline) < 64
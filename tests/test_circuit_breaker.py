@@ -0,0 +1,176 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import (
+    AsyncClient,
+    CircuitBreakerPolicy,
+    CircuitOpenError,
+    Client,
+    ClientException,
+    RetryPolicy,
+)
+from tws.base.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    REST,
+    RPC,
+    STORAGE,
+    CircuitBreaker,
+    endpoint_class,
+)
+
+REQUEST = httpx.Request("GET", GOOD_URL)
+
+
+def _response(status):
+    return httpx.Response(status, json=[], request=REQUEST)
+
+
+def _send(breaker, error=None):
+    with breaker.request():
+        if error is not None:
+            raise error
+
+
+def _fail(breaker):
+    with pytest.raises(httpx.ConnectError):
+        _send(breaker, httpx.ConnectError("Connection refused"))
+
+
+def test_endpoint_class():
+    assert endpoint_class("rest", "workflow_instances") == REST
+    assert endpoint_class("rest", "rpc/start_workflow") == RPC
+    assert endpoint_class("storage", "object/documents/user/file.pdf") == STORAGE
+
+
+@patch("tws.base.circuit_breaker.time.monotonic")
+def test_circuit_opens_and_recovers(mock_monotonic):
+    mock_monotonic.return_value = 0
+    policy = CircuitBreakerPolicy(
+        failure_rate=0.5, minimum_requests=4, window_size=4, open_duration=10
+    )
+    breaker = CircuitBreaker(REST, policy)
+
+    _send(breaker)
+    _fail(breaker)
+    # Client errors count as successful responses
+    not_found = httpx.HTTPStatusError("", request=REQUEST, response=_response(404))
+    with pytest.raises(httpx.HTTPStatusError):
+        _send(breaker, not_found)
+    assert breaker.state == CLOSED
+    _fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.failure_rate == 0.5
+
+    mock_monotonic.return_value = 4
+    with pytest.raises(CircuitOpenError) as exc_info:
+        _send(breaker)
+    assert exc_info.value.endpoint == REST
+    assert exc_info.value.retry_after == 6
+
+    # A failed probe opens the circuit again
+    mock_monotonic.return_value = 10
+    assert breaker.state == HALF_OPEN
+    _fail(breaker)
+    assert breaker.state == OPEN
+
+    mock_monotonic.return_value = 20
+    with breaker.request():
+        # Only one probe is let through at a time
+        with pytest.raises(CircuitOpenError):
+            _send(breaker)
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate == 0
+
+
+def test_cancelled_requests_are_not_counted():
+    breaker = CircuitBreaker(
+        REST, CircuitBreakerPolicy(minimum_requests=1, window_size=1)
+    )
+    with pytest.raises(KeyboardInterrupt):
+        _send(breaker, KeyboardInterrupt())
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate == 0
+
+
+@patch("httpx.Client.request")
+def test_sync_client_fails_fast(mock_request):
+    mock_request.side_effect = httpx.ConnectError("Connection refused")
+
+    with Client(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        retry_policy=RetryPolicy(max_attempts=1),
+        circuit_breaker=CircuitBreakerPolicy(minimum_requests=3, window_size=3),
+    ) as client:
+        for _ in range(3):
+            with pytest.raises(ClientException) as exc_info:
+                client.get_workflow_handle("123").poll()
+            assert "Request error occurred" in str(exc_info.value)
+
+        with pytest.raises(CircuitOpenError):
+            client.get_workflow_handle("123").poll()
+        assert mock_request.call_count == 3
+
+        # Other classes of endpoints are not affected
+        with pytest.raises(ClientException) as exc_info:
+            client.start_workflow("workflow-id", {})
+        assert not isinstance(exc_info.value, CircuitOpenError)
+        assert client.circuit_states() == {REST: OPEN, RPC: CLOSED, STORAGE: CLOSED}
+
+
+@patch("httpx.AsyncClient.request")
+async def test_async_client_fails_fast(mock_request):
+    mock_request.return_value = _response(503)
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        retry_policy=RetryPolicy(max_attempts=1),
+        circuit_breaker=CircuitBreakerPolicy(minimum_requests=2, window_size=2),
+    ) as client:
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client._make_request("GET", "workflow_instances")
+
+        # User ID lookups do not hide the error
+        with pytest.raises(CircuitOpenError):
+            await client.prefetch()
+        assert client.circuit_states()[REST] == OPEN
+
+
+def test_circuit_breaker_is_disabled_by_default():
+    assert Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL).circuit_states() == {}
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"failure_rate": 0}, "Failure rate must be between 0 and 1"],
+        [{"window_size": 0}, "Window size must be a positive integer"],
+        [
+            {"minimum_requests": 30},
+            "Minimum requests must not exceed the window size",
+        ],
+        [{"open_duration": -1}, "Open duration must be a positive number"],
+        [{"half_open_requests": 0}, "Half open requests must be a positive integer"],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        CircuitBreakerPolicy(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+def test_client_circuit_breaker_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, circuit_breaker={})  # type: ignore
+    assert "Circuit breaker must be a CircuitBreakerPolicy instance" in str(
+        exc_info.value
+    )
@@ -0,0 +1,488 @@
+import itertools
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import (
+    AsyncClient,
+    AsyncWorkflowHandle,
+    Client,
+    ClientException,
+    FixedDelay,
+    LearnedPolling,
+    WorkflowFailedError,
+    WorkflowHandle,
+    WorkflowTimeoutError,
+)
+import tws._async as async_handles
+import tws._sync as sync_handles
+
+RUNNING = {"status": "RUNNING", "result": None}
+FAST = FixedDelay(0.01)
+
+
+def _completed(output):
+    return {"status": "COMPLETED", "result": {"output": output}}
+
+
+def _instances(statuses):
+    """Serve the given status sequences, repeating the last one, per instance."""
+    iterators = {
+        instance_id: itertools.chain(sequence, itertools.repeat(sequence[-1]))
+        for instance_id, sequence in statuses.items()
+    }
+    lock = threading.Lock()
+
+    def get_instance(instance_id):
+        with lock:
+            return next(iterators[instance_id])
+
+    return get_instance
+
+
+def _start_ids(*instance_ids):
+    return [{"workflow_instance_id": instance_id} for instance_id in instance_ids]
+
+
+@pytest.fixture
+def good_client():
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        yield client
+
+
+@pytest.fixture
+async def good_async_client():
+    async with AsyncClient(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        yield client
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+def test_start_workflow(mock_rpc, mock_get_instance, good_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_get_instance.side_effect = [RUNNING, _completed("done")]
+
+    handle = good_client.start_workflow(
+        "workflow-id", {"arg": "value"}, tags={"key": "value"}
+    )
+
+    assert isinstance(handle, WorkflowHandle)
+    assert handle.workflow_instance_id == "123"
+    assert handle.workflow_definition_id == "workflow-id"
+    assert not handle.done
+    mock_rpc.assert_called_once_with(
+        "start_workflow",
+        {
+            "workflow_definition_id": "workflow-id",
+            "request_body": {"arg": "value"},
+            "tags": {"key": "value"},
+        },
+    )
+    # Starting the workflow does not wait for it
+    mock_get_instance.assert_not_called()
+
+    assert handle.poll() is None
+    assert handle.poll() == {"output": "done"}
+    assert handle.done
+    assert "done=True" in repr(handle)
+
+    # The result is cached once the workflow completed
+    assert handle.poll() == {"output": "done"}
+    assert handle.wait() == {"output": "done"}
+    assert mock_get_instance.call_count == 2
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+def test_handle_wait(mock_rpc, mock_get_instance, good_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_get_instance.side_effect = [RUNNING, RUNNING, _completed("done")]
+    policy = LearnedPolling(fallback=FAST)
+
+    handle = good_client.start_workflow(
+        "workflow-id", {"arg": "value"}, polling_policy=policy
+    )
+
+    assert handle.wait() == {"output": "done"}
+    assert handle.wait() == {"output": "done"}
+    assert mock_get_instance.call_count == 3
+    assert policy.model.count("workflow-id") == 1
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_handle_poll_failed(mock_get_instance, good_client):
+    mock_get_instance.return_value = {"status": "FAILED", "result": {"error": "boom"}}
+    handle = good_client.get_workflow_handle("123")
+
+    with pytest.raises(ClientException) as exc_info:
+        handle.poll()
+
+    assert "Workflow execution failed" in str(exc_info.value)
+    assert not handle.done
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_handle_failure_is_cached(mock_get_instance, good_client):
+    mock_get_instance.return_value = {"status": "FAILED", "result": {"error": "boom"}}
+    handle = good_client.get_workflow_handle("123", polling_policy=FAST)
+
+    with pytest.raises(WorkflowFailedError) as exc_info:
+        handle.wait()
+
+    assert exc_info.value.result == {"error": "boom"}
+    # The failure is raised again without checking the status again
+    with pytest.raises(WorkflowFailedError):
+        handle.wait()
+    with pytest.raises(WorkflowFailedError):
+        handle.poll()
+    assert mock_get_instance.call_count == 1
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_get_workflow_handle(mock_get_instance, good_client):
+    mock_get_instance.side_effect = [RUNNING, _completed("done")]
+    policy = LearnedPolling(fallback=FAST)
+
+    handle = good_client.get_workflow_handle("123", polling_policy=policy)
+
+    assert handle.workflow_instance_id == "123"
+    assert handle.workflow_definition_id is None
+    assert handle.wait() == {"output": "done"}
+    mock_get_instance.assert_called_with("123")
+    # The start time of a resumed workflow is unknown, so nothing is learned
+    assert policy.stats() == {}
+
+
+@pytest.mark.parametrize("timeout", [0, 3601, "600"])
+def test_handle_wait_timeout_validation(good_client, timeout):
+    handle = good_client.get_workflow_handle("123")
+
+    with pytest.raises(ClientException) as exc_info:
+        handle.wait(timeout)
+
+    assert "Timeout must be between 1 and 3600 seconds" in str(exc_info.value)
+
+
+def test_get_workflow_handle_validation(good_client):
+    with pytest.raises(ClientException) as exc_info:
+        good_client.get_workflow_handle("123", retry_delay=0)
+    assert "Retry delay must be between 1 and 60 seconds" in str(exc_info.value)
+
+    with pytest.raises(ClientException) as exc_info:
+        good_client.get_workflow_handle("123", polling_policy="fast")
+    assert "Polling policy must be a PollingPolicy instance" in str(exc_info.value)
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+def test_wait_all(mock_rpc, mock_get_instance, good_client):
+    mock_rpc.side_effect = _start_ids("1", "2", "3")
+    mock_get_instance.side_effect = _instances(
+        {
+            "1": [RUNNING, RUNNING, _completed("one")],
+            "2": [_completed("two")],
+            "3": [RUNNING, _completed("three")],
+        }
+    )
+
+    handles = [
+        good_client.start_workflow("workflow-id", {}, polling_policy=FAST)
+        for _ in range(3)
+    ]
+
+    # Results are returned in the order of the handles, not of completion
+    assert sync_handles.wait_all(handles, timeout=5) == [
+        {"output": "one"},
+        {"output": "two"},
+        {"output": "three"},
+    ]
+    assert all(handle.done for handle in handles)
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_wait_all_failure(mock_get_instance, good_client):
+    mock_get_instance.side_effect = _instances(
+        {"1": [RUNNING], "2": [{"status": "FAILED", "result": {"error": "boom"}}]}
+    )
+    handles = [
+        good_client.get_workflow_handle(instance_id, timeout=1, polling_policy=FAST)
+        for instance_id in ["1", "2"]
+    ]
+
+    with pytest.raises(ClientException) as exc_info:
+        sync_handles.wait_all(handles)
+
+    assert "Workflow execution failed" in str(exc_info.value)
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_as_completed(mock_get_instance, good_client):
+    mock_get_instance.side_effect = _instances(
+        {
+            "slow": [RUNNING] * 5 + [_completed("slow")],
+            "fast": [_completed("fast")],
+            "failed": [RUNNING, {"status": "FAILED", "result": {"error": "boom"}}],
+        }
+    )
+    handles = [
+        good_client.get_workflow_handle(instance_id, polling_policy=FAST)
+        for instance_id in ["slow", "fast", "failed"]
+    ]
+
+    completed = list(sync_handles.as_completed(handles))
+
+    assert [handle.workflow_instance_id for handle in completed] == [
+        "fast",
+        "failed",
+        "slow",
+    ]
+    assert completed[0].wait() == {"output": "fast"}
+    # Failed workflows are yielded too, waiting on them raises the failure
+    with pytest.raises(ClientException):
+        completed[1].wait()
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_as_completed_timeout(mock_get_instance, good_client):
+    mock_get_instance.side_effect = _instances(
+        {"done": [_completed("done")], "stuck": [RUNNING]}
+    )
+    handles = [
+        good_client.get_workflow_handle(instance_id, polling_policy=FAST)
+        for instance_id in ["done", "stuck"]
+    ]
+
+    iterator = sync_handles.as_completed(handles, timeout=1)
+    assert next(iterator).workflow_instance_id == "done"
+    with pytest.raises(WorkflowTimeoutError) as exc_info:
+        next(iterator)
+
+    assert "Workflow execution timed out after 1 seconds" in str(exc_info.value)
+    assert exc_info.value.timeout == 1
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_as_completed_handle_timeout(mock_get_instance, good_client):
+    mock_get_instance.return_value = RUNNING
+    handle = good_client.get_workflow_handle("123", timeout=1, polling_policy=FAST)
+
+    # Without an overall timeout each handle waits for its own timeout
+    with pytest.raises(WorkflowTimeoutError):
+        list(sync_handles.as_completed([handle]))
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_wait_any(mock_get_instance, good_client):
+    mock_get_instance.side_effect = _instances(
+        {"slow": [RUNNING] * 5 + [_completed("slow")], "fast": [_completed("fast")]}
+    )
+    handles = [
+        good_client.get_workflow_handle(instance_id, polling_policy=FAST)
+        for instance_id in ["slow", "fast"]
+    ]
+
+    handle = sync_handles.wait_any(handles)
+
+    assert handle.workflow_instance_id == "fast"
+    assert handle.wait() == {"output": "fast"}
+
+
+@patch("tws._sync.client.SyncClient._get_instance")
+def test_wait_any_stops_other_waits(mock_get_instance, good_client):
+    mock_get_instance.side_effect = _instances(
+        {"stuck": [RUNNING], "fast": [RUNNING, _completed("fast")]}
+    )
+    handles = [
+        good_client.get_workflow_handle(instance_id, polling_policy=FAST)
+        for instance_id in ["stuck", "fast"]
+    ]
+
+    assert sync_handles.wait_any(handles).workflow_instance_id == "fast"
+
+    # The wait on the stuck workflow gives up instead of polling until its timeout
+    time.sleep(0.1)
+    polls = mock_get_instance.call_count
+    time.sleep(0.1)
+    assert mock_get_instance.call_count == polls
+    assert not handles[0].done
+
+
+def test_wait_any_no_handles():
+    with pytest.raises(ClientException) as exc_info:
+        sync_handles.wait_any([])
+    assert "At least one workflow handle is required" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._get_instance")
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+async def test_async_start_workflow(mock_rpc, mock_get_instance, good_async_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_get_instance.side_effect = [RUNNING, _completed("done")]
+
+    handle = await good_async_client.start_workflow("workflow-id", {"arg": "value"})
+
+    assert isinstance(handle, AsyncWorkflowHandle)
+    assert handle.workflow_instance_id == "123"
+    mock_get_instance.assert_not_called()
+
+    assert await handle.poll() is None
+    assert await handle.poll() == {"output": "done"}
+    assert handle.done
+    assert await handle.poll() == {"output": "done"}
+    assert await handle.wait() == {"output": "done"}
+    assert mock_get_instance.call_count == 2
+
+
+@patch("tws._async.client.AsyncClient._get_instance")
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+async def test_async_handle_wait(mock_rpc, mock_get_instance, good_async_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_get_instance.side_effect = [RUNNING, _completed("done")]
+    policy = LearnedPolling(fallback=FAST)
+
+    handle = await good_async_client.start_workflow(
+        "workflow-id", {"arg": "value"}, polling_policy=policy
+    )
+
+    assert await handle.wait(timeout=5) == {"output": "done"}
+    assert await handle.wait() == {"output": "done"}
+    assert mock_get_instance.call_count == 2
+    assert policy.model.count("workflow-id") == 1
+
+
+@patch("tws._async.client.AsyncClient._get_instance")
+async def test_async_handle_failure_is_cached(mock_get_instance, good_async_client):
+    mock_get_instance.return_value = {"status": "FAILED", "result": {"error": "boom"}}
+    handle = good_async_client.get_workflow_handle("123", polling_policy=FAST)
+
+    with pytest.raises(WorkflowFailedError):
+        await handle.wait()
+    with pytest.raises(WorkflowFailedError):
+        await handle.wait()
+    with pytest.raises(WorkflowFailedError):
+        await handle.poll()
+    assert mock_get_instance.call_count == 1
+
+
+@patch("tws._async.client.AsyncClient._get_instance")
+async def test_async_get_workflow_handle(mock_get_instance, good_async_client):
+    mock_get_instance.side_effect = [RUNNING, _completed("done")]
+    policy = LearnedPolling(fallback=FAST)
+
+    handle = good_async_client.get_workflow_handle("123", polling_policy=policy)
+
+    assert await handle.wait() == {"output": "done"}
+    assert policy.stats() == {}
+
+    with pytest.raises(ClientException) as exc_info:
+        await good_async_client.get_workflow_handle("123").wait(0)
+    assert "Timeout must be between 1 and 3600 seconds" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._get_instance")
+async def test_async_wait_all(mock_get_instance, good_async_client):
+    statuses = _instances(
+        {
+            "1": [RUNNING, RUNNING, _completed("one")],
+            "2": [_completed("two")],
+            "3": [RUNNING, _completed("three")],
+        }
+    )
+
+    async def get_instance(instance_id):
+        return statuses(instance_id)
+
+    mock_get_instance.side_effect = get_instance
+    handles = [
+        good_async_client.get_workflow_handle(instance_id, polling_policy=FAST)
+        for instance_id in ["1", "2", "3"]
+    ]
+
+    assert await async_handles.wait_all(handles, timeout=5) == [
+        {"output": "one"},
+        {"output": "two"},
+        {"output": "three"},
+    ]
+
+
+@patch("tws._async.client.AsyncClient._get_instance")
+async def test_async_wait_all_failure(mock_get_instance, good_async_client):
+    statuses = _instances(
+        {"1": [RUNNING], "2": [{"status": "FAILED", "result": {"error": "boom"}}]}
+    )
+
+    async def get_instance(instance_id):
+        return statuses(instance_id)
+
+    mock_get_instance.side_effect = get_instance
+    handles = [
+        good_async_client.get_workflow_handle(instance_id, polling_policy=FAST)
+        for instance_id in ["1", "2"]
+    ]
+
+    # The failure is raised without waiting for the other workflow
+    with pytest.raises(ClientException) as exc_info:
+        await async_handles.wait_all(handles)
+
+    assert "Workflow execution failed" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("overall_timeout", [True, False])
+@patch("tws._async.client.AsyncClient._get_instance")
+async def test_async_as_completed(
+    mock_get_instance, good_async_client, overall_timeout
+):
+    statuses = _instances(
+        {
+            "slow": [RUNNING] * 5 + [_completed("slow")],
+            "fast": [_completed("fast")],
+            "stuck": [RUNNING],
+        }
+    )
+
+    async def get_instance(instance_id):
+        return statuses(instance_id)
+
+    mock_get_instance.side_effect = get_instance
+    handles = [
+        good_async_client.get_workflow_handle(
+            instance_id, timeout=1 if not overall_timeout else 600, polling_policy=FAST
+        )
+        for instance_id in ["slow", "fast", "stuck"]
+    ]
+
+    completed = []
+    timeout = 1 if overall_timeout else None
+    with pytest.raises(WorkflowTimeoutError):
+        async for handle in async_handles.as_completed(handles, timeout=timeout):
+            completed.append(handle.workflow_instance_id)
+
+    assert completed == ["fast", "slow"]
+
+
+@patch("tws._async.client.AsyncClient._get_instance")
+async def test_async_wait_any(mock_get_instance, good_async_client):
+    statuses = _instances({"stuck": [RUNNING], "fast": [RUNNING, _completed("fast")]})
+
+    async def get_instance(instance_id):
+        return statuses(instance_id)
+
+    mock_get_instance.side_effect = get_instance
+    handles = [
+        good_async_client.get_workflow_handle(instance_id, polling_policy=FAST)
+        for instance_id in ["stuck", "fast"]
+    ]
+
+    handle = await async_handles.wait_any(handles)
+
+    assert handle.workflow_instance_id == "fast"
+    assert await handle.wait() == {"output": "fast"}
+    # The wait on the unfinished workflow was cancelled
+    assert not handles[0].done
+
+    with pytest.raises(ClientException) as exc_info:
+        await async_handles.wait_any([])
+    assert "At least one workflow handle is required" in str(exc_info.value)
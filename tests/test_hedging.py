@@ -0,0 +1,229 @@
+import asyncio
+import gc
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import AsyncClient, Client, ClientException, HedgingPolicy, HedgingStats
+from tws.base.hedging import Hedger
+
+PARAMS = {"select": "status,result", "id": "eq.123"}
+
+
+def _warm_up(hedger, latency=0.01, count=20):
+    for _ in range(count):
+        hedger.record_latency(latency)
+
+
+def test_hedge_delay():
+    hedger = Hedger(HedgingPolicy(quantile=0.9, min_delay=0.05, min_samples=10))
+    _warm_up(hedger, latency=0.01, count=9)
+    assert hedger.delay() is None
+
+    hedger.record_latency(0.2)
+    for _ in range(10):
+        hedger.record_latency(0.1)
+    assert hedger.delay() == 0.1
+
+    hedger = Hedger(HedgingPolicy(min_delay=0.05))
+    _warm_up(hedger, latency=0.01)
+    assert hedger.delay() == 0.05
+
+
+def test_hedge_rate_is_capped():
+    hedger = Hedger(HedgingPolicy(max_hedge_rate=0.25))
+    hedges = 0
+    for _ in range(20):
+        hedger.delay()
+        hedges += hedger.try_hedge()
+
+    assert hedges == 5
+    assert hedger.stats() == HedgingStats(polls=20, hedges=5, hedge_wins=0)
+    assert hedger.stats().hedge_rate == 0.25
+
+
+@pytest.fixture
+def hedging_client():
+    policy = HedgingPolicy(max_hedge_rate=1, min_delay=0.05)
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, hedging=policy) as client:
+        _warm_up(client._hedger)
+        yield client
+
+
+def test_sync_slow_poll_is_hedged(hedging_client):
+    calls = []
+    lock = threading.Lock()
+
+    def make_request(method, uri, params):
+        with lock:
+            calls.append((method, uri, params))
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            return [{"status": "RUNNING"}]
+        return [{"status": "COMPLETED", "result": {"output": "hedge"}}]
+
+    with patch.object(hedging_client, "_make_request", side_effect=make_request):
+        start = time.monotonic()
+        instance = hedging_client._get_instance("123")
+
+    assert time.monotonic() - start < 0.4
+    assert instance == {"status": "COMPLETED", "result": {"output": "hedge"}}
+    assert calls == [("GET", "workflow_instances", PARAMS)] * 2
+    assert hedging_client.hedging_stats() == HedgingStats(1, 1, 1)
+
+
+def test_sync_fast_poll_is_not_hedged(hedging_client):
+    with patch.object(
+        hedging_client, "_make_request", return_value=[{"status": "RUNNING"}]
+    ) as mock_request:
+        assert hedging_client._get_instance("123") == {"status": "RUNNING"}
+
+    mock_request.assert_called_once()
+    assert hedging_client.hedging_stats() == HedgingStats(1, 0, 0)
+
+
+def test_sync_queued_poll_is_not_hedged(hedging_client):
+    # The hedge delay counts from when the poll is sent, not from when it is
+    # queued behind other polls
+    release = threading.Event()
+    executor = hedging_client._get_hedge_executor()
+    blockers = [executor.submit(release.wait) for _ in range(executor._max_workers)]
+    threading.Timer(0.2, release.set).start()
+
+    with patch.object(
+        hedging_client, "_make_request", return_value=[{"status": "RUNNING"}]
+    ) as mock_request:
+        assert hedging_client._get_instance("123") == {"status": "RUNNING"}
+
+    for blocker in blockers:
+        blocker.result()
+    mock_request.assert_called_once()
+    assert hedging_client.hedging_stats() == HedgingStats(1, 0, 0)
+
+
+def test_sync_hedge_executor_is_sized_for_the_workflows():
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, max_workers=3) as client:
+        assert client._get_hedge_executor()._max_workers == 6
+
+
+def test_sync_hedge_failure_falls_back_to_poll(hedging_client):
+    calls = []
+
+    def make_request(method, uri, params):
+        calls.append(uri)
+        if len(calls) == 1:
+            time.sleep(0.2)
+            return [{"status": "RUNNING"}]
+        raise ClientException("Request error occurred: Connection reset")
+
+    with patch.object(hedging_client, "_make_request", side_effect=make_request):
+        assert hedging_client._get_instance("123") == {"status": "RUNNING"}
+
+    assert hedging_client.hedging_stats() == HedgingStats(1, 1, 0)
+
+
+def test_sync_poll_errors_are_raised(hedging_client):
+    with patch.object(
+        hedging_client,
+        "_make_request",
+        side_effect=ClientException("Request error occurred: Connection refused"),
+    ):
+        with pytest.raises(ClientException) as exc_info:
+            hedging_client._get_instance("123")
+
+    assert "Connection refused" in str(exc_info.value)
+
+
+async def test_async_slow_poll_is_hedged():
+    policy = HedgingPolicy(max_hedge_rate=1, min_delay=0.05)
+    cancelled = asyncio.Event()
+    calls = 0
+
+    async def make_request(method, uri, params):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return [{"status": "COMPLETED", "result": {"output": "hedge"}}]
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, hedging=policy
+    ) as client:
+        _warm_up(client._hedger)
+        with patch.object(client, "_make_request", side_effect=make_request):
+            instance = await asyncio.wait_for(client._get_instance("123"), 1)
+
+        assert instance == {"status": "COMPLETED", "result": {"output": "hedge"}}
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert client.hedging_stats() == HedgingStats(1, 1, 1)
+
+
+async def test_async_losing_poll_is_awaited():
+    policy = HedgingPolicy(max_hedge_rate=1, min_delay=0.05)
+    calls = 0
+
+    async def make_request(method, uri, params):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                # The losing request fails rather than being cancelled
+                raise ClientException("Request error occurred: Connection reset")
+        return [{"status": "COMPLETED", "result": {"output": "hedge"}}]
+
+    loop = asyncio.get_running_loop()
+    errors = []
+    loop.set_exception_handler(lambda _, context: errors.append(context))
+    try:
+        async with AsyncClient(
+            GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, hedging=policy
+        ) as client:
+            _warm_up(client._hedger)
+            with patch.object(client, "_make_request", side_effect=make_request):
+                instance = await asyncio.wait_for(client._get_instance("123"), 1)
+
+        assert instance == {"status": "COMPLETED", "result": {"output": "hedge"}}
+        assert not [
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ]
+        gc.collect()
+        assert errors == []
+    finally:
+        loop.set_exception_handler(None)
+
+
+async def test_async_hedging_disabled_by_default():
+    async with AsyncClient(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        assert client.hedging_stats() is None
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"quantile": 0}, "Quantile must be between 0 and 1"],
+        [{"max_hedge_rate": 2}, "Max hedge rate must be between 0 and 1"],
+        [{"min_delay": -1}, "Min delay must be a non-negative number"],
+        [{"window_size": 0}, "Window size must be a positive integer"],
+        [{"min_samples": 200}, "Min samples must not exceed the window size"],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        HedgingPolicy(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+def test_client_hedging_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, hedging={})  # type: ignore
+    assert "Hedging must be a HedgingPolicy instance" in str(exc_info.value)
@@ -0,0 +1,97 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from tws import ClientException, LatencyModel
+
+
+def test_quantiles_and_stats():
+    model = LatencyModel()
+    for latency in range(1, 101):
+        model.record("workflow-id", latency)
+
+    assert model.count("workflow-id") == 100
+    assert model.count("other-id") == 0
+    assert model.quantiles("workflow-id", [0.5, 0.9, 1]) == [50, 90, 100]
+    assert model.quantiles("other-id", [0.5]) is None
+
+    stats = model.stats()
+    assert stats == {
+        "workflow-id": {
+            "count": 100,
+            "mean": 50.5,
+            "min": 1,
+            "max": 100,
+            "p50": 50,
+            "p90": 90,
+            "p99": 99,
+        }
+    }
+
+
+def test_sliding_window():
+    model = LatencyModel(max_samples=3)
+    for latency in [100, 1, 2, 3]:
+        model.record("workflow-id", latency)
+
+    assert model.count("workflow-id") == 3
+    assert model.stats()["workflow-id"]["max"] == 3
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "latency.json")
+    model = LatencyModel(path=path, autosave_every=2)
+    model.record("workflow-id", 1.5)
+    model.record("workflow-id", 2.5)
+
+    # Saved automatically after two samples
+    with open(path) as model_file:
+        assert json.load(model_file) == {"workflow-id": [1.5, 2.5]}
+
+    reloaded = LatencyModel(path=path)
+    assert reloaded.quantiles("workflow-id", [0.5, 1]) == [1.5, 2.5]
+
+    other_path = str(tmp_path / "other.json")
+    reloaded.save(other_path)
+    assert LatencyModel(path=other_path).count("workflow-id") == 2
+
+
+def test_save_without_path():
+    with pytest.raises(ClientException) as exc_info:
+        LatencyModel().save()
+    assert "No path configured for the latency model" in str(exc_info.value)
+
+
+def test_load_invalid_file(tmp_path):
+    path = tmp_path / "latency.json"
+    path.write_text("not json")
+
+    with pytest.raises(ClientException) as exc_info:
+        LatencyModel(path=str(path))
+    assert "Failed to load latency model" in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"max_samples": 0}, "Max samples must be a positive integer"],
+        [{"max_samples": True}, "Max samples must be a positive integer"],
+        [{"autosave_every": -1}, "Autosave interval must be a non-negative integer"],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        LatencyModel(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+def test_save_failure_leaves_no_partial_file(tmp_path):
+    model = LatencyModel()
+    model.record("workflow-id", 1)
+
+    with patch("tws.base.latency.json.dump", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            model.save(str(tmp_path / "latency.json"))
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,202 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import (
+    AdaptiveLimits,
+    AsyncClient,
+    Client,
+    ClientException,
+    ExponentialBackoff,
+    MetricsRegistry,
+    RateLimitPolicy,
+    RetryPolicy,
+)
+from tws.base.metrics import Histogram
+
+POLLING = ExponentialBackoff(initial_delay=0, min_delay=0.01, jitter=0)
+
+
+def _handler(statuses):
+    def handle(method, url, json=None, files=None, params=None, **kwargs):
+        request = httpx.Request(method, f"{GOOD_URL}{url}", json=json, files=files)
+        if url.endswith("users_private"):
+            body = [{"user_id": "user-1"}]
+        elif "/storage/" in url:
+            body = {"Key": "documents/user-1/file.txt"}
+        elif url.endswith("rpc/start_workflow"):
+            body = {"workflow_instance_id": "instance-1"}
+        else:
+            body = [{"id": "instance-1", "status": statuses.pop(0), "result": {"x": 1}}]
+        return httpx.Response(200, json=body, request=request)
+
+    return handle
+
+
+def test_histogram():
+    histogram = Histogram((1, 5, 10))
+    for value in (0.5, 1, 3, 7, 20):
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {
+        "buckets": {1: 2, 5: 3, 10: 4},
+        "count": 5,
+        "sum": 31.5,
+    }
+
+
+@patch("time.sleep")
+@patch("httpx.Client.request")
+def test_sync_client_metrics(mock_request, _, tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"x" * 1000)
+    mock_request.side_effect = _handler(["RUNNING", "RUNNING", "COMPLETED", "FAILED"])
+    metrics = MetricsRegistry()
+
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, metrics=metrics) as client:
+        client.run_workflow(
+            "workflow-id", {}, files={"file": str(path)}, polling_policy=POLLING
+        )
+        with pytest.raises(ClientException):
+            client.run_workflow("workflow-id", {}, polling_policy=POLLING)
+
+    snapshot = metrics.snapshot()
+    requests = snapshot["request_duration_seconds"]
+    assert sorted(requests) == [
+        "rpc/start_workflow",
+        "storage",
+        "users_private",
+        "workflow_instances",
+    ]
+    assert requests["workflow_instances"]["count"] == 4
+    assert requests["rpc/start_workflow"]["count"] == 2
+    assert snapshot["workflows_in_flight"] == 0
+    assert snapshot["polls_per_workflow"]["count"] == 1
+    assert snapshot["polls_per_workflow"]["buckets"][3] == 1
+    assert snapshot["polls_per_workflow"]["buckets"][2] == 0
+    assert snapshot["upload_bytes"] == 1000
+    assert snapshot["upload_duration_seconds"]["count"] == 1
+    assert snapshot["workflow_errors"] == {"WorkflowFailedError": 1}
+
+
+@patch("httpx.Client.request")
+def test_request_errors_are_counted(mock_request):
+    request = httpx.Request("GET", GOOD_URL)
+    mock_request.side_effect = [
+        httpx.ConnectError("Connection refused"),
+        httpx.Response(503, json=[], request=request),
+    ]
+    metrics = MetricsRegistry()
+
+    with Client(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        metrics=metrics,
+        retry_policy=RetryPolicy(max_attempts=1),
+    ) as client:
+        with pytest.raises(ClientException):
+            client._make_request("GET", "workflow_instances")
+        with pytest.raises(httpx.HTTPStatusError):
+            client._make_request("GET", "workflow_instances")
+
+    assert metrics.snapshot()["request_errors"] == {"ConnectError": 1, "http_503": 1}
+
+
+@patch("httpx.AsyncClient.request")
+async def test_async_request_latency_excludes_rate_limiting(mock_request):
+    handle = _handler(["RUNNING", "RUNNING"])
+
+    async def request(method, url, **kwargs):
+        return handle(method, url, **kwargs)
+
+    mock_request.side_effect = request
+    metrics = MetricsRegistry()
+    # The second poll waits a fifth of a second for the bucket to refill
+    rate_limit = RateLimitPolicy(polls=AdaptiveLimits(rate=5, burst=1))
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        metrics=metrics,
+        rate_limit=rate_limit,
+    ) as client:
+        for _ in range(2):
+            await client._make_request("GET", "workflow_instances")
+
+    requests = metrics.snapshot()["request_duration_seconds"]
+    assert requests["workflow_instances"]["count"] == 2
+    assert requests["workflow_instances"]["sum"] < 0.1
+
+
+@patch("httpx.AsyncClient.request")
+async def test_async_batch_polled_workflows_count_polls(mock_request):
+    handle = _handler(["RUNNING", "COMPLETED"])
+
+    async def request(method, url, **kwargs):
+        return handle(method, url, **kwargs)
+
+    mock_request.side_effect = request
+    metrics = MetricsRegistry()
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        metrics=metrics,
+        batch_polling=True,
+        batch_polling_window=0.01,
+    ) as client:
+        run = asyncio.ensure_future(
+            client.run_workflow("workflow-id", {}, polling_policy=POLLING)
+        )
+        await asyncio.sleep(0)
+        assert metrics.snapshot()["workflows_in_flight"] == 1
+        assert await asyncio.wait_for(run, 5) == {"x": 1}
+
+    snapshot = metrics.snapshot()
+    assert snapshot["workflows_in_flight"] == 0
+    assert snapshot["polls_per_workflow"]["sum"] == 2
+
+
+def test_prometheus_format():
+    metrics = MetricsRegistry(latency_buckets=(0.1, 1))
+    with metrics.request("rpc/start_workflow"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.workflow():
+            raise ValueError()
+
+    text = metrics.prometheus()
+
+    assert "# TYPE tws_request_duration_seconds histogram" in text
+    assert (
+        'tws_request_duration_seconds_bucket{endpoint="rpc/start_workflow",le="0.1"} 1'
+        in text
+    )
+    assert (
+        'tws_request_duration_seconds_bucket{endpoint="rpc/start_workflow",le="+Inf"} 1'
+        in text
+    )
+    assert 'tws_request_duration_seconds_count{endpoint="rpc/start_workflow"} 1' in text
+    assert "tws_workflows_in_flight 0" in text
+    assert 'tws_polls_per_workflow_bucket{le="+Inf"} 0' in text
+    assert 'tws_workflow_errors_total{type="ValueError"} 1' in text
+    assert text.endswith("\n")
+
+
+@pytest.mark.parametrize("buckets", [(), (1, 0.5), (0, 1), (1, 1), ("1",)])
+def test_validation(buckets):
+    with pytest.raises(ClientException) as exc_info:
+        MetricsRegistry(latency_buckets=buckets)
+    assert "Latency buckets must be increasing positive numbers" in str(exc_info.value)
+
+
+def test_client_metrics_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, metrics={})  # type: ignore
+    assert "Metrics must be a MetricsRegistry instance" in str(exc_info.value)
@@ -0,0 +1,167 @@
+from itertools import islice
+import random
+from unittest.mock import patch
+
+import pytest
+
+from tws import (
+    ClientException,
+    ExponentialBackoff,
+    FixedDelay,
+    LatencyModel,
+    LearnedPolling,
+)
+from tws.base.polling import completion_latency, resolve_polling_policy
+
+
+def test_fixed_delay():
+    delays = FixedDelay(2, initial_delay=0.5).delays("workflow-id")
+    assert list(islice(delays, 4)) == [0.5, 2, 2, 2]
+
+
+def test_exponential_backoff_without_jitter():
+    policy = ExponentialBackoff(
+        initial_delay=0.05, min_delay=0.25, max_delay=2, multiplier=2, jitter=0
+    )
+    delays = policy.delays("workflow-id")
+    assert list(islice(delays, 7)) == [0.05, 0.25, 0.5, 1, 2, 2, 2]
+
+
+def test_exponential_backoff_jitter_stays_in_bounds():
+    policy = ExponentialBackoff(
+        min_delay=0.5, max_delay=4, jitter=0.5, rng=random.Random(42)
+    )
+    delays = list(islice(policy.delays("workflow-id"), 50))[1:]
+    assert all(0.5 <= delay <= 4 for delay in delays)
+    # Jitter actually varies the delays once they reach the maximum
+    assert len(set(delays[-10:])) > 1
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"min_delay": 0}, "Minimum delay must be greater than 0"],
+        [{"max_delay": 61}, "Maximum delay must be greater than 0 and at most 60"],
+        [{"initial_delay": -1}, "Initial delay must be at least 0"],
+        [{"initial_delay": "1"}, "Initial delay must be at least 0"],
+        [
+            {"min_delay": 5, "max_delay": 1},
+            "Maximum delay must not be less than minimum delay",
+        ],
+        [{"multiplier": 0.5}, "Multiplier must be at least 1"],
+        [{"jitter": 2}, "Jitter must be between 0 and 1"],
+    ],
+)
+def test_exponential_backoff_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        ExponentialBackoff(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "args,exception_message",
+    [
+        [(0,), "Delay must be greater than 0 and at most 60 seconds"],
+        [(True,), "Delay must be greater than 0 and at most 60 seconds"],
+        [(1, 61), "Initial delay must be at least 0 and at most 60 seconds"],
+    ],
+)
+def test_fixed_delay_validation(args, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        FixedDelay(*args)
+    assert exception_message in str(exc_info.value)
+
+
+def test_resolve_polling_policy():
+    policy = ExponentialBackoff()
+    assert resolve_polling_policy(policy, 1) is policy
+
+    default = resolve_polling_policy(None, 3)
+    assert isinstance(default, FixedDelay)
+    assert default.delay == 3
+
+    with pytest.raises(ClientException) as exc_info:
+        resolve_polling_policy("not a policy", 1)  # type: ignore
+    assert "Polling policy must be a PollingPolicy instance" in str(exc_info.value)
+
+
+def test_learned_polling_uses_fallback_without_samples():
+    fallback = FixedDelay(3)
+    policy = LearnedPolling(fallback=fallback, min_samples=5)
+    for latency in range(4):
+        policy.record_completion("workflow-id", latency)
+
+    assert list(islice(policy.delays("workflow-id"), 3)) == [0, 3, 3]
+
+
+def test_learned_polling_schedules_around_quantiles():
+    model = LatencyModel()
+    for latency in range(1, 101):
+        model.record("workflow-id", latency / 10)
+
+    policy = LearnedPolling(
+        model=model,
+        fallback=FixedDelay(2),
+        min_samples=10,
+        quantiles=(0.5, 0.9, 0.99),
+    )
+    delays = list(islice(policy.delays("workflow-id"), 5))
+
+    # Polls at p50 (5.0s), p90 (9.0s) and p99 (9.9s), then every 2 seconds
+    assert delays == pytest.approx([5.0, 4.0, 0.9, 2, 2])
+    assert policy.stats()["workflow-id"]["p50"] == 5.0
+
+
+def test_learned_polling_splits_long_delays():
+    policy = LearnedPolling(
+        fallback=FixedDelay(1), min_samples=1, quantiles=(1,), max_delay=30
+    )
+    policy.record_completion("workflow-id", 70)
+
+    assert list(islice(policy.delays("workflow-id"), 4)) == [30, 30, 10, 1]
+
+
+def test_completion_latency_is_between_polls():
+    with patch("time.monotonic", return_value=12.0):
+        # Found running 1 second after the start, and complete 2 seconds after
+        assert completion_latency(10.0, 11.0) == 1.5
+        # Found complete on the first poll
+        assert completion_latency(10.0, None) == 1.0
+
+
+def test_learned_polling_converges_below_fallback_grid():
+    # Without samples, polls happen 0.1, 0.35, 0.85 and 1.85 seconds after the
+    # start, so every workflow taking 1 to 1.2 seconds is first found complete
+    # after 1.85 seconds
+    rng = random.Random(1)
+    policy = LearnedPolling(fallback=ExponentialBackoff(jitter=0))
+    for _ in range(300):
+        latency = rng.uniform(1.0, 1.2)
+        elapsed = 0.0
+        running_at = None
+        for delay in policy.delays("workflow-id"):
+            elapsed += delay
+            if elapsed >= latency:
+                break
+            running_at = elapsed
+        with patch("time.monotonic", return_value=elapsed):
+            policy.record_completion("workflow-id", completion_latency(0.0, running_at))
+
+    assert 1.0 <= policy.stats()["workflow-id"]["p50"] <= 1.2
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"min_samples": 0}, "Min samples must be a positive integer"],
+        [{"quantiles": ()}, "Quantiles must be between 0 and 1"],
+        [{"quantiles": (0.5, 1.5)}, "Quantiles must be between 0 and 1"],
+        [{"quantiles": (0.9, 0.5)}, "Quantiles must be in increasing order"],
+        [{"max_delay": 0}, "Maximum delay must be greater than 0"],
+        [{"fallback": "policy"}, "Fallback must be a PollingPolicy instance"],
+    ],
+)
+def test_learned_polling_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        LearnedPolling(**kwargs)
+    assert exception_message in str(exc_info.value)
@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+import pytest
+
+from tests.constants import BAD_SECRET_KEY, GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import (
+    AsyncClient,
+    AsyncClientPool,
+    Client,
+    ClientException,
+    ClientPool,
+    SessionOptions,
+)
+
+OTHER_SECRET_KEY = "987e6543-e21b-4d3c-9456-426614174999"
+THIRD_SECRET_KEY = "456e7890-e12b-4d3c-a456-426614174555"
+
+
+def test_clients_are_reused():
+    with ClientPool() as pool:
+        with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as first:
+            assert isinstance(first, Client)
+        with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL + "/") as second:
+            assert second is first
+        with pool.client(GOOD_PUBLIC_KEY, OTHER_SECRET_KEY, GOOD_URL) as other:
+            assert other is not first
+            assert other._user_id_cache is first._user_id_cache
+            assert other._shared_transport is first._shared_transport
+
+        stats = pool.stats()
+        assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 2, 0, 2)
+        assert stats.hit_rate == pytest.approx(1 / 3)
+
+
+def test_least_recently_used_client_is_evicted():
+    with ClientPool(max_clients=2) as pool:
+        with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as first:
+            pass
+        with pool.client(GOOD_PUBLIC_KEY, OTHER_SECRET_KEY, GOOD_URL):
+            pass
+        with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL):
+            pass
+
+        with patch.object(Client, "__exit__") as mock_exit:
+            with pool.client(GOOD_PUBLIC_KEY, THIRD_SECRET_KEY, GOOD_URL):
+                pass
+            # The second client was used least recently
+            mock_exit.assert_called_once_with(None, None, None)
+
+        with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+            assert client is first
+        assert pool.stats().evictions == 1
+        assert len(pool) == 2
+
+
+def test_clients_in_use_are_closed_when_released():
+    pool = ClientPool(max_clients=1)
+    with patch.object(Client, "__exit__") as mock_exit:
+        with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL):
+            with pool.client(GOOD_PUBLIC_KEY, OTHER_SECRET_KEY, GOOD_URL):
+                # The first client was evicted but is still in use
+                mock_exit.assert_not_called()
+            assert mock_exit.call_count == 0
+        assert mock_exit.call_count == 1
+
+        pool.close()
+        assert mock_exit.call_count == 2
+    assert len(pool) == 0
+
+
+def test_client_options_are_passed_on():
+    options = SessionOptions(read_timeout=30)
+    with ClientPool(session_options=options, max_concurrent_uploads=2) as pool:
+        with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+            assert client._session_options is options
+            assert client._max_concurrent_uploads == 2
+
+
+def test_malformed_credentials():
+    with ClientPool() as pool:
+        with pytest.raises(ClientException) as exc_info:
+            with pool.client(GOOD_PUBLIC_KEY, BAD_SECRET_KEY, GOOD_URL):
+                pass
+        assert "Malformed secret key" in str(exc_info.value)
+        assert len(pool) == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"max_clients": 0}, "Max clients must be a positive integer"],
+        [{"transport": {}}, "Transport must be a SharedTransport instance"],
+        [{"user_id_cache": {}}, "User ID cache must be a UserIdCache instance"],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        ClientPool(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+async def test_async_pool():
+    async with AsyncClientPool(max_clients=1) as pool:
+        async with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as first:
+            assert isinstance(first, AsyncClient)
+        async with pool.client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as second:
+            assert second is first
+
+        with patch.object(AsyncClient, "__aexit__") as mock_aexit:
+            async with pool.client(GOOD_PUBLIC_KEY, OTHER_SECRET_KEY, GOOD_URL):
+                mock_aexit.assert_awaited_once_with(None, None, None)
+
+        stats = pool.stats()
+        assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 2, 1, 1)
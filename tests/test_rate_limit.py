@@ -0,0 +1,202 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import (
+    AdaptiveLimits,
+    AsyncClient,
+    Client,
+    ClientException,
+    RateLimitPolicy,
+    RetryPolicy,
+)
+from tws._async.rate_limit import AsyncRateLimiter
+from tws._sync.rate_limit import RateLimiter
+from tws.base.rate_limit import POLLS, STARTS, UPLOADS, LimiterState, request_kind
+
+REQUEST = httpx.Request("POST", GOOD_URL)
+
+
+def _status_error(status, headers=None):
+    response = httpx.Response(status, headers=headers, request=REQUEST)
+    return httpx.HTTPStatusError("", request=REQUEST, response=response)
+
+
+def _acquire(state: LimiterState) -> int:
+    generation, _ = state.try_acquire()
+    assert generation is not None
+    return generation
+
+
+def test_request_kind():
+    assert request_kind("rest", "rpc/start_workflow") == STARTS
+    assert request_kind("rest", "workflow_instances") == POLLS
+    assert request_kind("storage", "object/documents/user/file.pdf") == UPLOADS
+    assert request_kind("rest", "users_private") is None
+
+
+def test_additive_increase_multiplicative_decrease():
+    state = LimiterState(AdaptiveLimits(initial_concurrency=4, max_concurrency=5))
+    generations = [_acquire(state) for _ in range(4)]
+    assert state.try_acquire() == (None, None)
+
+    for generation in generations:
+        state.release(generation, None)
+    assert state.limit == pytest.approx(5, abs=0.2)
+
+    # Requests in flight during a decrease do not decrease the limit again
+    first = _acquire(state)
+    second = _acquire(state)
+    state.release(first, _status_error(503))
+    state.release(second, _status_error(503))
+    assert state.limit == pytest.approx(2.5, abs=0.1)
+
+    # Client errors do not change the limit
+    generation = _acquire(state)
+    state.release(generation, _status_error(404))
+    assert state.limit == pytest.approx(2.5, abs=0.1)
+
+    for _ in range(5):
+        generation = _acquire(state)
+        state.release(generation, httpx.ReadTimeout(""))
+    assert state.limit == 1
+
+
+def test_token_bucket():
+    state = LimiterState(AdaptiveLimits(rate=10, burst=2))
+    assert state.try_acquire()[0] is not None
+    assert state.try_acquire()[0] is not None
+    generation, delay = state.try_acquire()
+    assert generation is None
+    assert delay is not None
+    assert 0 < delay <= 0.1
+
+    time.sleep(delay)
+    assert state.try_acquire()[0] is not None
+
+
+def test_retry_after_pauses_requests():
+    state = LimiterState(AdaptiveLimits())
+    generation = _acquire(state)
+    state.release(generation, _status_error(429, {"Retry-After": "5"}))
+
+    generation, delay = state.try_acquire()
+    assert generation is None
+    assert delay is not None
+    assert 4 < delay <= 5
+
+
+def test_sync_limiter_bounds_concurrency():
+    limiter = RateLimiter(AdaptiveLimits(initial_concurrency=3, max_concurrency=3))
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def request():
+        nonlocal in_flight, peak
+        with limiter.request():
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 3
+    assert limiter.limit == 3
+
+
+async def test_async_limiter_adapts_to_overload():
+    limiter = AsyncRateLimiter(AdaptiveLimits(initial_concurrency=8))
+    in_flight = 0
+    peak = 0
+
+    async def request(overloaded):
+        nonlocal in_flight, peak
+        async with limiter.request():
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if overloaded:
+                raise _status_error(429)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await asyncio.gather(*[request(True) for _ in range(8)])
+    assert limiter.limit == 4
+
+    await asyncio.gather(*[request(False) for _ in range(20)])
+    assert peak == 8
+    assert limiter.limit > 4
+
+
+@patch("httpx.Client.request")
+def test_sync_client_limits_starts(mock_request):
+    mock_request.return_value = httpx.Response(429, request=REQUEST)
+    policy = RateLimitPolicy(starts=AdaptiveLimits(initial_concurrency=8))
+
+    with Client(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        retry_policy=RetryPolicy(max_attempts=1),
+        rate_limit=policy,
+    ) as client:
+        with pytest.raises(ClientException):
+            client.start_workflow("workflow-id", {})
+        assert client._rate_limiters[STARTS].limit == 4
+        assert client._rate_limiters[POLLS].limit == 16
+
+
+@patch("httpx.AsyncClient.request")
+async def test_async_client_limits_polls(mock_request):
+    mock_request.return_value = httpx.Response(200, json=[], request=REQUEST)
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, rate_limit=RateLimitPolicy()
+    ) as client:
+        await client._make_request("GET", "workflow_instances")
+        assert client._rate_limiters[POLLS]._state.limit > 16
+        assert client._rate_limiters[STARTS]._state.limit == 16
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"rate": 0}, "Rate must be a positive number"],
+        [{"burst": 0}, "Burst must be a positive integer"],
+        [{"max_concurrency": 1.5}, "Max concurrency must be a positive integer"],
+        [
+            {"initial_concurrency": 300},
+            "Initial concurrency must be between min and max concurrency",
+        ],
+        [{"backoff": 1}, "Backoff must be between 0 and 1"],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        AdaptiveLimits(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+def test_policy_validation():
+    with pytest.raises(ClientException) as exc_info:
+        RateLimitPolicy(polls={})  # type: ignore
+    assert "Rate limits of polls must be an AdaptiveLimits instance" in str(
+        exc_info.value
+    )
+
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, rate_limit={})  # type: ignore
+    assert "Rate limit must be a RateLimitPolicy instance" in str(exc_info.value)
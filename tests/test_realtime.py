@@ -0,0 +1,513 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY  # noqa: E402
+from tests.realtime_server import FakeRealtimeServer  # noqa: E402
+from tws import AsyncClient, Client, ClientException, FixedDelay  # noqa: E402
+from tws._async.realtime import AsyncRealtimeListener  # noqa: E402
+import tws._sync as sync_handles  # noqa: E402
+from tws._sync.realtime import RealtimeListener  # noqa: E402
+from tws.base.realtime import (  # noqa: E402
+    RealtimeDisconnected,
+    join_message,
+    parse_instance_update,
+    parse_join_reply,
+    realtime_url,
+)
+
+RUNNING = [{"status": "RUNNING", "result": None}]
+COMPLETED = [{"status": "COMPLETED", "result": {"output": "polled"}}]
+
+
+@pytest.fixture
+def realtime_server():
+    with FakeRealtimeServer() as server:
+        yield server
+
+
+@pytest.mark.parametrize(
+    "api_url,expected",
+    [
+        [
+            "https://ref.supabase.co/",
+            "wss://ref.supabase.co/realtime/v1/websocket?apikey=key&vsn=1.0.0",
+        ],
+        [
+            "http://localhost:54321",
+            "ws://localhost:54321/realtime/v1/websocket?apikey=key&vsn=1.0.0",
+        ],
+    ],
+)
+def test_realtime_url(api_url, expected):
+    assert realtime_url(api_url, "key") == expected
+
+
+def test_parse_messages():
+    assert parse_join_reply('{"event": "phx_reply", "ref": "1"}', "2") is None
+    assert parse_join_reply("not json", "1") is None
+    assert parse_join_reply(join_message("1", "token"), "1") is None
+    assert (
+        parse_join_reply(
+            '{"event": "phx_reply", "ref": "1", "payload": {"status": "error"}}', "1"
+        )
+        is False
+    )
+    assert parse_instance_update('{"event": "heartbeat"}') is None
+    assert parse_instance_update("[]") is None
+    assert (
+        parse_instance_update(
+            '{"event": "postgres_changes", "payload": {"data": '
+            '{"table": "workflow_instances", "record": {"status": "DONE"}}}}'
+        )
+        is None
+    )
+
+
+def _realtime_client(api_url):
+    return Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, api_url, realtime=True)
+
+
+def _async_realtime_client(api_url):
+    return AsyncClient(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, api_url, realtime=True)
+
+
+def _run_in_thread(function):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = function()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_sync_realtime_notification(mock_request, mock_rpc, realtime_server):
+    polled = threading.Event()
+
+    def poll(method, uri, params=None):
+        polled.set()
+        return RUNNING
+
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = poll
+
+    with _realtime_client(realtime_server.api_url) as client:
+        assert client._realtime is not None
+        thread, outcome = _run_in_thread(
+            lambda: client.run_workflow("workflow-id", {"arg": "value"})
+        )
+        assert polled.wait(5)
+        # Unrelated and non-terminal updates are ignored
+        realtime_server.push_update({"id": "456", "status": "COMPLETED"})
+        realtime_server.push_update({"id": "123", "status": "RUNNING"})
+        realtime_server.push_update({"id": "123"}, table="other_table")
+        realtime_server.push_update(
+            {"id": "123", "status": "COMPLETED", "result": {"output": "pushed"}}
+        )
+        thread.join(5)
+
+    assert outcome == {"result": {"output": "pushed"}}
+    # Only the status check closing the subscription race was polled
+    assert mock_request.call_count == 1
+    assert realtime_server.messages[0]["payload"]["access_token"] == GOOD_PUBLIC_KEY
+
+
+def test_sync_realtime_heartbeat(realtime_server):
+    listener = RealtimeListener(
+        realtime_url(realtime_server.api_url, GOOD_PUBLIC_KEY),
+        GOOD_PUBLIC_KEY,
+        heartbeat_interval=0.01,
+    )
+    listener.connect()
+    try:
+        _wait_for_heartbeat(realtime_server)
+    finally:
+        listener.close()
+    assert not listener.connected
+
+
+async def test_async_realtime_heartbeat(realtime_server):
+    listener = AsyncRealtimeListener(
+        realtime_url(realtime_server.api_url, GOOD_PUBLIC_KEY),
+        GOOD_PUBLIC_KEY,
+        heartbeat_interval=0.01,
+    )
+    await listener.connect()
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None, _wait_for_heartbeat, realtime_server
+        )
+    finally:
+        await listener.aclose()
+    assert not listener.connected
+
+
+def _wait_for_heartbeat(realtime_server):
+    deadline = time.monotonic() + 5
+    while not any(m["event"] == "heartbeat" for m in realtime_server.messages):
+        assert time.monotonic() < deadline, "No heartbeat received"
+        time.sleep(0.01)
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_sync_realtime_fallback_on_disconnect(mock_request, mock_rpc, realtime_server):
+    polled = threading.Event()
+    responses = iter([RUNNING, RUNNING, COMPLETED])
+
+    def poll(method, uri, params=None):
+        polled.set()
+        return next(responses)
+
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = poll
+
+    with _realtime_client(realtime_server.api_url) as client:
+        thread, outcome = _run_in_thread(
+            lambda: client.run_workflow(
+                "workflow-id", {"arg": "value"}, polling_policy=FixedDelay(0.01)
+            )
+        )
+        assert polled.wait(5)
+        realtime_server.wait_for_subscribers()
+        realtime_server.drop_connections()
+        thread.join(5)
+
+    assert outcome == {"result": {"output": "polled"}}
+    assert mock_request.call_count == 3
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_sync_realtime_already_completed(mock_request, mock_rpc, realtime_server):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = COMPLETED
+
+    with _realtime_client(realtime_server.api_url) as client:
+        result = client.run_workflow("workflow-id", {"arg": "value"})
+
+    assert result == {"output": "polled"}
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_sync_realtime_timeout(mock_request, mock_rpc, realtime_server):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = RUNNING
+
+    with _realtime_client(realtime_server.api_url) as client:
+        with pytest.raises(Exception) as exc_info:
+            client.run_workflow("workflow-id", {"arg": "value"}, timeout=1)
+
+    assert "Workflow execution timed out after 1 seconds" in str(exc_info.value)
+
+
+@patch("tws._sync.client.SyncClient._make_request")
+def test_sync_realtime_wait_any_stops_other_waits(mock_request, realtime_server):
+    def poll(method, uri, params):
+        if params["id"] == "eq.fast":
+            return COMPLETED
+        return RUNNING
+
+    mock_request.side_effect = poll
+
+    with _realtime_client(realtime_server.api_url) as client:
+        handles = [
+            client.get_workflow_handle(instance_id) for instance_id in ["123", "fast"]
+        ]
+        assert sync_handles.wait_any(handles).workflow_instance_id == "fast"
+        assert client._realtime is not None
+
+        # The wait for a notification on the other workflow gives up shortly
+        deadline = time.monotonic() + 5
+        while client._realtime._watches and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not client._realtime._watches
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_sync_realtime_unavailable(mock_request, mock_rpc):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = [RUNNING, COMPLETED, COMPLETED]
+
+    with FakeRealtimeServer(reject=True) as server:
+        api_url = server.api_url
+        with _realtime_client(api_url) as client:
+            result = client.run_workflow(
+                "workflow-id", {"arg": "value"}, polling_policy=FixedDelay(0.01)
+            )
+            assert result == {"output": "polled"}
+            assert client._realtime is not None
+            assert not client._realtime.connected
+
+            # Connection attempts are not retried on every workflow
+            with patch.object(client._realtime, "connect") as mock_connect:
+                client.run_workflow("workflow-id", {"arg": "value"})
+            mock_connect.assert_not_called()
+
+    with _realtime_client(api_url) as client:
+        # The server is gone, connecting fails outright
+        with patch("tws._sync.client.SyncClient._make_request") as mock_poll:
+            mock_poll.return_value = COMPLETED
+            assert client.run_workflow("workflow-id", {"arg": "value"}) == {
+                "output": "polled"
+            }
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_async_realtime_notification(mock_request, mock_rpc, realtime_server):
+    polled = asyncio.Event()
+
+    async def poll(method, uri, params=None):
+        polled.set()
+        return RUNNING
+
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = poll
+
+    async with _async_realtime_client(realtime_server.api_url) as client:
+        assert client._realtime is not None
+        task = asyncio.ensure_future(
+            client.run_workflow("workflow-id", {"arg": "value"})
+        )
+        await asyncio.wait_for(polled.wait(), 5)
+        realtime_server.push_update({"id": "123", "status": "RUNNING"})
+        realtime_server.push_update(
+            {"id": "123", "status": "COMPLETED", "result": {"output": "pushed"}}
+        )
+        result = await asyncio.wait_for(task, 5)
+
+    assert result == {"output": "pushed"}
+    assert mock_request.call_count == 1
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_async_realtime_fallback_on_disconnect(
+    mock_request, mock_rpc, realtime_server
+):
+    polled = asyncio.Event()
+    responses = iter([RUNNING, RUNNING, COMPLETED])
+
+    async def poll(method, uri, params=None):
+        polled.set()
+        return next(responses)
+
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = poll
+
+    async with _async_realtime_client(realtime_server.api_url) as client:
+        task = asyncio.ensure_future(
+            client.run_workflow(
+                "workflow-id", {"arg": "value"}, polling_policy=FixedDelay(0.01)
+            )
+        )
+        await asyncio.wait_for(polled.wait(), 5)
+        # The closing handshake needs the event loop, don't block it
+        await asyncio.get_running_loop().run_in_executor(
+            None, realtime_server.drop_connections
+        )
+        result = await asyncio.wait_for(task, 5)
+
+    assert result == {"output": "polled"}
+    assert mock_request.call_count == 3
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_async_realtime_fallback_to_batch_polling(
+    mock_request, mock_rpc, realtime_server
+):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = [
+        RUNNING,
+        [{"id": "123", "status": "COMPLETED", "result": {"output": "batched"}}],
+    ]
+
+    client = AsyncClient(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        realtime_server.api_url,
+        realtime=True,
+        batch_polling=True,
+    )
+    async with client:
+        task = asyncio.ensure_future(
+            client.run_workflow("workflow-id", {"arg": "value"})
+        )
+        while mock_request.call_count == 0:
+            await asyncio.sleep(0.01)
+        # The closing handshake needs the event loop, don't block it
+        await asyncio.get_running_loop().run_in_executor(
+            None, realtime_server.drop_connections
+        )
+        result = await asyncio.wait_for(task, 5)
+
+    assert result == {"output": "batched"}
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_async_realtime_timeout(mock_request, mock_rpc, realtime_server):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = RUNNING
+
+    with pytest.raises(Exception) as exc_info:
+        async with _async_realtime_client(realtime_server.api_url) as client:
+            await client.run_workflow("workflow-id", {"arg": "value"}, timeout=1)
+
+    assert "Workflow execution timed out after 1 seconds" in str(exc_info.value)
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_async_realtime_unavailable(mock_request, mock_rpc):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = COMPLETED
+
+    with FakeRealtimeServer(reject=True) as server:
+        api_url = server.api_url
+        async with _async_realtime_client(api_url) as client:
+            assert await client.run_workflow("workflow-id", {"arg": "value"}) == {
+                "output": "polled"
+            }
+            assert client._realtime is not None
+            assert not client._realtime.connected
+
+            with patch.object(client._realtime, "connect") as mock_connect:
+                await client.run_workflow("workflow-id", {"arg": "value"})
+            mock_connect.assert_not_called()
+
+    async with _async_realtime_client(api_url) as client:
+        # The server is gone, connecting fails outright
+        assert await client.run_workflow("workflow-id", {"arg": "value"}) == {
+            "output": "polled"
+        }
+
+
+def test_sync_realtime_subscription_timeout():
+    with FakeRealtimeServer(silent=True) as server:
+        listener = RealtimeListener(
+            realtime_url(server.api_url, GOOD_PUBLIC_KEY),
+            GOOD_PUBLIC_KEY,
+            connect_timeout=0.1,
+        )
+        with pytest.raises(ClientException) as exc_info:
+            listener.connect()
+
+    assert "Realtime connection failed" in str(exc_info.value)
+    assert not listener.connected
+
+
+async def test_async_realtime_subscription_timeout():
+    with FakeRealtimeServer(silent=True) as server:
+        listener = AsyncRealtimeListener(
+            realtime_url(server.api_url, GOOD_PUBLIC_KEY),
+            GOOD_PUBLIC_KEY,
+            connect_timeout=0.1,
+        )
+        with pytest.raises(ClientException) as exc_info:
+            await listener.connect()
+
+    assert "Realtime connection failed" in str(exc_info.value)
+    assert not listener.connected
+
+
+@pytest.mark.parametrize("code", [1000, 1011])
+async def test_async_realtime_connection_lost(realtime_server, code):
+    listener = AsyncRealtimeListener(
+        realtime_url(realtime_server.api_url, GOOD_PUBLIC_KEY), GOOD_PUBLIC_KEY
+    )
+    await listener.connect()
+    watch = listener.watch("123")
+    await asyncio.get_running_loop().run_in_executor(
+        None, realtime_server.drop_connections, code
+    )
+
+    with pytest.raises(RealtimeDisconnected):
+        await asyncio.wait_for(watch, 5)
+    assert not listener.connected
+    with pytest.raises(RealtimeDisconnected):
+        listener.watch("123")
+    await listener.aclose()
+
+
+@pytest.mark.parametrize("code", [1000, 1011])
+def test_sync_realtime_connection_lost(realtime_server, code):
+    listener = RealtimeListener(
+        realtime_url(realtime_server.api_url, GOOD_PUBLIC_KEY), GOOD_PUBLIC_KEY
+    )
+    listener.connect()
+    watch = listener.watch("123")
+    realtime_server.drop_connections(code)
+
+    with pytest.raises(RealtimeDisconnected):
+        watch.result(timeout=5)
+    assert not listener.connected
+    with pytest.raises(RealtimeDisconnected):
+        listener.watch("123")
+    listener.close()
+
+
+@patch("tws._async.client.AsyncClient._make_rpc_request")
+@patch("tws._async.client.AsyncClient._make_request")
+async def test_async_realtime_already_completed(
+    mock_request, mock_rpc, realtime_server
+):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = COMPLETED
+
+    async with _async_realtime_client(realtime_server.api_url) as client:
+        result = await client.run_workflow("workflow-id", {"arg": "value"})
+
+    assert result == {"output": "polled"}
+
+
+async def test_async_realtime_heartbeat_failure(realtime_server):
+    listener = AsyncRealtimeListener(
+        realtime_url(realtime_server.api_url, GOOD_PUBLIC_KEY),
+        GOOD_PUBLIC_KEY,
+        heartbeat_interval=0.01,
+    )
+    await listener.connect()
+    heartbeat = [
+        task
+        for task in listener._tasks
+        if task.get_coro().__name__ == "_heartbeat"  # type: ignore
+    ][0]
+    with patch.object(listener._websocket, "send", side_effect=OSError("broken")):
+        # A failed heartbeat ends the heartbeat task without raising
+        await asyncio.wait_for(heartbeat, 5)
+    await listener.aclose()
+
+
+def test_sync_realtime_heartbeat_failure(realtime_server):
+    listener = RealtimeListener(
+        realtime_url(realtime_server.api_url, GOOD_PUBLIC_KEY),
+        GOOD_PUBLIC_KEY,
+        heartbeat_interval=0.01,
+    )
+    listener.connect()
+    sent = threading.Event()
+
+    def send(message):
+        sent.set()
+        raise OSError("broken")
+
+    with patch.object(listener._websocket, "send", side_effect=send):
+        assert sent.wait(5)
+    listener.close()
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+import httpx
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import (
+    AsyncClient,
+    Client,
+    ExponentialBackoff,
+    MetricsRegistry,
+    ResultCache,
+    RunReport,
+)
+
+POLLING = ExponentialBackoff(initial_delay=0, min_delay=0.01, jitter=0)
+
+
+def _handler(statuses):
+    def handle(method, url, json=None, files=None, **kwargs):
+        request = httpx.Request(method, f"{GOOD_URL}{url}", json=json, files=files)
+        if url.endswith("users_private"):
+            body = [{"user_id": "user-1"}]
+        elif "/storage/" in url:
+            body = {"Key": "documents/user-1/file.txt"}
+        elif url.endswith("rpc/start_workflow"):
+            body = {"workflow_instance_id": "instance-1"}
+        else:
+            body = [{"id": "instance-1", "status": statuses.pop(0), "result": {}}]
+        return httpx.Response(200, json=body, request=request)
+
+    return handle
+
+
+def _check_report(report):
+    assert isinstance(report, RunReport)
+    assert report.workflow_instance_id == "instance-1"
+    assert list(report.upload_seconds) == ["file"]
+    assert report.start_seconds is not None
+    assert report.time_to_first_poll is not None
+    assert report.polls == 3
+    assert report.wasted_polls == 2
+    assert report.bytes_sent > 1000
+    assert report.bytes_received > 0
+    assert report.total_seconds >= sum(report.upload_seconds.values())
+    assert not report.cached
+
+
+@patch("time.sleep")
+@patch("httpx.Client.request")
+def test_sync_run_report(mock_request, _, tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"x" * 1000)
+    mock_request.side_effect = _handler(["RUNNING", "RUNNING", "COMPLETED"])
+
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        result, report = client.run_workflow(
+            "workflow-id",
+            {},
+            files={"file": str(path)},
+            polling_policy=POLLING,
+            return_report=True,
+        )
+
+    assert result == {}
+    _check_report(report)
+
+
+@patch("httpx.AsyncClient.request")
+async def test_async_batch_polled_run_report(mock_request, tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"x" * 1000)
+    handle = _handler(["RUNNING", "RUNNING", "COMPLETED"])
+
+    async def request(method, url, content=None, headers=None, **kwargs):
+        response = handle(method, url, **kwargs)
+        if content is not None:
+            assert headers is not None
+            response.request.headers["Content-Length"] = headers["Content-Length"]
+        return response
+
+    mock_request.side_effect = request
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        batch_polling=True,
+        batch_polling_window=0.01,
+    ) as client:
+        result, report = await client.run_workflow(
+            "workflow-id",
+            {},
+            files={"file": str(path)},
+            polling_policy=POLLING,
+            return_report=True,
+        )
+
+    assert result == {}
+    _check_report(report)
+
+
+@patch("time.sleep")
+@patch("httpx.Client.request")
+def test_cached_run_report(mock_request, _, tmp_path):
+    mock_request.side_effect = _handler(["COMPLETED"])
+    metrics = MetricsRegistry()
+
+    with Client(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        result_cache=ResultCache(path=str(tmp_path / "results.db")),
+        metrics=metrics,
+    ) as client:
+        _, first = client.run_workflow("workflow-id", {}, return_report=True)
+        _, second = client.run_workflow("workflow-id", {}, return_report=True)
+        assert client.run_workflow("workflow-id", {}) == {}
+
+    assert (first.polls, first.wasted_polls, first.cached) == (1, 0, False)
+    assert second == RunReport(
+        workflow_instance_id=None, total_seconds=second.total_seconds, cached=True
+    )
+    # Cached results were not polled for
+    assert metrics.snapshot()["polls_per_workflow"]["count"] == 1
@@ -0,0 +1,154 @@
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from tws import ClientException, ResultCache
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "reference.pdf"
+    path.write_bytes(b"reference document")
+    return str(path)
+
+
+def test_key_is_canonical():
+    cache = ResultCache()
+    key = cache.key("workflow-id", {"a": 1, "b": [1, 2]}, "user-1")
+
+    assert cache.key("workflow-id", {"b": [1, 2], "a": 1}, "user-1") == key
+    assert cache.key("workflow-id", {"a": 1, "b": [2, 1]}, "user-1") != key
+    assert cache.key("other-id", {"a": 1, "b": [1, 2]}, "user-1") != key
+    assert cache.key("workflow-id", {"a": 1, "b": [1, 2]}, "user-2") != key
+
+
+def test_key_depends_on_file_contents(document, tmp_path):
+    cache = ResultCache()
+    key = cache.key("workflow-id", {}, "user-1", {"doc": document})
+
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(b"reference document")
+    assert cache.key("workflow-id", {}, "user-1", {"doc": str(copy)}) == key
+    assert cache.key("workflow-id", {}, "user-1", {"other": str(copy)}) != key
+
+    with open(document, "wb") as f:
+        f.write(b"updated document")
+    os.utime(document, ns=(0, 0))
+    assert cache.key("workflow-id", {}, "user-1", {"doc": document}) != key
+
+
+def test_key_errors(tmp_path):
+    cache = ResultCache()
+    with pytest.raises(ClientException) as exc_info:
+        cache.key("workflow-id", {}, "user-1", {"doc": str(tmp_path / "missing.pdf")})
+    assert "File not found" in str(exc_info.value)
+
+    with pytest.raises(ClientException) as exc_info:
+        cache.key("workflow-id", {"arg": object()}, "user-1")
+    assert "Workflow arguments cannot be cached" in str(exc_info.value)
+
+
+def test_get_returns_copies():
+    cache = ResultCache()
+    assert cache.get("key") is None
+
+    cache.put("key", {"output": ["a"]})
+    result = cache.get("key")
+    assert result is not None
+    assert result == {"output": ["a"]}
+    result["output"].append("b")
+    assert cache.get("key") == {"output": ["a"]}
+
+    cache.invalidate("key")
+    assert cache.get("key") is None
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+@patch("tws.base.store.time.time")
+def test_expired_results_are_not_returned(mock_time, tmp_path):
+    cache = ResultCache(ttl=10, path=str(tmp_path / "results.db"))
+    mock_time.return_value = 100
+    cache.put("key", {"output": "success"})
+
+    mock_time.return_value = 109
+    assert cache.get("key") == {"output": "success"}
+    mock_time.return_value = 110
+    assert cache.get("key") is None
+    assert ResultCache(ttl=10, path=cache.path).get("key") is None
+
+
+def test_database_is_shared(tmp_path):
+    path = str(tmp_path / "results.db")
+    ResultCache(path=path).put("key", {"output": "success"})
+
+    other = ResultCache(path=path)
+    assert other.get("key") == {"output": "success"}
+
+    other.clear()
+    assert ResultCache(path=path).get("key") is None
+
+
+def test_unavailable_database(tmp_path):
+    cache = ResultCache(path=str(tmp_path / "results.db"))
+    cache.put("first", {"output": 1})
+    cache.put("second", {"output": 2})
+
+    # A locked or read-only database only costs persistence
+    with patch(
+        "tws.base.store.sqlite3.connect",
+        side_effect=sqlite3.OperationalError("database is locked"),
+    ):
+        cache.put("third", {"output": 3})
+        assert cache.get("third") == {"output": 3}
+        cache.invalidate("first")
+        assert cache.get("first") is None
+        cache.clear()
+        assert len(cache) == 0
+
+
+@patch("tws.base.store.time.time")
+def test_database_size_is_bounded(mock_time, tmp_path):
+    path = str(tmp_path / "results.db")
+    cache = ResultCache(path=path, max_disk_bytes=25)
+    for index, key in enumerate(["a", "b", "c"]):
+        mock_time.return_value = index
+        cache.put(key, "x" * 8)  # 10 bytes encoded
+    cache.put("huge", "x" * 100)
+
+    other = ResultCache(path=path)
+    assert [other.get(key) for key in ["a", "b", "c", "huge"]] == [
+        None,
+        "x" * 8,
+        "x" * 8,
+        None,
+    ]
+    # Results too large for the database are still kept in memory
+    assert cache.get("huge") == "x" * 100
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"max_entries": 0}, "Max entries must be a positive integer"],
+        [{"ttl": -1}, "TTL must be a positive number of seconds"],
+        [{"max_disk_bytes": 0}, "Max disk bytes must be a positive integer"],
+        [{"max_disk_bytes": 1.5}, "Max disk bytes must be a positive integer"],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        ResultCache(**kwargs)
+    assert exception_message in str(exc_info.value)
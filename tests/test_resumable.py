@@ -0,0 +1,229 @@
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tests.storage_server import FakeStorageServer
+from tws import AsyncClient, Client, ClientException
+from tws.base.resumable import (
+    is_retryable,
+    plan_segments,
+    supports_concatenation,
+    upload_metadata,
+)
+
+PART_SIZE = 1024
+REQUEST = httpx.Request("PATCH", GOOD_URL)
+
+
+@pytest.fixture(autouse=True)
+def small_parts():
+    with patch("tws._sync.client.RESUMABLE_PART_SIZE", PART_SIZE):
+        with patch("tws._async.client.RESUMABLE_PART_SIZE", PART_SIZE):
+            with patch("tws.base.resumable.RESUMABLE_RETRY_DELAY", 0):
+                yield
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(os.urandom(10 * PART_SIZE + 100))
+    return path
+
+
+def make_client(client_class, server, **kwargs):
+    client = client_class(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        server.api_url,
+        resumable_upload_threshold=PART_SIZE,
+        **kwargs,
+    )
+    client.user_id = "test-user"
+    return client
+
+
+def stored_object(server):
+    [(name, data)] = server.objects.items()
+    assert name.startswith("documents/test-user/")
+    assert name.endswith("-scan.pdf")
+    return name[len("documents/") :], data
+
+
+def test_plan_segments():
+    assert plan_segments(10, 4, 1) == [(0, 10)]
+    assert plan_segments(10, 4, 2) == [(0, 8), (8, 2)]
+    assert plan_segments(10, 4, 8) == [(0, 4), (4, 4), (8, 2)]
+    assert plan_segments(8, 4, 8) == [(0, 4), (4, 4)]
+
+
+def test_upload_metadata():
+    assert upload_metadata("documents", "user/report.pdf") == (
+        "bucketName ZG9jdW1lbnRz,"
+        "objectName dXNlci9yZXBvcnQucGRm,"
+        "contentType YXBwbGljYXRpb24vcGRm"
+    )
+
+
+def test_supports_concatenation():
+    def options(extensions):
+        return httpx.Response(204, headers={"Tus-Extension": extensions})
+
+    assert supports_concatenation(options("creation, concatenation"))
+    assert not supports_concatenation(options("creation,termination"))
+    assert not supports_concatenation(httpx.Response(204))
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    [
+        [httpx.ReadError("connection reset"), True],
+        [httpx.ConnectTimeout("timed out"), True],
+        [
+            httpx.HTTPStatusError("", request=REQUEST, response=httpx.Response(409)),
+            True,
+        ],
+        [
+            httpx.HTTPStatusError("", request=REQUEST, response=httpx.Response(503)),
+            True,
+        ],
+        [
+            httpx.HTTPStatusError("", request=REQUEST, response=httpx.Response(403)),
+            False,
+        ],
+        [ValueError("bad"), False],
+    ],
+)
+def test_is_retryable(error, expected):
+    assert is_retryable(error) is expected
+
+
+def test_sync_resumable_upload(large_file):
+    with FakeStorageServer() as server:
+        with make_client(Client, server) as client:
+            file_path = client._upload_file(str(large_file))
+
+    assert (file_path, large_file.read_bytes()) == stored_object(server)
+    patches = [offset for method, offset in server.requests if method == "PATCH"]
+    assert patches == list(range(0, large_file.stat().st_size, PART_SIZE))
+
+
+def test_sync_resumable_upload_resumes_after_interruption(large_file):
+    with FakeStorageServer(interrupt={3, 4}) as server:
+        with make_client(Client, server) as client:
+            file_path = client._upload_file(str(large_file))
+
+    assert (file_path, large_file.read_bytes()) == stored_object(server)
+    # The upload continues from the bytes the server kept, not from the start
+    requests = server.requests[4:9]
+    assert requests == [
+        ("PATCH", 3 * PART_SIZE),
+        ("HEAD", 3 * PART_SIZE + PART_SIZE // 2),
+        ("PATCH", 3 * PART_SIZE + PART_SIZE // 2),
+        ("HEAD", 3 * PART_SIZE + PART_SIZE * 3 // 4),
+        ("PATCH", 3 * PART_SIZE + PART_SIZE * 3 // 4),
+    ]
+
+
+def test_sync_resumable_upload_gives_up(large_file):
+    with FakeStorageServer(interrupt=set(range(100))) as server:
+        with make_client(Client, server) as client:
+            with pytest.raises(ClientException) as exc_info:
+                client._upload_file(str(large_file))
+
+    assert "Resumable upload failed after 5 attempts" in str(exc_info.value)
+    assert server.objects == {}
+
+
+def test_sync_resumable_upload_in_parallel(large_file):
+    with FakeStorageServer(concatenation=True, interrupt={2}) as server:
+        with make_client(Client, server, max_concurrent_uploads=3) as client:
+            file_path = client._upload_file(str(large_file))
+
+    assert (file_path, large_file.read_bytes()) == stored_object(server)
+    # Three partial uploads, and the final upload joining them
+    assert [request for request in server.requests if request[0] == "POST"] == [
+        ("POST", str(upload_id)) for upload_id in range(4)
+    ]
+
+
+@patch("tws._sync.client.SyncClient._make_request")
+def test_sync_small_files_use_single_request(mock_request, tmp_path):
+    small_file = tmp_path / "small.txt"
+    small_file.write_bytes(b"small")
+    mock_request.return_value = {"Key": "documents/test-user/1-small.txt"}
+
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        client.user_id = "test-user"
+        assert client._upload_file(str(small_file)) == "test-user/1-small.txt"
+    assert mock_request.call_args[0][1].startswith("object/documents/test-user/")
+
+
+async def test_async_resumable_upload_resumes_after_interruption(large_file):
+    with FakeStorageServer(interrupt={3}) as server:
+        async with make_client(AsyncClient, server) as client:
+            file_path = await client._upload_file(str(large_file))
+
+    assert (file_path, large_file.read_bytes()) == stored_object(server)
+    assert server.requests[4:7] == [
+        ("PATCH", 3 * PART_SIZE),
+        ("HEAD", 3 * PART_SIZE + PART_SIZE // 2),
+        ("PATCH", 3 * PART_SIZE + PART_SIZE // 2),
+    ]
+
+
+async def test_async_resumable_upload_in_parallel(large_file):
+    with FakeStorageServer(concatenation=True, interrupt={5}) as server:
+        async with make_client(AsyncClient, server, max_concurrent_uploads=4) as client:
+            file_path = await client._upload_file(str(large_file))
+
+    assert (file_path, large_file.read_bytes()) == stored_object(server)
+    assert len([request for request in server.requests if request[0] == "POST"]) == 5
+
+
+def test_sync_resumable_segments_share_upload_slots(large_file):
+    with FakeStorageServer(concatenation=True) as server:
+        with make_client(Client, server, max_concurrent_uploads=3) as client:
+            # Another upload in progress holds one of the slots, and the file
+            # itself another
+            with client._upload_slots:
+                uploaded = client._upload_files({"file": str(large_file)})
+
+    assert (uploaded["file"], large_file.read_bytes()) == stored_object(server)
+    # Two partial uploads, and the final upload joining them
+    assert len([request for request in server.requests if request[0] == "POST"]) == 3
+
+
+async def test_async_resumable_segments_share_upload_slots(large_file):
+    with FakeStorageServer(concatenation=True) as server:
+        async with make_client(AsyncClient, server, max_concurrent_uploads=4) as client:
+            async with client._get_upload_semaphore():
+                uploaded = await client._upload_files({"file": str(large_file)})
+            # The segments' slots are given back
+            assert not client._get_upload_semaphore().locked()
+
+    assert (uploaded["file"], large_file.read_bytes()) == stored_object(server)
+    assert len([request for request in server.requests if request[0] == "POST"]) == 4
+
+
+async def test_async_resumable_upload_gives_up(large_file):
+    with FakeStorageServer(concatenation=True, interrupt=set(range(100))) as server:
+        async with make_client(AsyncClient, server, max_concurrent_uploads=2) as client:
+            with pytest.raises(ClientException) as exc_info:
+                await client._upload_file(str(large_file))
+
+    assert "Resumable upload failed after 5 attempts" in str(exc_info.value)
+    assert server.objects == {}
+
+
+@pytest.mark.parametrize("client_class", [Client, AsyncClient])
+def test_resumable_upload_threshold_validation(client_class):
+    with pytest.raises(ClientException) as exc_info:
+        client_class(
+            GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, resumable_upload_threshold=0
+        )
+    assert "Resumable upload threshold must be a positive integer" in str(
+        exc_info.value
+    )
@@ -0,0 +1,209 @@
+from email.utils import formatdate
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import AsyncClient, Client, ClientException, RetryPolicy
+from tws.base.retry import RetryBudget, retry_after
+
+REQUEST = httpx.Request("GET", GOOD_URL)
+
+
+def _response(status, headers=None, json=None):
+    return httpx.Response(status, headers=headers, json=json, request=REQUEST)
+
+
+def _status_error(status, headers=None):
+    response = _response(status, headers)
+    return httpx.HTTPStatusError("", request=REQUEST, response=response)
+
+
+@pytest.mark.parametrize(
+    "error,method,retried",
+    [
+        [httpx.ReadTimeout(""), "GET", True],
+        [httpx.RemoteProtocolError(""), "GET", True],
+        [httpx.ReadTimeout(""), "POST", False],
+        [httpx.ConnectError(""), "POST", True],
+        [httpx.PoolTimeout(""), "POST", True],
+        [_status_error(502), "GET", True],
+        [_status_error(502), "POST", False],
+        [_status_error(503), "POST", True],
+        [_status_error(429), "POST", True],
+        [_status_error(404), "GET", False],
+        [httpx.DecodingError(""), "GET", False],
+        [ValueError(), "GET", False],
+    ],
+)
+def test_retryable_errors(error, method, retried):
+    assert (RetryPolicy().delay(error, method, 1) is not None) == retried
+
+
+def test_exponential_backoff():
+    policy = RetryPolicy(
+        max_attempts=5, initial_delay=1, max_delay=5, multiplier=3, jitter=False
+    )
+    error = httpx.ConnectError("")
+    assert [policy.delay(error, "GET", attempt) for attempt in range(1, 6)] == [
+        1,
+        3,
+        5,
+        5,
+        None,
+    ]
+
+    jittered = RetryPolicy(initial_delay=2)
+    delay = jittered.delay(error, "GET", 1)
+    assert delay is not None
+    assert 1 <= delay <= 2
+
+
+def test_retry_after():
+    assert retry_after(_response(503, {"Retry-After": "7"})) == 7
+    assert retry_after(_response(503)) is None
+    assert retry_after(_response(503, {"Retry-After": "soon"})) is None
+    date = formatdate(time.time() + 60, usegmt=True)
+    delay = retry_after(_response(503, {"Retry-After": date}))
+    assert delay is not None
+    assert 55 < delay <= 60
+
+    policy = RetryPolicy(max_delay=10)
+    assert policy.delay(_status_error(429, {"Retry-After": "7"}), "POST", 1) == 7
+    # Waiting longer than the policy allows fails the request instead
+    assert policy.delay(_status_error(429, {"Retry-After": "60"}), "POST", 1) is None
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, min_retries=2)
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+    # Unused retries do not accumulate beyond the minimum
+    for _ in range(10):
+        budget.deposit()
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+@patch("tws._sync.client.time.sleep")
+@patch("httpx.Client.request")
+def test_sync_request_is_retried(mock_request, mock_sleep):
+    mock_request.side_effect = [
+        httpx.ReadError("Connection reset"),
+        _response(502),
+        _response(200, json={"data": "test"}),
+    ]
+
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        assert client._make_request("GET", "test/endpoint") == {"data": "test"}
+
+    assert mock_request.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+@patch("tws._sync.client.time.sleep")
+@patch("httpx.Client.request")
+def test_sync_retries_are_bounded(mock_request, mock_sleep):
+    mock_request.side_effect = httpx.ConnectError("Connection refused")
+    policy = RetryPolicy(max_attempts=3, budget_min_retries=3, budget_ratio=0)
+
+    with Client(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, retry_policy=policy
+    ) as client:
+        with pytest.raises(ClientException) as exc_info:
+            client._make_request("GET", "test/endpoint")
+        assert "Request error occurred: Connection refused" in str(exc_info.value)
+        assert mock_request.call_count == 3
+
+        # The budget has one retry left for the next request
+        with pytest.raises(ClientException):
+            client._make_request("GET", "test/endpoint")
+        assert mock_request.call_count == 5
+
+        mock_request.side_effect = [_response(503)]
+        with pytest.raises(httpx.HTTPStatusError):
+            client._make_request("GET", "test/endpoint")
+        assert mock_request.call_count == 6
+
+
+@patch("tws._sync.client.time.sleep")
+@patch("httpx.Client.request")
+def test_sync_start_workflow_is_only_retried_if_not_processed(mock_request, mock_sleep):
+    mock_request.side_effect = [
+        httpx.ConnectError("Connection refused"),
+        _response(503),
+        _response(502),
+    ]
+
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        with pytest.raises(ClientException) as exc_info:
+            client.start_workflow("workflow-id", {"arg": "value"})
+
+    assert "HTTP error occurred" in str(exc_info.value)
+    assert mock_request.call_count == 3
+
+
+@patch("tws._async.client.asyncio.sleep")
+@patch("httpx.AsyncClient.request")
+async def test_async_request_is_retried(mock_request, mock_sleep):
+    mock_request.side_effect = [
+        _response(503, {"Retry-After": "2"}),
+        _response(200, json={"data": "test"}),
+    ]
+
+    async with AsyncClient(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        assert await client._make_request("GET", "test/endpoint") == {"data": "test"}
+
+    mock_sleep.assert_awaited_once_with(2)
+
+
+@patch("tws._async.client.asyncio.sleep")
+@patch("httpx.AsyncClient.request")
+async def test_async_streamed_uploads_are_not_retried(mock_request, mock_sleep):
+    mock_request.side_effect = httpx.ReadError("Connection reset")
+
+    async def content():
+        yield b"data"
+
+    async with AsyncClient(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL) as client:
+        with pytest.raises(ClientException):
+            await client._make_request("PUT", "object/file", content=content())
+
+    assert mock_request.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"max_attempts": 0}, "Max attempts must be a positive integer"],
+        [{"initial_delay": 0}, "Initial delay must be a positive number"],
+        [{"max_delay": "1"}, "Max delay must be a positive number"],
+        [{"multiplier": 0.5}, "Backoff multiplier must be at least 1"],
+        [{"jitter": 1}, "Jitter must be a boolean"],
+        [{"budget_ratio": -1}, "Budget ratio must be a non-negative number"],
+        [
+            {"budget_min_retries": 1.5},
+            "Budget min retries must be a non-negative integer",
+        ],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        RetryPolicy(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+def test_client_retry_policy_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, retry_policy={})  # type: ignore
+    assert "Retry policy must be a RetryPolicy instance" in str(exc_info.value)
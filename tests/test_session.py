@@ -0,0 +1,65 @@
+import httpx
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import AsyncClient, Client, ClientException, SessionOptions
+
+
+def test_defaults_match_httpx():
+    options = SessionOptions()
+    assert options.timeout() == httpx.Timeout(5.0)
+    assert options.limits() == httpx.Limits(
+        max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0
+    )
+
+
+@pytest.mark.parametrize("client_class", [Client, AsyncClient])
+def test_client_session_options(client_class):
+    options = SessionOptions(
+        max_connections=10,
+        max_keepalive_connections=0,
+        keepalive_expiry=30,
+        connect_timeout=2,
+        read_timeout=None,
+        write_timeout=60,
+        pool_timeout=1,
+        http2=False,
+    )
+    client = client_class(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, session_options=options
+    )
+
+    assert client.session.timeout == httpx.Timeout(
+        connect=2, read=None, write=60, pool=1
+    )
+    pool = client.session._transport._pool
+    assert pool._max_connections == 10
+    assert pool._max_keepalive_connections == 0
+    assert pool._keepalive_expiry == 30
+    assert pool._http2 is False
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"max_connections": -1}, "Max connections must be a non-negative integer"],
+        [
+            {"max_keepalive_connections": 1.5},
+            "Max keepalive connections must be a non-negative integer",
+        ],
+        [{"keepalive_expiry": 0}, "Keepalive expiry must be a positive number"],
+        [{"read_timeout": -5}, "Read timeout must be a positive number"],
+        [{"pool_timeout": "1"}, "Pool timeout must be a positive number"],
+        [{"http2": "yes"}, "HTTP/2 must be a boolean"],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        SessionOptions(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+def test_client_session_options_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, session_options={})  # type: ignore
+    assert "Session options must be a SessionOptions instance" in str(exc_info.value)
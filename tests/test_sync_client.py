@@ -1,3 +1,5 @@
+import threading
+import time
 from typing import Any
 import httpx
 import pytest
@@ -10,10 +12,21 @@ from tests.constants import (
     BAD_PUBLIC_KEY,
     GOOD_SECRET_KEY,
     BAD_SECRET_KEY,
+    OTHER_SECRET_KEY,
     GOOD_URL,
     BAD_URL,
 )
-from tws import ClientException, Client
+from tws import (
+    ClientException,
+    Client,
+    ExponentialBackoff,
+    LearnedPolling,
+    ResultCache,
+    UploadCache,
+    UserIdCache,
+    WorkflowRequest,
+    WorkflowTimeoutError,
+)
 
 
 @pytest.fixture
@@ -403,8 +416,9 @@ def test_upload_file_not_found(mock_exists, good_client):
 
 
 @patch("os.path.exists")
+@patch("os.path.getsize", return_value=12)
 @patch("builtins.open", side_effect=IOError("Permission denied"))
-def test_upload_file_open_error(mock_open, mock_exists, good_client):
+def test_upload_file_open_error(mock_open, mock_getsize, mock_exists, good_client):
     # Mock file exists but can't be opened
     mock_exists.return_value = True
 
@@ -416,11 +430,12 @@ def test_upload_file_open_error(mock_open, mock_exists, good_client):
 
 
 @patch("os.path.exists")
+@patch("os.path.getsize", return_value=12)
 @patch("builtins.open")
 @patch("tws._sync.client.SyncClient._lookup_user_id")
 @patch("tws._sync.client.SyncClient._make_request")
 def test_upload_file_api_error(
-    mock_request, mock_lookup_user_id, mock_open, mock_exists, good_client
+    mock_request, mock_lookup_user_id, mock_open, mock_getsize, mock_exists, good_client
 ):
     # Mock file exists and can be opened
     mock_exists.return_value = True
@@ -456,3 +471,447 @@ def test_run_workflow_with_file_upload_error(mock_time, mock_exists, good_client
             )
 
     assert "File not found: /path/to/nonexistent/file.txt" in str(exc_info.value)
+
+
+@patch("tws._sync.client.SyncClient.run_workflow")
+def test_submit(mock_run_workflow, good_client):
+    mock_run_workflow.return_value = {"output": "success"}
+
+    with good_client:
+        future = good_client.submit("workflow-id", {"arg": "value"}, tags={"a": "b"})
+        assert future.result() == {"output": "success"}
+
+    mock_run_workflow.assert_called_once_with(
+        "workflow-id",
+        {"arg": "value"},
+        timeout=600,
+        retry_delay=1,
+        tags={"a": "b"},
+        files=None,
+        polling_policy=None,
+        use_cache=True,
+        refresh_cache=False,
+        return_report=False,
+    )
+    # The thread pool is shut down along with the client
+    assert good_client._executor is None
+
+
+@patch("tws._sync.client.SyncClient.run_workflow")
+def test_run_workflows_bounded_concurrency(mock_run_workflow, good_client):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    consumed = 0
+
+    def run_workflow(workflow_definition_id, workflow_args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        if workflow_args["n"] == 3:
+            raise ClientException("Workflow execution failed")
+        return {"output": workflow_args["n"]}
+
+    def requests():
+        nonlocal consumed
+        for n in range(10):
+            consumed += 1
+            if n % 2:
+                yield WorkflowRequest("workflow-id", {"n": n})
+            else:
+                yield {
+                    "workflow_definition_id": "workflow-id",
+                    "workflow_args": {"n": n},
+                }
+
+    mock_run_workflow.side_effect = run_workflow
+
+    with good_client:
+        results = []
+        for result in good_client.run_workflows(requests(), max_workers=3):
+            # Requests are pulled lazily, never more than the window ahead
+            assert consumed - len(results) <= 3
+            results.append(result)
+
+    assert max_in_flight <= 3
+    results.sort(key=lambda r: r.index)
+    assert [r.index for r in results] == list(range(10))
+    assert results[0].result == {"output": 0}
+    assert not results[3].ok
+    assert "Workflow execution failed" in str(results[3].error)
+
+
+@pytest.mark.parametrize(
+    "requests,max_workers,exception_message",
+    [
+        [[], 0, "Max workers must be a positive integer"],
+        [[], True, "Max workers must be a positive integer"],
+        [
+            [123],
+            1,
+            "Workflow requests must be WorkflowRequest instances or dictionaries",
+        ],
+    ],
+)
+def test_run_workflows_validation(
+    good_client, requests, max_workers, exception_message
+):
+    with pytest.raises(ClientException) as exc_info:
+        with good_client:
+            list(good_client.run_workflows(requests, max_workers=max_workers))
+    assert exception_message in str(exc_info.value)
+
+
+def test_client_max_workers_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, max_workers=-1)
+    assert "Max workers must be a positive integer" in str(exc_info.value)
+
+
+@patch("tws._sync.client.SyncClient._make_request")
+def test_lookup_user_id_thread_safe(mock_request, good_client):
+    def lookup(method, uri, params=None):
+        time.sleep(0.05)
+        return [{"user_id": "test-user-123"}]
+
+    mock_request.side_effect = lookup
+
+    with good_client:
+        futures = [
+            good_client._get_executor().submit(good_client._lookup_user_id)
+            for _ in range(8)
+        ]
+        user_ids = [future.result() for future in futures]
+
+    assert user_ids == ["test-user-123"] * 8
+    mock_request.assert_called_once()
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+@patch("time.sleep")
+def test_run_workflow_with_polling_policy(
+    mock_sleep, mock_request, mock_rpc, good_client
+):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = [
+        [{"status": "RUNNING", "result": None}],
+        [{"status": "RUNNING", "result": None}],
+        [{"status": "COMPLETED", "result": {"output": "success"}}],
+    ]
+    policy = ExponentialBackoff(
+        initial_delay=0.05, min_delay=0.1, max_delay=1, jitter=0
+    )
+
+    with good_client:
+        result = good_client.run_workflow(
+            "workflow-id", {"arg": "value"}, polling_policy=policy
+        )
+
+    assert result == {"output": "success"}
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.05, 0.1, 0.2]
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_run_workflow_records_latency(mock_request, mock_rpc, good_client):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = [
+        {"status": "COMPLETED", "result": {"output": "success"}}
+    ]
+    policy = LearnedPolling()
+
+    with good_client:
+        good_client.run_workflow("workflow-id", {"arg": "value"}, polling_policy=policy)
+
+    assert policy.model.count("workflow-id") == 1
+
+
+@patch("tws._sync.client.SyncClient._upload_file")
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_run_workflow_uploads_files_concurrently(mock_request, mock_rpc, mock_upload):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def upload(file_path):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return f"user-123/{file_path}"
+
+    mock_upload.side_effect = upload
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.return_value = [{"status": "COMPLETED", "result": {}}]
+    files = {f"doc{n}": f"file{n}.pdf" for n in range(5)}
+
+    client = Client(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, max_concurrent_uploads=2
+    )
+    with client:
+        client.run_workflow("workflow-id", {"arg": "value"}, files=files)
+
+    assert max_in_flight == 2
+    assert mock_rpc.call_args[0][1]["request_body"] == {
+        "arg": "value",
+        **{f"doc{n}": f"user-123/file{n}.pdf" for n in range(5)},
+    }
+
+
+@patch("tws._sync.client.SyncClient._upload_file")
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+def test_run_workflow_upload_failures(mock_rpc, mock_upload):
+    release = threading.Event()
+
+    def upload(file_path):
+        if file_path == "slow.pdf":
+            release.wait(5)
+            raise ClientException("File upload failed: timed out")
+        if file_path == "bad.pdf":
+            release.set()
+            raise ClientException("File upload failed: File not found: bad.pdf")
+        return f"user-123/{file_path}"
+
+    mock_upload.side_effect = upload
+    files = {"slow": "slow.pdf", "bad": "bad.pdf"}
+
+    client = Client(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, max_concurrent_uploads=2
+    )
+    with client:
+        with pytest.raises(ClientException) as exc_info:
+            client.run_workflow("workflow-id", {}, files=files)
+
+    # Uploads in progress are waited for and their errors reported together
+    assert str(exc_info.value) == (
+        "2 file uploads failed: slow: File upload failed: timed out; "
+        "bad: File upload failed: File not found: bad.pdf"
+    )
+    mock_rpc.assert_not_called()
+
+
+def test_client_max_concurrent_uploads_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, max_concurrent_uploads=0)
+    assert "Max concurrent uploads must be a positive integer" in str(exc_info.value)
+
+
+@patch("tws._sync.client.SyncClient._lookup_user_id")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_upload_file_reuses_cached_upload(mock_request, mock_lookup_user_id, tmp_path):
+    test_file = tmp_path / "reference.pdf"
+    test_file.write_bytes(b"reference document")
+    mock_lookup_user_id.return_value = "test-user-123"
+    mock_request.return_value = {"Key": "documents/test-user-123/1-reference.pdf"}
+
+    with Client(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, upload_cache=UploadCache()
+    ) as client:
+        assert client._upload_file(str(test_file)) == "test-user-123/1-reference.pdf"
+        assert client._upload_file(str(test_file)) == "test-user-123/1-reference.pdf"
+
+    assert mock_request.call_count == 1
+
+
+def test_client_upload_cache_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, upload_cache={})  # type: ignore
+    assert "Upload cache must be an UploadCache instance" in str(exc_info.value)
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_run_workflow_result_cache(mock_request, mock_rpc):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = [
+        [{"status": "COMPLETED", "result": {"run": 1}}],
+        [{"status": "COMPLETED", "result": {"run": 2}}],
+        [{"status": "COMPLETED", "result": {"run": 3}}],
+    ]
+
+    with Client(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, result_cache=ResultCache()
+    ) as client:
+        assert client.run_workflow("workflow-id", {"arg": "value"}) == {"run": 1}
+        assert client.run_workflow("workflow-id", {"arg": "value"}) == {"run": 1}
+        # Bypassing the cache neither reads nor replaces the cached result
+        result = client.run_workflow("workflow-id", {"arg": "value"}, use_cache=False)
+        assert result == {"run": 2}
+        assert client.run_workflow("workflow-id", {"arg": "value"}) == {"run": 1}
+        # Refreshing executes the workflow and replaces the cached result
+        result = client.run_workflow(
+            "workflow-id", {"arg": "value"}, refresh_cache=True
+        )
+        assert result == {"run": 3}
+        assert client.run_workflow("workflow-id", {"arg": "value"}) == {"run": 3}
+
+    assert mock_rpc.call_count == 3
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_run_workflow_result_cache_is_scoped_to_the_key(mock_request, mock_rpc):
+    mock_rpc.return_value = {"workflow_instance_id": "123"}
+    mock_request.side_effect = [
+        [{"status": "COMPLETED", "result": {"user": "a"}}],
+        [{"status": "COMPLETED", "result": {"user": "b"}}],
+    ]
+    cache = ResultCache()
+
+    results = []
+    for secret_key in (GOOD_SECRET_KEY, OTHER_SECRET_KEY):
+        with Client(
+            GOOD_PUBLIC_KEY, secret_key, GOOD_URL, result_cache=cache
+        ) as client:
+            results.append(client.run_workflow("workflow-id", {"arg": "value"}))
+
+    # Clients with different keys sharing a cache do not see each other's results
+    assert results == [{"user": "a"}, {"user": "b"}]
+    assert mock_rpc.call_count == 2
+    assert len(cache) == 2
+
+
+def test_client_result_cache_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, result_cache={})  # type: ignore
+    assert "Result cache must be a ResultCache instance" in str(exc_info.value)
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_run_workflow_coalesces_identical_requests(mock_request, mock_rpc):
+    started = threading.Event()
+    release = threading.Event()
+
+    def start_workflow(function_name, payload):
+        started.set()
+        release.wait(5)
+        return {"workflow_instance_id": payload["request_body"]["arg"]}
+
+    mock_rpc.side_effect = start_workflow
+    mock_request.side_effect = lambda *args, **kwargs: [
+        {"status": "COMPLETED", "result": {"output": 1}}
+    ]
+
+    with Client(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, coalesce_requests=True
+    ) as client:
+        first = client.submit("workflow-id", {"arg": "a"})
+        started.wait(5)
+        followers = [client.submit("workflow-id", {"arg": "a"}) for _ in range(3)]
+        other = client.submit("workflow-id", {"arg": "b"})
+        while len(client._in_flight) < 2:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in [first, *followers]]
+
+        assert other.result() == {"output": 1}
+        assert client._in_flight == {}
+
+    assert results == [{"output": 1}] * 4
+    # Every caller receives its own copy of the result
+    assert len({id(result) for result in results}) == 4
+    assert mock_rpc.call_count == 2
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+def test_run_workflow_coalesced_failure(mock_rpc):
+    release = threading.Event()
+
+    def start_workflow(function_name, payload):
+        release.wait(5)
+        raise ClientException("Workflow definition ID not found")
+
+    mock_rpc.side_effect = start_workflow
+
+    with Client(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, coalesce_requests=True
+    ) as client:
+        futures = [client.submit("workflow-id", {"arg": "a"}) for _ in range(3)]
+        while not client._in_flight:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for future in futures:
+            with pytest.raises(ClientException) as exc_info:
+                future.result()
+            assert "Workflow definition ID not found" in str(exc_info.value)
+
+    assert mock_rpc.call_count == 1
+
+
+@patch("tws._sync.client.SyncClient._make_rpc_request")
+@patch("tws._sync.client.SyncClient._make_request")
+def test_run_workflow_coalesced_timeout(mock_request, mock_rpc):
+    release = threading.Event()
+
+    def start_workflow(function_name, payload):
+        release.wait(5)
+        return {"workflow_instance_id": "instance-id"}
+
+    mock_rpc.side_effect = start_workflow
+    mock_request.side_effect = lambda *args, **kwargs: [
+        {"status": "COMPLETED", "result": {"output": 1}}
+    ]
+
+    with Client(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, coalesce_requests=True
+    ) as client:
+        leader = client.submit("workflow-id", {"arg": "a"})
+        while not client._in_flight:
+            time.sleep(0.01)
+
+        # A caller waits no longer than its own timeout
+        started = time.monotonic()
+        with pytest.raises(WorkflowTimeoutError):
+            client.run_workflow("workflow-id", {"arg": "a"}, timeout=1)
+        assert time.monotonic() - started < 2
+
+        reports = []
+        follower = threading.Thread(
+            target=lambda: reports.append(
+                client.run_workflow("workflow-id", {"arg": "a"}, return_report=True)
+            )
+        )
+        follower.start()
+        time.sleep(0.05)
+        release.set()
+        follower.join(5)
+
+        assert leader.result() == {"output": 1}
+
+    [(result, report)] = reports
+    assert result == {"output": 1}
+    assert report.coalesced
+    assert report.polls == 0
+    assert mock_rpc.call_count == 1
+
+
+@patch("tws._sync.client.SyncClient._make_request")
+def test_lookup_user_id_shared_cache(mock_request):
+    mock_request.return_value = [{"user_id": "test-user-123"}]
+    cache = UserIdCache()
+
+    for _ in range(3):
+        with Client(
+            GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, user_id_cache=cache
+        ) as client:
+            client.prefetch()
+            assert client.user_id == "test-user-123"
+
+    assert mock_request.call_count == 1
+
+
+def test_client_user_id_cache_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, user_id_cache={})  # type: ignore
+    assert "User ID cache must be a UserIdCache instance" in str(exc_info.value)
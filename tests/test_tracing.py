@@ -0,0 +1,173 @@
+import threading
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import (
+    AsyncClient,
+    Client,
+    ClientException,
+    ExponentialBackoff,
+    OpenTelemetryTracer,
+    Span,
+    Tracer,
+)
+from tws.base.tracing import trace
+
+POLLING = ExponentialBackoff(initial_delay=0, min_delay=0.01, jitter=0)
+
+
+class RecordedSpan(Span):
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.parent = parent
+        self.error = None
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, error):
+        self.error = error
+
+    def end(self):
+        self.ended = True
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name, attributes, parent):
+        span = RecordedSpan(name, attributes, parent)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def named(self, name):
+        return [span for span in self.spans if span.name == name]
+
+
+def _handler(statuses):
+    def handle(method, url, json=None, files=None, **kwargs):
+        request = httpx.Request(method, f"{GOOD_URL}{url}", json=json, files=files)
+        if url.endswith("users_private"):
+            body = [{"user_id": "user-1"}]
+        elif "/storage/" in url:
+            body = {"Key": "documents/user-1/file.txt"}
+        elif url.endswith("rpc/start_workflow"):
+            body = {"workflow_instance_id": "instance-1"}
+        else:
+            body = [{"status": statuses.pop(0), "result": {"output": "done"}}]
+        return httpx.Response(200, json=body, request=request)
+
+    return handle
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"x" * 1000)
+    return str(path)
+
+
+def _check_run(tracer):
+    (run,) = tracer.named("tws.run_workflow")
+    (upload,) = tracer.named("tws.upload_file")
+    (rpc,) = tracer.named("tws.rpc")
+    polls = tracer.named("tws.poll")
+
+    assert all(span.ended for span in tracer.spans)
+    assert upload.parent is run and rpc.parent is run
+    assert [poll.parent for poll in polls] == [run, run]
+    assert upload.attributes["tws.file.size"] == 1000
+    assert upload.attributes["tws.bytes_sent"] > 1000
+    assert rpc.attributes["tws.rpc.function"] == "start_workflow"
+    assert polls[0].attributes["tws.workflow_instance_id"] == "instance-1"
+    assert run.attributes["tws.workflow_definition_id"] == "workflow-id"
+    assert run.attributes["tws.workflow_instance_id"] == "instance-1"
+    assert run.attributes["tws.workflow_status"] == "COMPLETED"
+    assert run.attributes["tws.polls"] == 2
+    # The run counts the bytes of every request made within it
+    assert run.attributes["tws.bytes_sent"] == sum(
+        span.attributes.get("tws.bytes_sent", 0) for span in tracer.spans[1:]
+    )
+    assert run.attributes["tws.bytes_received"] > 0
+
+
+@patch("time.sleep")
+@patch("httpx.Client.request")
+def test_sync_run_is_traced(mock_request, _, upload):
+    mock_request.side_effect = _handler(["RUNNING", "COMPLETED"])
+    tracer = RecordingTracer()
+
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, tracer=tracer) as client:
+        result = client.run_workflow(
+            "workflow-id", {}, files={"file": upload}, polling_policy=POLLING
+        )
+
+    assert result == {"output": "done"}
+    _check_run(tracer)
+
+
+@patch("httpx.AsyncClient.request")
+async def test_async_run_is_traced(mock_request, upload):
+    handle = _handler(["RUNNING", "COMPLETED"])
+
+    async def request(method, url, content=None, headers=None, **kwargs):
+        response = handle(method, url, **kwargs)
+        if content is not None:
+            # Streamed uploads declare their length up front
+            assert headers is not None
+            response.request.headers["Content-Length"] = headers["Content-Length"]
+        return response
+
+    mock_request.side_effect = request
+    tracer = RecordingTracer()
+
+    async with AsyncClient(
+        GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, tracer=tracer
+    ) as client:
+        result = await client.run_workflow(
+            "workflow-id", {}, files={"file": upload}, polling_policy=POLLING
+        )
+
+    assert result == {"output": "done"}
+    _check_run(tracer)
+
+
+@patch("time.sleep")
+@patch("httpx.Client.request")
+def test_failed_run_is_recorded(mock_request, _):
+    mock_request.side_effect = _handler(["FAILED"])
+    tracer = RecordingTracer()
+
+    with Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, tracer=tracer) as client:
+        with pytest.raises(ClientException) as exc_info:
+            client.run_workflow("workflow-id", {}, polling_policy=POLLING)
+
+    (run,) = tracer.named("tws.run_workflow")
+    assert run.error is exc_info.value
+    assert run.attributes["tws.workflow_status"] == "FAILED"
+    assert run.ended
+
+
+def test_disabled_tracing_is_a_shared_no_op():
+    assert trace(None, "tws.poll", {}) is trace(None, "tws.rpc", {})
+
+
+def test_client_tracer_validation():
+    with pytest.raises(ClientException) as exc_info:
+        Client(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, tracer=object())  # type: ignore
+    assert "Tracer must be a Tracer instance" in str(exc_info.value)
+
+
+def test_opentelemetry_requires_package():
+    with patch.dict("sys.modules", {"opentelemetry": None}):
+        with pytest.raises(ClientException) as exc_info:
+            OpenTelemetryTracer()
+    assert "pip install tws-sdk[tracing]" in str(exc_info.value)
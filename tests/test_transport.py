@@ -0,0 +1,128 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tests.constants import GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL
+from tws import (
+    AsyncClient,
+    Client,
+    ClientException,
+    SessionOptions,
+    SharedTransport,
+)
+from tws.base.client import TWS_API_KEY_HEADER
+from tws.base.transport import _AsyncTransportView
+
+OTHER_SECRET_KEY = "987e6543-e21b-4d3c-9456-426614174999"
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        # Reply with the API key and the client's port, which identifies the
+        # connection the request was sent over
+        body = json.dumps(
+            {
+                "api_key": self.headers[TWS_API_KEY_HEADER],
+                "port": self.client_address[1],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def api_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_sync_clients_share_connections(api_url):
+    with SharedTransport() as transport:
+        with Client(
+            GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, api_url, transport=transport
+        ) as client:
+            first = client.session.get("/").json()
+
+        # Closing the first client leaves the shared connection open
+        with Client(
+            GOOD_PUBLIC_KEY, OTHER_SECRET_KEY, api_url, transport=transport
+        ) as client:
+            second = client.session.get("/").json()
+
+    assert first["api_key"] == GOOD_SECRET_KEY
+    assert second["api_key"] == OTHER_SECRET_KEY
+    assert first["port"] == second["port"]
+
+
+async def test_async_clients_share_connections(api_url):
+    async with SharedTransport() as transport:
+        async with AsyncClient(
+            GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, api_url, transport=transport
+        ) as client:
+            first = (await client.session.get("/")).json()
+
+        async with AsyncClient(
+            GOOD_PUBLIC_KEY, OTHER_SECRET_KEY, api_url, transport=transport
+        ) as client:
+            second = (await client.session.get("/")).json()
+
+    assert first["api_key"] == GOOD_SECRET_KEY
+    assert second["api_key"] == OTHER_SECRET_KEY
+    assert first["port"] == second["port"]
+
+
+def test_transport_options():
+    transport = SharedTransport(
+        SessionOptions(max_connections=10, http2=False, read_timeout=1)
+    )
+    client = Client(
+        GOOD_PUBLIC_KEY,
+        GOOD_SECRET_KEY,
+        GOOD_URL,
+        session_options=SessionOptions(read_timeout=30),
+        transport=transport,
+    )
+
+    sync_transport = transport._sync_transport
+    assert sync_transport is not None
+    pool = sync_transport._pool
+    assert pool._max_connections == 10
+    assert pool._http2 is False
+    # Timeouts are set per client
+    assert client.session.timeout.read == 30
+    # Every view of the asynchronous pool sends through the same transport
+    first, second = transport.async_transport(), transport.async_transport()
+    assert isinstance(first, _AsyncTransportView)
+    assert isinstance(second, _AsyncTransportView)
+    assert first._transport is second._transport
+
+    transport.close()
+    assert transport._sync_transport is None
+
+
+@pytest.mark.parametrize("client_class", [Client, AsyncClient])
+def test_transport_validation(client_class):
+    with pytest.raises(ClientException) as exc_info:
+        client_class(GOOD_PUBLIC_KEY, GOOD_SECRET_KEY, GOOD_URL, transport={})
+    assert "Transport must be a SharedTransport instance" in str(exc_info.value)
+
+    with pytest.raises(ClientException) as exc_info:
+        SharedTransport(session_options={})  # type: ignore
+    assert "Session options must be a SessionOptions instance" in str(exc_info.value)
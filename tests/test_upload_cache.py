@@ -0,0 +1,116 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from tws import ClientException, UploadCache
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "reference.pdf"
+    path.write_bytes(b"reference document")
+    return str(path)
+
+
+def test_key_depends_on_contents_name_and_namespace(document, tmp_path):
+    cache = UploadCache()
+    key = cache.key(document, "user-1")
+
+    copy = tmp_path / "copy" / "reference.pdf"
+    copy.parent.mkdir()
+    copy.write_bytes(b"reference document")
+    renamed = tmp_path / "renamed.pdf"
+    renamed.write_bytes(b"reference document")
+
+    assert cache.key(str(copy), "user-1") == key
+    assert cache.key(str(renamed), "user-1") != key
+    assert cache.key(document, "user-2") != key
+
+    with open(document, "wb") as f:
+        f.write(b"updated document")
+    os.utime(document, ns=(0, 0))
+    assert cache.key(document, "user-1") != key
+
+
+def test_unchanged_files_are_not_hashed_again(document):
+    cache = UploadCache()
+    with patch("tws.base.digests.file_sha256", return_value="digest") as sha:
+        cache.key(document, "user-1")
+        cache.key(document, "user-1")
+        assert sha.call_count == 1
+
+        os.utime(document, ns=(0, 0))
+        cache.key(document, "user-1")
+        assert sha.call_count == 2
+
+
+def test_get_and_put(document):
+    cache = UploadCache()
+    key = cache.key(document, "user-1")
+    assert cache.get(key) is None
+
+    cache.put(key, "user-1/1-reference.pdf")
+    assert cache.get(key) == "user-1/1-reference.pdf"
+    assert len(cache) == 1
+
+    cache.clear()
+    assert cache.get(key) is None
+
+
+def test_lru_eviction():
+    cache = UploadCache(max_entries=2)
+    cache.put("a", "path-a")
+    cache.put("b", "path-b")
+    cache.get("a")
+    cache.put("c", "path-c")
+
+    assert cache.get("a") == "path-a"
+    assert cache.get("b") is None
+    assert cache.get("c") == "path-c"
+
+
+@patch("tws.base.store.time.time")
+def test_expired_entries_are_not_reused(mock_time, tmp_path):
+    cache = UploadCache(ttl=10, path=str(tmp_path / "uploads.db"))
+    mock_time.return_value = 100
+    cache.put("key", "path")
+
+    mock_time.return_value = 109
+    assert cache.get("key") == "path"
+    mock_time.return_value = 110
+    assert cache.get("key") is None
+    assert UploadCache(ttl=10, path=cache.path).get("key") is None
+
+
+def test_database_is_shared(tmp_path):
+    path = str(tmp_path / "uploads.db")
+    UploadCache(path=path).put("key", "path")
+
+    other = UploadCache(path=path)
+    assert other.get("key") == "path"
+    assert len(other) == 1
+
+    other.clear()
+    assert UploadCache(path=path).get("key") is None
+
+
+@pytest.mark.parametrize(
+    "kwargs,exception_message",
+    [
+        [{"max_entries": 0}, "Max entries must be a positive integer"],
+        [{"max_entries": True}, "Max entries must be a positive integer"],
+        [{"ttl": 0}, "TTL must be a positive number of seconds"],
+        [{"ttl": "1"}, "TTL must be a positive number of seconds"],
+    ],
+)
+def test_validation(kwargs, exception_message):
+    with pytest.raises(ClientException) as exc_info:
+        UploadCache(**kwargs)
+    assert exception_message in str(exc_info.value)
+
+
+def test_unopenable_database(tmp_path):
+    with pytest.raises(ClientException) as exc_info:
+        UploadCache(path=str(tmp_path))
+    assert "Failed to open upload cache" in str(exc_info.value)
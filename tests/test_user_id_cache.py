@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+import pytest
+
+from tws import ClientException, UserIdCache
+
+
+def test_get_and_put():
+    cache = UserIdCache()
+    assert cache.get("api-key") is None
+
+    cache.put("api-key", "user-1")
+    assert cache.get("api-key") == "user-1"
+    assert cache.get("other-key") is None
+    # API keys are not kept in plain text
+    assert "api-key" not in cache._entries
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+@patch("tws.base.user_id_cache.time.monotonic")
+def test_expiry(mock_monotonic):
+    cache = UserIdCache(ttl=10)
+    mock_monotonic.return_value = 100
+    cache.put("api-key", "user-1")
+
+    mock_monotonic.return_value = 109
+    assert cache.get("api-key") == "user-1"
+    mock_monotonic.return_value = 110
+    assert cache.get("api-key") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("ttl", [0, -1, "60", True])
+def test_validation(ttl):
+    with pytest.raises(ClientException) as exc_info:
+        UserIdCache(ttl=ttl)
+    assert "TTL must be a positive number of seconds" in str(exc_info.value)
@@ -1,11 +1,67 @@
-from .base.client import ClientException
+from .base.client import (
+    CircuitOpenError,
+    ClientException,
+    WorkflowFailedError,
+    WorkflowTimeoutError,
+)
+from .base.batch import WorkflowRequest, WorkflowResult
+from .base.circuit_breaker import CircuitBreakerPolicy
+from .base.hedging import HedgingPolicy, HedgingStats
+from .base.latency import LatencyModel
+from .base.metrics import MetricsRegistry
+from .base.polling import ExponentialBackoff, FixedDelay, LearnedPolling, PollingPolicy
+from .base.pool import PoolStats
+from .base.rate_limit import AdaptiveLimits, RateLimitPolicy
+from .base.report import RunReport
+from .base.result_cache import ResultCache
+from .base.retry import RetryPolicy
+from .base.session import SessionOptions
+from .base.tracing import OpenTelemetryTracer, Span, Tracer
+from .base.transport import SharedTransport
+from .base.upload_cache import UploadCache
+from .base.user_id_cache import UserIdCache
 
 from ._sync.client import SyncClient as Client
+from ._sync.handle import WorkflowHandle
+from ._sync.pool import ClientPool
 
 from ._async.client import AsyncClient
+from ._async.handle import AsyncWorkflowHandle
+from ._async.pool import AsyncClientPool
 
 __all__ = [
+    "AdaptiveLimits",
     "AsyncClient",
+    "AsyncClientPool",
+    "AsyncWorkflowHandle",
+    "CircuitBreakerPolicy",
+    "CircuitOpenError",
     "Client",
     "ClientException",
+    "ClientPool",
+    "ExponentialBackoff",
+    "FixedDelay",
+    "HedgingPolicy",
+    "HedgingStats",
+    "LatencyModel",
+    "LearnedPolling",
+    "MetricsRegistry",
+    "OpenTelemetryTracer",
+    "PollingPolicy",
+    "PoolStats",
+    "RateLimitPolicy",
+    "ResultCache",
+    "RetryPolicy",
+    "RunReport",
+    "SessionOptions",
+    "SharedTransport",
+    "Span",
+    "Tracer",
+    "UploadCache",
+    "UserIdCache",
+    "WorkflowHandle",
+    "WorkflowFailedError",
+    "WorkflowRequest",
+    "WorkflowResult",
+    "WorkflowTimeoutError",
 ]
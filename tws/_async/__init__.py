@@ -0,0 +1,3 @@
+from .handle import AsyncWorkflowHandle, as_completed, wait_all, wait_any
+
+__all__ = ["AsyncWorkflowHandle", "as_completed", "wait_all", "wait_any"]
@@ -1,14 +1,129 @@
 import asyncio
-import mimetypes
+import copy
+from contextlib import nullcontext
 import os
 import time
-from typing import cast, Dict, Optional
+from typing import (
+    Any,
+    AsyncContextManager,
+    ContextManager,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Set,
+    Tuple,
+    Union,
+    cast,
+    Dict,
+    Optional,
+)
 
 import aiofiles
+from aiofiles.threadpool.binary import AsyncBufferedReader
 import httpx
 from httpx import AsyncClient as AsyncHttpClient
 
-from tws.base.client import TWS_API_KEY_HEADER, TWSClient, ClientException
+from tws._async.handle import AsyncWorkflowHandle
+from tws._async.poller import BatchStatusPoller
+from tws._async.rate_limit import AsyncRateLimiter, unlimited
+from tws._async.realtime import AsyncRealtimeListener
+from tws.base.batch import WorkflowRequest, WorkflowResult, validate_concurrency
+from tws.base.circuit_breaker import (
+    STORAGE,
+    CircuitBreakerPolicy,
+    create_circuit_breakers,
+    endpoint_class,
+    resolve_circuit_breaker_policy,
+)
+from tws.base.client import (
+    TERMINAL_STATUSES,
+    TWS_API_KEY_HEADER,
+    TWSClient,
+    CircuitOpenError,
+    ClientException,
+    WorkflowTimeoutError,
+)
+from tws.base.hedging import Hedger, HedgingPolicy, resolve_hedging_policy
+from tws.base.multipart import UPLOAD_CHUNK_SIZE, MultipartFile
+from tws.base.metrics import MetricsRegistry, endpoint_label, resolve_metrics
+from tws.base.polling import (
+    PollingPolicy,
+    completion_latency,
+    resolve_polling_policy,
+)
+from tws.base.realtime import RealtimeDisconnected, realtime_url
+from tws.base.rate_limit import (
+    UPLOADS,
+    RateLimitPolicy,
+    request_kind,
+    resolve_rate_limit_policy,
+)
+from tws.base.report import (
+    RunRecorder,
+    record_coalesced,
+    record_polls,
+    record_start,
+    record_transfer,
+    record_upload,
+    recording,
+)
+from tws.base.result_cache import ResultCache
+from tws.base.retry import RetryBudget, RetryPolicy, resolve_retry_policy
+from tws.base.resumable import (
+    RESUMABLE_MAX_ATTEMPTS,
+    RESUMABLE_PART_SIZE,
+    RESUMABLE_UPLOAD_PATH,
+    RESUMABLE_UPLOAD_THRESHOLD,
+    creation_headers,
+    final_concat,
+    head_headers,
+    is_retryable,
+    patch_headers,
+    plan_segments,
+    retry_delay,
+    supports_concatenation,
+    upload_location,
+    upload_metadata,
+    upload_offset,
+)
+from tws.base.tracing import (
+    FILE_CACHED,
+    FILE_SIZE,
+    POLL,
+    POLLS,
+    RPC,
+    RPC_FUNCTION,
+    RUN_WORKFLOW,
+    UPLOAD_FILE,
+    WORKFLOW_DEFINITION_ID,
+    WORKFLOW_INSTANCE_ID,
+    WORKFLOW_STATUS,
+    Tracer,
+    count,
+    count_transfer,
+    resolve_tracer,
+    set_attribute,
+    trace,
+)
+from tws.base.session import SessionOptions, resolve_session_options
+from tws.base.transport import SharedTransport
+from tws.base.upload_cache import UploadCache
+from tws.base.user_id_cache import UserIdCache
+
+# Minimum time in seconds between attempts to (re)connect the realtime listener
+REALTIME_RECONNECT_INTERVAL = 30
+
+
+async def _iterate(requests: Union[Iterable[Any], AsyncIterable[Any]]):
+    if isinstance(requests, AsyncIterable):
+        async for request in requests:
+            yield request
+    else:
+        for request in requests:
+            yield request
 
 
 class AsyncClient(TWSClient):
@@ -17,16 +132,135 @@ class AsyncClient(TWSClient):
     Provides asynchronous methods for interfacing with the TWS API.
     """
 
-    def __init__(self, public_key: str, secret_key: str, api_url: str):
+    def __init__(
+        self,
+        public_key: str,
+        secret_key: str,
+        api_url: str,
+        batch_polling: bool = False,
+        batch_polling_window: float = 0.25,
+        realtime: bool = False,
+        max_concurrent_uploads: int = 4,
+        upload_cache: Optional[UploadCache] = None,
+        resumable_upload_threshold: int = RESUMABLE_UPLOAD_THRESHOLD,
+        result_cache: Optional[ResultCache] = None,
+        coalesce_requests: bool = False,
+        user_id_cache: Optional[UserIdCache] = None,
+        session_options: Optional[SessionOptions] = None,
+        transport: Optional[SharedTransport] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limit: Optional[RateLimitPolicy] = None,
+        circuit_breaker: Optional[CircuitBreakerPolicy] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         """Initialize the asynchronous client.
 
         Args:
             public_key: The TWS public key
             secret_key: The TWS secret key
             api_url: The base URL for your TWS API instance
+            batch_polling: Share status polls between all in-flight workflows,
+                querying many instances per request instead of one each
+            batch_polling_window: Instances due for a status check within this
+                many seconds of a batched poll are included in it
+            realtime: Subscribe to workflow status changes over a realtime
+                websocket instead of polling, falling back to polling while the
+                connection is unavailable. Requires the `websockets` package.
+            max_concurrent_uploads: Maximum number of files, or segments of
+                large files, uploaded at once across all workflows started by
+                the client
+            upload_cache: Optional `UploadCache` used to reuse earlier uploads
+                of files with identical contents instead of uploading them again
+            resumable_upload_threshold: Files larger than this many bytes are
+                uploaded in parts that are resumed after a failure
+            result_cache: Optional `ResultCache` used to return the earlier
+                result of a workflow run with identical inputs instead of
+                executing it again
+            coalesce_requests: Execute identical concurrent `run_workflow`
+                calls once, returning the result to every caller
+            user_id_cache: Optional `UserIdCache` shared with other clients,
+                so only the first client using an API key looks up its user ID
+            session_options: Optional `SessionOptions` configuring the
+                connection pool, HTTP/2 and timeouts of the HTTP session
+            transport: Optional `SharedTransport` whose connection pool is
+                shared with other clients. The pool and HTTP/2 settings of the
+                transport apply instead of those in `session_options`.
+            retry_policy: Optional `RetryPolicy` for API requests that fail
+                transiently, defaults to `RetryPolicy()`
+            rate_limit: Optional `RateLimitPolicy` adapting the rate and
+                concurrency of workflow starts, status polls and uploads to
+                what the API sustains
+            circuit_breaker: Optional `CircuitBreakerPolicy` making requests
+                to rest, rpc and storage endpoints fail fast with
+                `CircuitOpenError` while those endpoints are failing
+            hedging: Optional `HedgingPolicy` sending slow status polls a
+                second time and using whichever response arrives first
+            tracer: Optional `Tracer` receiving spans for workflow runs,
+                uploads, RPCs and status polls
+            metrics: Optional `MetricsRegistry` collecting request latencies,
+                workflow runs in progress, polls per workflow, uploads and
+                errors, which can be shared with other clients
         """
+        validate_concurrency(max_concurrent_uploads, "Max concurrent uploads")
+        validate_concurrency(resumable_upload_threshold, "Resumable upload threshold")
+        if upload_cache is not None and not isinstance(upload_cache, UploadCache):
+            raise ClientException("Upload cache must be an UploadCache instance")
+        if result_cache is not None and not isinstance(result_cache, ResultCache):
+            raise ClientException("Result cache must be a ResultCache instance")
+        if user_id_cache is not None and not isinstance(user_id_cache, UserIdCache):
+            raise ClientException("User ID cache must be a UserIdCache instance")
+        if transport is not None and not isinstance(transport, SharedTransport):
+            raise ClientException("Transport must be a SharedTransport instance")
+        # Read by create_session, which the base class calls
+        self._session_options = resolve_session_options(session_options)
+        self._shared_transport = transport
+        self._retry_policy = resolve_retry_policy(retry_policy)
+        self._retry_budget = RetryBudget(
+            self._retry_policy.budget_ratio, self._retry_policy.budget_min_retries
+        )
+        self._circuit_breakers = create_circuit_breakers(
+            resolve_circuit_breaker_policy(circuit_breaker)
+        )
+        self._tracer = resolve_tracer(tracer)
+        self._metrics = resolve_metrics(metrics)
+        hedging = resolve_hedging_policy(hedging)
+        self._hedger = Hedger(hedging) if hedging is not None else None
+        rate_limit = resolve_rate_limit_policy(rate_limit)
+        self._rate_limiters: Dict[str, AsyncRateLimiter] = (
+            {
+                kind: AsyncRateLimiter(limits)
+                for kind, limits in rate_limit.limits().items()
+            }
+            if rate_limit is not None
+            else {}
+        )
         super().__init__(public_key, secret_key, api_url)
         self.session = cast(AsyncHttpClient, self.session)
+        self._poller = (
+            BatchStatusPoller(self, window=batch_polling_window)
+            if batch_polling
+            else None
+        )
+        self._realtime = (
+            AsyncRealtimeListener(realtime_url(api_url, public_key), public_key)
+            if realtime
+            else None
+        )
+        self._realtime_lock: Optional[asyncio.Lock] = None
+        self._user_id_lock: Optional[asyncio.Lock] = None
+        self._realtime_retry_at = 0.0
+        self._max_concurrent_uploads = max_concurrent_uploads
+        self._upload_cache = upload_cache
+        self._resumable_upload_threshold = resumable_upload_threshold
+        self._result_cache = result_cache
+        self._coalesce_requests = coalesce_requests
+        self._user_id_cache = user_id_cache
+        self._in_flight: Dict[str, "asyncio.Task[dict]"] = {}
+        self._in_flight_waiters: Dict[str, int] = {}
+        self._resumable_concatenation: Optional[bool] = None
+        self._upload_semaphore: Optional[asyncio.Semaphore] = None
 
     def create_session(
         self,
@@ -42,17 +276,27 @@ class AsyncClient(TWSClient):
         Returns:
             A configured asynchronous HTTPX client instance
         """
+        options = self._session_options
+        shared = self._shared_transport
         return AsyncHttpClient(
             base_url=base_url,
             headers=headers,
             follow_redirects=True,
-            http2=True,
+            http2=options.http2,
+            limits=options.limits(),
+            timeout=options.timeout(),
+            transport=shared.async_transport() if shared is not None else None,
         )
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._realtime is not None:
+            await self._realtime.aclose()
+        # Stop the shared status poller before closing the session it uses
+        if self._poller is not None:
+            await self._poller.aclose()
         # Close the underlying HTTP session
         await self.session.aclose()
 
@@ -65,23 +309,53 @@ class AsyncClient(TWSClient):
         Raises:
             ClientException: If the user ID cannot be found
         """
-        if self.user_id is None:
-            params = {
-                "select": "user_id",
-                "api_key": f"eq.{self.session.headers[TWS_API_KEY_HEADER]}",
-            }
-            try:
-                response = await self._make_request(
-                    "GET", "users_private", params=params
-                )
-                if not response or len(response) == 0:
-                    raise ClientException("User ID not found, is your API key correct?")
-                self.user_id = response[0]["user_id"]
-            except Exception as e:
-                raise ClientException(f"Failed to look up user ID: {e}")
+        if self.user_id is not None:
+            return self.user_id
+
+        # Only one task performs the lookup, the others wait for its result
+        if self._user_id_lock is None:
+            self._user_id_lock = asyncio.Lock()
+        async with self._user_id_lock:
+            api_key = self.session.headers[TWS_API_KEY_HEADER]
+            if self.user_id is None and self._user_id_cache is not None:
+                self.user_id = self._user_id_cache.get(api_key)
+            if self.user_id is None:
+                params = {"select": "user_id", "api_key": f"eq.{api_key}"}
+                try:
+                    response = await self._make_request(
+                        "GET", "users_private", params=params
+                    )
+                    if not response or len(response) == 0:
+                        raise ClientException(
+                            "User ID not found, is your API key correct?"
+                        )
+                    self.user_id = response[0]["user_id"]
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    raise ClientException(f"Failed to look up user ID: {e}")
+                if self._user_id_cache is not None:
+                    self._user_id_cache.put(api_key, self.user_id)
 
         return self.user_id
 
+    async def prefetch(self) -> None:
+        """Look up the user ID ahead of the first file upload.
+
+        Uploads need the user ID associated with the API key. Calling this
+        when the client is created moves the lookup out of the first workflow
+        run. The user ID is stored in `user_id`, and in the client's
+        `UserIdCache`, if any, for other clients using the same API key.
+
+        Returns:
+            None, once the user ID is known
+
+        Raises:
+            CircuitOpenError: If the API is considered down
+            ClientException: If the user ID cannot be found
+        """
+        await self._lookup_user_id()
+
     async def _make_request(
         self,
         method: str,
@@ -90,14 +364,20 @@ class AsyncClient(TWSClient):
         params: Optional[dict] = None,
         files: Optional[dict] = None,
         service: str = "rest",
+        content: Optional[AsyncIterable[bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
     ):
         """Make a HTTP request to the TWS API.
 
+        Transient failures are retried according to the client's retry policy.
+
         Args:
             method: HTTP method to use (GET, POST, etc)
             uri: API endpoint URI
             payload: Optional request body data
             params: Optional URL query parameters
+            content: Optional raw request body, streamed as it is iterated
+            headers: Optional HTTP headers to send with the request
 
         Returns:
             Parsed JSON response from the API
@@ -105,14 +385,62 @@ class AsyncClient(TWSClient):
         Raises:
             ClientException: If a request error occurs
         """
-        try:
-            response = await self.session.request(
-                method, f"/{service}/v1/{uri}", json=payload, params=params, files=files
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.RequestError as e:
-            raise ClientException(f"Request error occurred: {e}")
+        self._retry_budget.deposit()
+        kind = request_kind(service, uri)
+        endpoint = endpoint_class(service, uri)
+        attempt = 1
+        while True:
+            try:
+                with self._circuit(endpoint):
+                    async with self._rate_limited(kind):
+                        with self._measured(service, uri):
+                            response = await self.session.request(
+                                method,
+                                f"/{service}/v1/{uri}",
+                                json=payload,
+                                params=params,
+                                files=files,
+                                content=content,
+                                headers=headers,
+                            )
+                            count_transfer(response)
+                            record_transfer(response)
+                            response.raise_for_status()
+                return response.json()
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                # Uploaded bodies are read as they are sent and cannot be sent
+                # again
+                delay = (
+                    self._retry_policy.delay(e, method, attempt)
+                    if files is None and content is None
+                    else None
+                )
+                if delay is None or not self._retry_budget.withdraw():
+                    if isinstance(e, httpx.RequestError):
+                        raise ClientException(f"Request error occurred: {e}")
+                    raise
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _circuit(self, endpoint: str) -> ContextManager[None]:
+        breaker = self._circuit_breakers.get(endpoint)
+        return breaker.request() if breaker is not None else nullcontext()
+
+    def _workflow_metrics(
+        self, recorder: Optional[RunRecorder]
+    ) -> ContextManager[None]:
+        if self._metrics is None:
+            return nullcontext()
+        return self._metrics.workflow(recorder)
+
+    def _measured(self, service: str, uri: str) -> ContextManager[None]:
+        if self._metrics is None:
+            return nullcontext()
+        return self._metrics.request(endpoint_label(service, uri))
+
+    def _rate_limited(self, kind: Optional[str]) -> AsyncContextManager[None]:
+        limiter = self._rate_limiters.get(kind) if kind is not None else None
+        return limiter.request() if limiter is not None else unlimited()
 
     async def _make_rpc_request(
         self, function_name: str, payload: Optional[dict] = None
@@ -126,7 +454,8 @@ class AsyncClient(TWSClient):
         Returns:
             Parsed JSON response from the API
         """
-        return await self._make_request("POST", f"rpc/{function_name}", payload)
+        with trace(self._tracer, RPC, {RPC_FUNCTION: function_name}):
+            return await self._make_request("POST", f"rpc/{function_name}", payload)
 
     async def _upload_file(self, file_path: str) -> str:
         """Upload a file to the TWS API asynchronously.
@@ -140,36 +469,285 @@ class AsyncClient(TWSClient):
         Raises:
             ClientException: If the file upload fails
         """
-        try:
-            if not os.path.exists(file_path):
-                raise ClientException(f"File not found: {file_path}")
+        with trace(self._tracer, UPLOAD_FILE, {}):
+            try:
+                if not os.path.exists(file_path):
+                    raise ClientException(f"File not found: {file_path}")
+
+                # Reuse an earlier upload of a file with the same contents. Hashing
+                # the file and querying the cache block, so they run in a thread.
+                loop = asyncio.get_running_loop()
+                cache = self._upload_cache
+                cache_key = None
+                if cache is not None:
+                    user_id = await self._lookup_user_id()
+                    cache_key = await loop.run_in_executor(
+                        None, cache.key, file_path, user_id
+                    )
+                    cached_path = await loop.run_in_executor(None, cache.get, cache_key)
+                    set_attribute(FILE_CACHED, cached_path is not None)
+                    if cached_path is not None:
+                        return cached_path
 
-            filename = os.path.basename(file_path)
-            unique_filename = f"{int(time.time())}-{filename}"
+                filename = os.path.basename(file_path)
+                unique_filename = f"{int(time.time())}-{filename}"
 
-            # Detect MIME type based on file extension
-            content_type, _ = mimetypes.guess_type(file_path)
+                file_size = os.path.getsize(file_path)
+                set_attribute(FILE_SIZE, file_size)
+                user_id = await self._lookup_user_id()
+
+                started = time.monotonic()
+                if file_size > self._resumable_upload_threshold:
+                    # Large files are sent in parts, so a dropped connection only
+                    # costs the part in flight
+                    uploaded_path = f"{user_id}/{unique_filename}"
+                    await self._upload_resumable(file_path, uploaded_path, file_size)
+                else:
+                    # The file is streamed from disk in chunks rather than read into
+                    # memory, so memory use does not grow with the file size
+                    multipart = MultipartFile.for_path(file_path)
+                    response = await self._make_request(
+                        "POST",
+                        f"object/documents/{user_id}/{unique_filename}",
+                        service="storage",
+                        content=self._stream_multipart(file_path, multipart),
+                        headers=multipart.headers(file_size),
+                    )
+
+                    file_url = response["Key"]
+                    # Strip the prefix, the workflow automatically looks in the bucket
+                    uploaded_path = file_url[len("documents/") :]
+                if self._metrics is not None:
+                    self._metrics.record_upload(file_size, time.monotonic() - started)
+                if cache is not None and cache_key is not None:
+                    await loop.run_in_executor(
+                        None, cache.put, cache_key, uploaded_path
+                    )
+                return uploaded_path
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                raise ClientException(f"File upload failed: {e}")
 
-            async with aiofiles.open(file_path, "rb") as file_obj:
-                file_content = await file_obj.read()
-            user_id = await self._lookup_user_id()
+    async def _upload_resumable(
+        self, file_path: str, object_name: str, file_size: int
+    ) -> None:
+        """Upload a file in parts with the resumable upload protocol.
 
-            # Since httpx can't handle the aiofiles file object, we have to
-            # explicitly construct the tuple so it sends the MIME type
-            files = {"upload-file": (filename, file_content, content_type)}
+        If the storage service supports concatenation, the file is split into
+        segments that are uploaded in parallel and joined afterwards. Besides
+        the upload slot held by the file, each further segment takes an upload
+        slot that is free at the start, so no more than `max_concurrent_uploads`
+        upload requests are in flight across the client.
 
-            response = await self._make_request(
-                "POST",
-                f"object/documents/{user_id}/{unique_filename}",
-                files=files,
-                service="storage",
+        Args:
+            file_path: Path to the file to upload
+            object_name: Path of the object within the documents bucket
+            file_size: Size of the file in bytes
+
+        Raises:
+            ClientException: If the upload cannot be completed
+        """
+        metadata = upload_metadata("documents", object_name)
+        semaphore = self._get_upload_semaphore()
+        extra_slots = 0
+        if self._max_concurrent_uploads > 1 and await self._supports_concatenation():
+            wanted = plan_segments(
+                file_size, RESUMABLE_PART_SIZE, self._max_concurrent_uploads
             )
+            # Slots are only taken while free, waiting for them could deadlock
+            # with uploads holding their own slot
+            while extra_slots < len(wanted) - 1 and not semaphore.locked():
+                await semaphore.acquire()
+                extra_slots += 1
+        if not extra_slots:
+            await self._upload_segment(
+                file_path, 0, file_size, creation_headers(file_size, metadata)
+            )
+            return
 
-            file_url = response["Key"]
-            # Strip the prefix, as the workflow automatically looks in the bucket
-            return file_url[len("documents/") :]
-        except Exception as e:
-            raise ClientException(f"File upload failed: {e}")
+        segments = plan_segments(file_size, RESUMABLE_PART_SIZE, extra_slots + 1)
+        tasks = [
+            asyncio.ensure_future(
+                self._upload_segment(
+                    file_path,
+                    start,
+                    length,
+                    creation_headers(length, concat="partial"),
+                )
+            )
+            for start, length in segments
+        ]
+        try:
+            upload_urls = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for _ in range(extra_slots):
+                semaphore.release()
+        await self._tus_request(
+            "POST",
+            RESUMABLE_UPLOAD_PATH,
+            creation_headers(metadata=metadata, concat=final_concat(upload_urls)),
+        )
+
+    async def _upload_segment(
+        self, file_path: str, start: int, length: int, headers: Dict[str, str]
+    ) -> str:
+        """Create a resumable upload and send a segment of a file to it.
+
+        After a failed request the upload is resumed from the offset the server
+        has received, giving up after `RESUMABLE_MAX_ATTEMPTS` consecutive
+        failures.
+
+        Returns:
+            The URL of the upload
+        """
+        upload_url = upload_location(
+            await self._tus_request("POST", RESUMABLE_UPLOAD_PATH, headers)
+        )
+        offset = 0
+        failures = 0
+        async with aiofiles.open(file_path, "rb") as file_obj:
+            while offset < length:
+                try:
+                    if failures:
+                        response = await self._tus_request(
+                            "HEAD", upload_url, head_headers()
+                        )
+                        offset = upload_offset(response)
+                        if offset >= length:
+                            break
+                    # Parts end on part boundaries, also after resuming
+                    part_size = RESUMABLE_PART_SIZE - offset % RESUMABLE_PART_SIZE
+                    part_length = min(part_size, length - offset)
+                    await file_obj.seek(start + offset)
+                    response = await self._tus_request(
+                        "PATCH",
+                        upload_url,
+                        patch_headers(offset, part_length),
+                        content=self._stream_part(file_obj, part_length),
+                    )
+                    offset = upload_offset(response)
+                    failures = 0
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    failures += 1
+                    if failures >= RESUMABLE_MAX_ATTEMPTS:
+                        raise ClientException(
+                            f"Resumable upload failed after {failures} attempts: {e}"
+                        )
+                    await asyncio.sleep(retry_delay(failures))
+        return upload_url
+
+    @staticmethod
+    async def _stream_part(
+        file_obj: AsyncBufferedReader, length: int
+    ) -> AsyncIterator[bytes]:
+        # Parts are streamed in chunks rather than read whole, as httpx keeps
+        # a request's body until its response is garbage collected
+        while length > 0:
+            chunk = await file_obj.read(min(UPLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+    async def _supports_concatenation(self) -> bool:
+        """Check once whether the storage service can join partial uploads."""
+        if self._resumable_concatenation is None:
+            try:
+                response = await self._tus_request(
+                    "OPTIONS", RESUMABLE_UPLOAD_PATH, head_headers()
+                )
+                self._resumable_concatenation = supports_concatenation(response)
+            except httpx.HTTPError:
+                self._resumable_concatenation = False
+        return self._resumable_concatenation
+
+    async def _tus_request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        content: Optional[AsyncIterable[bytes]] = None,
+    ) -> httpx.Response:
+        with self._circuit(STORAGE):
+            async with self._rate_limited(UPLOADS):
+                with self._measured("storage", url):
+                    response = await self.session.request(
+                        method, url, headers=headers, content=content
+                    )
+                    count_transfer(response)
+                    record_transfer(response)
+                    response.raise_for_status()
+        return response
+
+    def _get_upload_semaphore(self) -> asyncio.Semaphore:
+        # Every upload request in flight holds the semaphore, whether it sends
+        # a whole file or a segment of one. Created on first use, so it binds
+        # to the running event loop.
+        if self._upload_semaphore is None:
+            self._upload_semaphore = asyncio.Semaphore(self._max_concurrent_uploads)
+        return self._upload_semaphore
+
+    async def _upload_files(self, files: Dict[str, str]) -> Dict[str, str]:
+        """Upload workflow input files concurrently.
+
+        If an upload fails the remaining uploads are cancelled.
+
+        Args:
+            files: Dictionary mapping workflow argument names to file paths
+
+        Returns:
+            Dictionary mapping the workflow argument names to uploaded file paths
+
+        Raises:
+            ClientException: If any file upload fails
+        """
+        semaphore = self._get_upload_semaphore()
+
+        async def upload(arg_name: str, file_path: str) -> str:
+            async with semaphore:
+                started = time.monotonic()
+                uploaded_path = await self._upload_file(file_path)
+                record_upload(arg_name, time.monotonic() - started)
+                return uploaded_path
+
+        tasks = {
+            arg_name: asyncio.ensure_future(upload(arg_name, file_path))
+            for arg_name, file_path in files.items()
+        }
+        try:
+            await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        errors = {
+            arg_name: cast(Exception, task.exception())
+            for arg_name, task in tasks.items()
+            if not task.cancelled() and task.exception() is not None
+        }
+        if errors:
+            raise self._upload_failure(errors)
+        return {arg_name: task.result() for arg_name, task in tasks.items()}
+
+    @staticmethod
+    async def _stream_multipart(
+        file_path: str, multipart: MultipartFile
+    ) -> AsyncIterator[bytes]:
+        yield multipart.preamble
+        async with aiofiles.open(file_path, "rb") as file_obj:
+            while True:
+                chunk = await file_obj.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        yield multipart.epilogue
 
     async def run_workflow(
         self,
@@ -179,21 +757,151 @@ class AsyncClient(TWSClient):
         retry_delay=1,
         tags: Optional[Dict[str, str]] = None,
         files: Optional[Dict[str, str]] = None,
+        polling_policy: Optional[PollingPolicy] = None,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+        return_report: bool = False,
     ):
+        recorder = RunRecorder() if return_report or self._metrics is not None else None
+        span = trace(
+            self._tracer, RUN_WORKFLOW, {WORKFLOW_DEFINITION_ID: workflow_definition_id}
+        )
+        with span, recording(recorder), self._workflow_metrics(recorder):
+            started_at = time.monotonic()
+            # Return the earlier result of a workflow run with the same inputs.
+            # Hashing input files and querying the cache block, so they run in a
+            # thread.
+            loop = asyncio.get_running_loop()
+            cache = self._result_cache
+            cache_key = None
+            if cache is not None and use_cache:
+                self._validate_files(files)
+                cache_key = await loop.run_in_executor(
+                    None,
+                    cache.key,
+                    workflow_definition_id,
+                    workflow_args,
+                    self._cache_namespace,
+                    files,
+                )
+                if not refresh_cache:
+                    cached_result = await loop.run_in_executor(
+                        None, cache.get, cache_key
+                    )
+                    if cached_result is not None:
+                        if recorder is not None:
+                            recorder.cached = True
+                        return self._run_result(cached_result, recorder, return_report)
+
+            async def execute() -> dict:
+                handle = await self.start_workflow(
+                    workflow_definition_id,
+                    workflow_args,
+                    timeout=timeout,
+                    retry_delay=retry_delay,
+                    tags=tags,
+                    files=files,
+                    polling_policy=polling_policy,
+                )
+                return await handle.wait()
+
+            request_key = None
+            if self._coalesce_requests:
+                # Callers that wait for a request in flight do not start one
+                # themselves, so their parameters are validated here
+                self._validate_workflow_params(timeout, retry_delay)
+                request_key = self._request_key(
+                    workflow_definition_id, workflow_args, tags, files
+                )
+            if request_key is not None:
+                result = await self._coalesce(request_key, execute, timeout, started_at)
+            else:
+                result = await execute()
+            if cache is not None and cache_key is not None:
+                await loop.run_in_executor(None, cache.put, cache_key, result)
+            return self._run_result(result, recorder, return_report)
+
+    async def _coalesce(
+        self,
+        request_key: str,
+        execute: Callable[[], Awaitable[dict]],
+        timeout: Union[int, float],
+        started_at: float,
+    ) -> dict:
+        """Execute a workflow request unless an identical request is in flight.
+
+        The request is executed in a task shared by all callers, which receive
+        a copy of the result. Callers that did not start the task wait for it
+        no longer than their own timeout. The task is cancelled once every
+        caller waiting for it has been cancelled or timed out.
+
+        Args:
+            request_key: The key identifying the request
+            execute: Executes the request and returns its result
+            timeout: Maximum time in seconds the caller waits for the result
+            started_at: Monotonic time at which the caller's run started
+
+        Returns:
+            The workflow execution result
+
+        Raises:
+            WorkflowTimeoutError: If the request in flight does not finish
+                within the caller's timeout
+        """
+        task = self._in_flight.get(request_key)
+        leader = task is None
+        if task is None:
+            task = asyncio.ensure_future(execute())
+            self._in_flight[request_key] = task
+            self._in_flight_waiters[request_key] = 0
+
+            def finished(_: "asyncio.Future[dict]") -> None:
+                del self._in_flight[request_key]
+                del self._in_flight_waiters[request_key]
+
+            task.add_done_callback(finished)
+
+        else:
+            record_coalesced()
+
+        self._in_flight_waiters[request_key] += 1
+        try:
+            if leader:
+                result = await asyncio.shield(task)
+            else:
+                remaining = timeout - (time.monotonic() - started_at)
+                result = await asyncio.wait_for(asyncio.shield(task), max(remaining, 0))
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if not task.done():
+                self._in_flight_waiters[request_key] -= 1
+                if self._in_flight_waiters[request_key] == 0:
+                    task.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                raise WorkflowTimeoutError(timeout)
+            raise
+        return result if leader else copy.deepcopy(result)
+
+    async def start_workflow(
+        self,
+        workflow_definition_id: str,
+        workflow_args: dict,
+        timeout=600,
+        retry_delay=1,
+        tags: Optional[Dict[str, str]] = None,
+        files: Optional[Dict[str, str]] = None,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> AsyncWorkflowHandle:
         self._validate_workflow_params(timeout, retry_delay)
         self._validate_tags(tags)
         self._validate_files(files)
+        policy = resolve_polling_policy(polling_policy, retry_delay)
 
         # Create a copy of workflow_args to avoid modifying the original
         merged_args = workflow_args.copy()
 
-        # Handle file uploads if provided
+        # Upload the files and merge their IDs into the workflow arguments
         if files:
-            for arg_name, file_path in files.items():
-                # Upload the file and get a file ID
-                file_url = await self._upload_file(file_path)
-                # Merge the file ID into the workflow arguments
-                merged_args[arg_name] = file_url
+            merged_args.update(await self._upload_files(files))
 
         payload = {
             "workflow_definition_id": workflow_definition_id,
@@ -202,6 +910,7 @@ class AsyncClient(TWSClient):
         if tags is not None:
             payload["tags"] = tags
 
+        started = time.monotonic()
         try:
             result = await self._make_rpc_request("start_workflow", payload)
         except httpx.HTTPStatusError as e:
@@ -212,25 +921,301 @@ class AsyncClient(TWSClient):
                 raise ClientException("Workflow definition ID not found")
             raise ClientException(f"HTTP error occurred: {e}")
 
-        workflow_instance_id = result["workflow_instance_id"]
+        record_start(time.monotonic() - started, result["workflow_instance_id"])
+        set_attribute(WORKFLOW_INSTANCE_ID, result["workflow_instance_id"])
+        return AsyncWorkflowHandle(
+            self,
+            result["workflow_instance_id"],
+            workflow_definition_id,
+            timeout,
+            policy,
+            started_at=time.monotonic(),
+        )
+
+    def get_workflow_handle(
+        self,
+        workflow_instance_id: str,
+        workflow_definition_id: Optional[str] = None,
+        timeout=600,
+        retry_delay=1,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> AsyncWorkflowHandle:
+        self._validate_workflow_params(timeout, retry_delay)
+        policy = resolve_polling_policy(polling_policy, retry_delay)
+        return AsyncWorkflowHandle(
+            self, workflow_instance_id, workflow_definition_id, timeout, policy
+        )
+
+    async def _wait_for_instance(
+        self,
+        workflow_definition_id: Optional[str],
+        workflow_instance_id: str,
+        timeout: Union[int, float],
+        policy: PollingPolicy,
+        started_at: Optional[float] = None,
+    ) -> dict:
+        delays = policy.delays(workflow_definition_id)
+        started = time.monotonic()
         start_time = time.time()
 
+        workflow_result = None
+        watch = await self._watch_instance(workflow_instance_id)
+        if watch is not None:
+            assert self._realtime is not None
+            try:
+                workflow_result = await self._wait_for_notification(
+                    workflow_instance_id, watch, start_time, timeout
+                )
+            finally:
+                self._realtime.unwatch(workflow_instance_id, watch)
+
+        # Without a realtime connection, or after losing it, poll for the status
+        polled = workflow_result is None
+        running_at = None
+        if workflow_result is None and self._poller is not None:
+            try:
+                workflow_result, running_at = await asyncio.wait_for(
+                    self._poller.wait(workflow_instance_id, delays),
+                    timeout - (time.monotonic() - started),
+                )
+            except asyncio.TimeoutError:
+                raise WorkflowTimeoutError(timeout)
+        elif workflow_result is None:
+            workflow_result, running_at = await self._poll_until_complete(
+                workflow_instance_id, start_time, timeout, delays
+            )
+
+        # Latencies are only known for workflows started by this client
+        if workflow_definition_id is not None and started_at is not None:
+            if polled:
+                latency = completion_latency(started_at, running_at)
+            else:
+                # Notifications arrive as soon as the workflow completes
+                latency = time.monotonic() - started_at
+            # Learned policies may save their latency model to disk, which
+            # blocks, so the latency is recorded in a thread
+            await asyncio.get_running_loop().run_in_executor(
+                None, policy.record_completion, workflow_definition_id, latency
+            )
+        return workflow_result
+
+    async def _poll_until_complete(
+        self,
+        workflow_instance_id: str,
+        start_time: float,
+        timeout: Union[int, float],
+        delays: Iterator[float],
+    ) -> Tuple[dict, Optional[float]]:
+        initial_delay = next(delays)
+        if initial_delay > 0:
+            await asyncio.sleep(initial_delay)
+
+        # When a poll last found the workflow running
+        running_at = None
         while True:
             self._check_timeout(start_time, timeout)
 
-            params = {"select": "status,result", "id": f"eq.{workflow_instance_id}"}
+            instance = await self._get_instance(workflow_instance_id)
+            workflow_result = self._handle_workflow_status(instance)
+            if workflow_result is not None:
+                return workflow_result, running_at
+
+            running_at = time.monotonic()
+            await asyncio.sleep(next(delays))
+
+    async def _poll_request(self, params: dict) -> Any:
+        """Query workflow instances, hedging the request if it is slow.
+
+        With a hedging policy, the request is sent again when it has not
+        returned after the hedge delay, and the first successful response is
+        used. The other request is cancelled, and waited for so its connection
+        is released and its outcome retrieved.
+
+        Args:
+            params: URL query parameters selecting the instances
+
+        Returns:
+            Parsed JSON response from the API
+        """
+        hedger = self._hedger
+        if hedger is None:
+            return await self._make_request("GET", "workflow_instances", params=params)
+
+        async def timed() -> Any:
+            start = time.monotonic()
             result = await self._make_request(
                 "GET", "workflow_instances", params=params
             )
+            hedger.record_latency(time.monotonic() - start)
+            return result
+
+        delay = hedger.delay()
+        if delay is None:
+            return await timed()
+
+        primary = asyncio.ensure_future(timed())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not hedger.try_hedge():
+                return await primary
 
-            if not result:
-                raise ClientException(
-                    f"Workflow instance {workflow_instance_id} not found"
+            hedge = asyncio.ensure_future(timed())
+            tasks.add(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            hedger.record_win()
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            instance = result[0]
-            workflow_result = self._handle_workflow_status(instance)
-            if workflow_result is not None:
-                return workflow_result
+    async def _get_instance(self, workflow_instance_id: str) -> dict:
+        params = {"select": "status,result", "id": f"eq.{workflow_instance_id}"}
+        count(POLLS)
+        sent_at = time.monotonic()
+        with trace(self._tracer, POLL, {WORKFLOW_INSTANCE_ID: workflow_instance_id}):
+            result = await self._poll_request(params)
+
+        if not result:
+            raise ClientException(f"Workflow instance {workflow_instance_id} not found")
+
+        status = result[0].get("status")
+        record_polls(1, int(status not in TERMINAL_STATUSES), sent_at)
+        set_attribute(WORKFLOW_STATUS, status)
+        return result[0]
+
+    async def _watch_instance(
+        self, workflow_instance_id: str
+    ) -> Optional[asyncio.Future]:
+        """Subscribe to realtime status changes of a workflow instance.
+
+        Connects the realtime listener if needed. Failed connection attempts are
+        retried at most every `REALTIME_RECONNECT_INTERVAL` seconds, in between
+        workflows fall back to polling.
+
+        Returns:
+            A future resolved with the instance once it reaches a terminal
+            status, or None if realtime notifications are unavailable
+        """
+        if self._realtime is None:
+            return None
+
+        if not self._realtime.connected:
+            if time.monotonic() < self._realtime_retry_at:
+                return None
+            if self._realtime_lock is None:
+                self._realtime_lock = asyncio.Lock()
+            async with self._realtime_lock:
+                if (
+                    not self._realtime.connected
+                    and time.monotonic() >= self._realtime_retry_at
+                ):
+                    try:
+                        await self._realtime.connect()
+                    except ClientException:
+                        self._realtime_retry_at = (
+                            time.monotonic() + REALTIME_RECONNECT_INTERVAL
+                        )
 
-            await asyncio.sleep(retry_delay)
+        try:
+            return self._realtime.watch(workflow_instance_id)
+        except RealtimeDisconnected:
+            return None
+
+    async def _wait_for_notification(
+        self,
+        workflow_instance_id: str,
+        watch: asyncio.Future,
+        start_time: float,
+        timeout: Union[int, float],
+    ) -> Optional[dict]:
+        # The workflow may have finished before the subscription was registered,
+        # so check its status once before waiting for a notification
+        instance = await self._get_instance(workflow_instance_id)
+        workflow_result = self._handle_workflow_status(instance)
+        if workflow_result is not None:
+            return workflow_result
+
+        remaining = timeout - (time.time() - start_time)
+        try:
+            instance = await asyncio.wait_for(asyncio.shield(watch), max(remaining, 0))
+        except asyncio.TimeoutError:
+            raise WorkflowTimeoutError(timeout)
+        except RealtimeDisconnected:
+            return None
+        set_attribute(WORKFLOW_STATUS, instance.get("status"))
+        return self._handle_workflow_status(instance)
+
+    async def run_workflows(
+        self,
+        requests: Union[Iterable[Any], AsyncIterable[Any]],
+        max_concurrency: int = 10,
+    ) -> AsyncIterator[WorkflowResult]:
+        """Execute many workflows concurrently, yielding results as they complete.
+
+        Requests are consumed lazily from the iterable, so at most
+        `max_concurrency` workflows are in flight, and held in memory, at once.
+
+        Args:
+            requests: A sync or async iterable of `WorkflowRequest` instances or
+                dictionaries of `run_workflow` arguments
+            max_concurrency: Maximum number of workflows to execute at once
+
+        Yields:
+            A `WorkflowResult` for each request, in order of completion. Failed
+            workflows are reported through the result's `error` attribute.
+
+        Raises:
+            ClientException: If invalid parameters or requests are provided
+        """
+        validate_concurrency(max_concurrency, "Max concurrency")
+
+        iterator = _iterate(requests)
+        pending: Set[asyncio.Future] = set()
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max_concurrency:
+                    try:
+                        request = WorkflowRequest.coerce(await iterator.__anext__())
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    pending.add(
+                        asyncio.ensure_future(self._run_batch_item(index, request))
+                    )
+                    index += 1
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run_batch_item(
+        self, index: int, request: WorkflowRequest
+    ) -> WorkflowResult:
+        try:
+            result = await self.run_workflow(**request.to_kwargs())
+        except Exception as e:
+            return WorkflowResult(index=index, request=request, error=e)
+        # Batch requests do not ask for a run report, so only the result is returned
+        return WorkflowResult(index=index, request=request, result=cast(dict, result))
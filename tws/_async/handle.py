@@ -0,0 +1,189 @@
+import asyncio
+import time
+from typing import (
+    TYPE_CHECKING,
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from tws.base.client import (
+    ClientException,
+    TWSClient,
+    WorkflowFailedError,
+    WorkflowTimeoutError,
+)
+from tws.base.handle import BaseWorkflowHandle
+
+if TYPE_CHECKING:
+    from tws._async.client import AsyncClient
+
+
+class AsyncWorkflowHandle(BaseWorkflowHandle):
+    """A handle to a workflow instance, returned by `AsyncClient.start_workflow`."""
+
+    _client: "AsyncClient"
+
+    async def poll(self) -> Optional[dict]:
+        """Check the workflow status once, without waiting.
+
+        Returns:
+            The workflow execution result if it completed, otherwise None
+
+        Raises:
+            ClientException: If the workflow failed or the status check fails
+        """
+        if self._finished():
+            return self._result
+        return self._check_instance(
+            await self._client._get_instance(self.workflow_instance_id)
+        )
+
+    async def wait(self, timeout: Optional[Union[int, float]] = None) -> dict:
+        """Wait for the workflow to complete or fail.
+
+        Args:
+            timeout: Maximum time in seconds to wait (1-3600), defaults to the
+                timeout the handle was created with
+
+        Returns:
+            The workflow execution result
+
+        Raises:
+            ClientException: If the workflow fails
+            WorkflowTimeoutError: If the workflow does not finish in time
+        """
+        if self._finished():
+            return self._result
+        timeout = self._resolve_timeout(timeout)
+        try:
+            result = await self._client._wait_for_instance(
+                self.workflow_definition_id,
+                self.workflow_instance_id,
+                timeout,
+                self.polling_policy,
+                started_at=self._started_at,
+            )
+        except WorkflowFailedError as e:
+            raise self._fail(e)
+        return self._complete(result)
+
+
+async def _wait_concurrently(
+    handles: List[AsyncWorkflowHandle], timeout: Optional[Union[int, float]]
+) -> AsyncGenerator[Tuple[AsyncWorkflowHandle, asyncio.Future], None]:
+    deadline = None
+    if timeout is not None:
+        TWSClient._validate_timeout(timeout)
+        deadline = time.monotonic() + timeout
+
+    pending: Dict[asyncio.Future, AsyncWorkflowHandle] = {
+        asyncio.ensure_future(handle.wait(timeout)): handle for handle in handles
+    }
+    try:
+        while pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            done, _ = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done and timeout is not None:
+                raise WorkflowTimeoutError(timeout)
+            for task in done:
+                yield pending.pop(task), task
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def as_completed(
+    handles: Iterable[AsyncWorkflowHandle],
+    timeout: Optional[Union[int, float]] = None,
+) -> AsyncGenerator[AsyncWorkflowHandle, None]:
+    """Wait on many workflows, yielding each handle as its workflow finishes.
+
+    Handles are waited on concurrently. A handle is yielded once its workflow
+    completed or failed, awaiting `wait` on it then returns the result or
+    raises the failure. Waits still in progress are cancelled when iteration
+    stops early.
+
+    Args:
+        handles: The workflow handles to wait on
+        timeout: Maximum time in seconds to wait for all workflows (1-3600),
+            defaults to each handle's own timeout
+
+    Yields:
+        The handles, in order of completion
+
+    Raises:
+        WorkflowTimeoutError: If a workflow does not finish within the timeout
+    """
+    iterator = _wait_concurrently(list(handles), timeout)
+    try:
+        async for handle, task in iterator:
+            error = task.exception()
+            if isinstance(error, WorkflowTimeoutError):
+                raise error
+            yield handle
+    finally:
+        await iterator.aclose()
+
+
+async def wait_any(
+    handles: Iterable[AsyncWorkflowHandle],
+    timeout: Optional[Union[int, float]] = None,
+) -> AsyncWorkflowHandle:
+    """Wait until any of the workflows finishes.
+
+    Args:
+        handles: The workflow handles to wait on
+        timeout: Maximum time in seconds to wait (1-3600), defaults to each
+            handle's own timeout
+
+    Returns:
+        The handle of the first workflow to complete or fail
+
+    Raises:
+        ClientException: If no handles are given
+        WorkflowTimeoutError: If no workflow finishes within the timeout
+    """
+    iterator = as_completed(handles, timeout)
+    try:
+        async for handle in iterator:
+            return handle
+    finally:
+        await iterator.aclose()
+    raise ClientException("At least one workflow handle is required")
+
+
+async def wait_all(
+    handles: Iterable[AsyncWorkflowHandle],
+    timeout: Optional[Union[int, float]] = None,
+) -> List[dict]:
+    """Wait until all of the workflows complete.
+
+    Args:
+        handles: The workflow handles to wait on
+        timeout: Maximum time in seconds to wait (1-3600), defaults to each
+            handle's own timeout
+
+    Returns:
+        The workflow execution results, in the order of the handles
+
+    Raises:
+        ClientException: If any workflow fails, raised as soon as it does
+        WorkflowTimeoutError: If the workflows do not finish within the timeout
+    """
+    handles = list(handles)
+    iterator = _wait_concurrently(handles, timeout)
+    try:
+        async for _, task in iterator:
+            task.result()
+    finally:
+        await iterator.aclose()
+    return [await handle.wait() for handle in handles]
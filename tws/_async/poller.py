@@ -0,0 +1,275 @@
+import asyncio
+from contextvars import Context
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from tws.base.client import TERMINAL_STATUSES, ClientException
+from tws.base.report import record_polls
+from tws.base.tracing import (
+    POLL,
+    POLL_INSTANCES,
+    POLLS,
+    WORKFLOW_STATUS,
+    count,
+    set_attribute,
+    trace,
+)
+
+if TYPE_CHECKING:
+    from tws._async.client import AsyncClient
+
+# Upper bound on the length of the comma-separated ID list sent in a single
+# `id=in.(...)` filter, which keeps the request URL well below the limits
+# commonly enforced by proxies and servers (~8 KB).
+MAX_ID_LIST_LENGTH = 4000
+
+
+def chunk_instance_ids(
+    instance_ids: List[str], max_length: int = MAX_ID_LIST_LENGTH
+) -> Iterator[List[str]]:
+    """Split instance IDs into chunks whose joined length fits in a single URL.
+
+    Args:
+        instance_ids: The workflow instance IDs to split
+        max_length: Maximum length of the comma-joined IDs in one chunk
+
+    Yields:
+        Lists of instance IDs
+    """
+    chunk: List[str] = []
+    length = 0
+    for instance_id in instance_ids:
+        added = len(instance_id) + (1 if chunk else 0)
+        if chunk and length + added > max_length:
+            yield chunk
+            chunk = []
+            added = len(instance_id)
+            length = 0
+        chunk.append(instance_id)
+        length += added
+    if chunk:
+        yield chunk
+
+
+class _Waiter:
+    __slots__ = (
+        "future",
+        "delays",
+        "due",
+        "refs",
+        "polls",
+        "first_polled_at",
+        "running_at",
+        "status",
+    )
+
+    def __init__(self, future: asyncio.Future, delays: Iterator[float], now: float):
+        self.future = future
+        self.delays = delays
+        self.due = now + next(delays)
+        self.refs = 0
+        self.polls = 0
+        self.first_polled_at: Optional[float] = None
+        # When a poll last found the instance running
+        self.running_at: Optional[float] = None
+        self.status: Optional[str] = None
+
+
+class BatchStatusPoller:
+    """Polls the status of many workflow instances with shared requests.
+
+    Instead of each waiter issuing its own `id=eq.<id>` request, the poller
+    collects every instance that is due for a status check and queries them
+    together with `id=in.(...)` filters, resolving each waiter's future once
+    its instance reaches a terminal state.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncClient",
+        window: float = 0.25,
+        max_id_list_length: int = MAX_ID_LIST_LENGTH,
+    ):
+        """Initialize the poller.
+
+        Args:
+            client: The client used to issue status requests
+            window: Instances due within this many seconds of the next poll
+                are included in it, so that polls coalesce into fewer requests
+            max_id_list_length: Maximum length of the ID list in one request
+        """
+        self._client = client
+        self._window = window
+        self._max_id_list_length = max_id_list_length
+        self._waiters: Dict[str, _Waiter] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of workflow instances currently being polled."""
+        return len(self._waiters)
+
+    async def wait(
+        self, workflow_instance_id: str, delays: Iterator[float]
+    ) -> Tuple[dict, Optional[float]]:
+        """Wait for a workflow instance to complete.
+
+        Args:
+            workflow_instance_id: The workflow instance to wait for
+            delays: Polling schedule for this instance, as generated by a
+                `PollingPolicy`. If the instance is already being waited on,
+                the existing schedule is kept.
+
+        Returns:
+            The workflow execution result as a dictionary, and the monotonic
+            time at which a poll last found the instance running, if any
+
+        Raises:
+            ClientException: If the workflow fails or the instance is not found
+        """
+        loop = asyncio.get_running_loop()
+        waiter = self._waiters.get(workflow_instance_id)
+        if waiter is None:
+            waiter = _Waiter(loop.create_future(), delays, loop.time())
+            self._waiters[workflow_instance_id] = waiter
+        waiter.refs += 1
+        self._ensure_running()
+
+        try:
+            result = await asyncio.shield(waiter.future)
+            return result, waiter.running_at
+        finally:
+            # Polls are shared, so they are counted towards the waiting
+            # workflow run once it is done waiting
+            count(POLLS, waiter.polls)
+            wasted = waiter.polls - (waiter.status in TERMINAL_STATUSES)
+            record_polls(waiter.polls, wasted, waiter.first_polled_at)
+            if waiter.status is not None:
+                set_attribute(WORKFLOW_STATUS, waiter.status)
+            waiter.refs -= 1
+            if waiter.refs == 0 and not waiter.future.done():
+                # Nobody is waiting on this instance anymore, stop polling it
+                waiter.future.cancel()
+                if self._waiters.get(workflow_instance_id) is waiter:
+                    del self._waiters[workflow_instance_id]
+
+    async def aclose(self) -> None:
+        """Stop the background polling task and fail any remaining waiters."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._fail_all(ClientException("Client closed while waiting for workflow"))
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            # The task polls for every waiter, so it does not inherit the span
+            # of the workflow run that happened to start it
+            self._task = Context().run(asyncio.ensure_future, self._run())
+        else:
+            assert self._wakeup is not None
+            self._wakeup.set()
+
+    def _fail_all(self, exc: Exception) -> None:
+        for waiter in self._waiters.values():
+            if not waiter.future.done():
+                waiter.future.set_exception(exc)
+        self._waiters.clear()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        assert self._wakeup is not None
+        try:
+            while self._waiters:
+                now = loop.time()
+                earliest = min(waiter.due for waiter in self._waiters.values())
+                if earliest > now:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), earliest - now)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                horizon = now + self._window
+                due_ids = [
+                    instance_id
+                    for instance_id, waiter in self._waiters.items()
+                    if waiter.due <= horizon
+                ]
+                await asyncio.gather(
+                    *(
+                        self._poll(chunk)
+                        for chunk in chunk_instance_ids(
+                            due_ids, self._max_id_list_length
+                        )
+                    )
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail_all(ClientException(f"Status polling failed: {e}"))
+
+    async def _poll(self, instance_ids: List[str]) -> None:
+        params = {
+            "select": "id,status,result",
+            "id": f"in.({','.join(instance_ids)})",
+        }
+        for instance_id in instance_ids:
+            waiter = self._waiters.get(instance_id)
+            if waiter is not None:
+                waiter.polls += 1
+                if waiter.first_polled_at is None:
+                    waiter.first_polled_at = time.monotonic()
+        try:
+            with trace(self._client._tracer, POLL, {POLL_INSTANCES: len(instance_ids)}):
+                rows = await self._client._poll_request(params)
+        except Exception as e:
+            for instance_id in instance_ids:
+                self._resolve(instance_id, exc=e)
+            return
+
+        instances = {row.get("id"): row for row in rows or []}
+        now = asyncio.get_running_loop().time()
+        for instance_id in instance_ids:
+            instance = instances.get(instance_id)
+            if instance is None:
+                self._resolve(
+                    instance_id,
+                    exc=ClientException(f"Workflow instance {instance_id} not found"),
+                )
+                continue
+
+            waiter = self._waiters.get(instance_id)
+            if waiter is not None:
+                waiter.status = instance.get("status")
+            try:
+                workflow_result = self._client._handle_workflow_status(instance)
+            except Exception as e:
+                self._resolve(instance_id, exc=e)
+                continue
+
+            if workflow_result is not None:
+                self._resolve(instance_id, result=workflow_result)
+            elif waiter is not None:
+                waiter.running_at = time.monotonic()
+                waiter.due = now + next(waiter.delays)
+
+    def _resolve(
+        self,
+        instance_id: str,
+        result: Optional[dict] = None,
+        exc: Optional[BaseException] = None,
+    ) -> None:
+        waiter = self._waiters.pop(instance_id, None)
+        if waiter is None or waiter.future.done():
+            return
+        if exc is not None:
+            waiter.future.set_exception(exc)
+        else:
+            waiter.future.set_result(result)
@@ -0,0 +1,65 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from tws._async.client import AsyncClient
+from tws.base.pool import BaseClientPool
+
+
+class AsyncClientPool(BaseClientPool[AsyncClient]):
+    """Hands out asynchronous clients for many sets of API keys.
+
+    The pool and its clients must be used from a single event loop.
+
+    Example:
+        async with AsyncClientPool(max_clients=256) as pool:
+            async with pool.client(public_key, secret_key, api_url) as client:
+                await client.run_workflow(workflow_definition_id, workflow_args)
+    """
+
+    def _create_client(
+        self, public_key: str, secret_key: str, api_url: str, **options: Any
+    ) -> AsyncClient:
+        return AsyncClient(public_key, secret_key, api_url, **options)
+
+    @asynccontextmanager
+    async def client(
+        self, public_key: str, secret_key: str, api_url: str
+    ) -> AsyncIterator[AsyncClient]:
+        """Lease the client of a set of credentials.
+
+        The client stays open until the block exits, even if it is evicted
+        meanwhile. Do not keep a reference to it after the block.
+
+        Args:
+            public_key: The TWS public key
+            secret_key: The TWS secret key
+            api_url: The base URL for your TWS API instance
+
+        Raises:
+            ClientException: If the credentials are malformed
+        """
+        entry, closable = self._checkout(public_key, secret_key, api_url)
+        try:
+            for evicted in closable:
+                await evicted.__aexit__(None, None, None)
+            yield entry.client
+        finally:
+            if self._checkin(entry):
+                await entry.client.__aexit__(None, None, None)
+
+    async def aclose(self) -> None:
+        """Close every client that is not in use, and the transport if owned.
+
+        Clients in use are closed once released, so only close the pool after
+        they are.
+        """
+        for client in self._drain():
+            await client.__aexit__(None, None, None)
+        if self._owns_transport:
+            await self._transport.aclose()
+
+    async def __aenter__(self) -> "AsyncClientPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
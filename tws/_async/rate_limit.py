@@ -0,0 +1,52 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from tws.base.rate_limit import AdaptiveLimits, LimiterState
+
+
+class AsyncRateLimiter:
+    """Limits the rate and concurrency of one kind of request across tasks."""
+
+    def __init__(self, limits: AdaptiveLimits):
+        self._state = LimiterState(limits)
+        # Set when a request completes, waking the tasks waiting to start one
+        self._released: Optional[asyncio.Event] = None
+
+    @property
+    def limit(self) -> int:
+        """The current concurrency limit."""
+        return int(self._state.limit)
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[None]:
+        """Wait until a request may start, and record its outcome."""
+        # The state is only used from the event loop, so needs no lock
+        while True:
+            generation, delay = self._state.try_acquire()
+            if generation is not None:
+                break
+            if self._released is None:
+                self._released = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._released.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._state.release(generation, error)
+            if self._released is not None:
+                self._released.set()
+                self._released = None
+
+
+@asynccontextmanager
+async def unlimited() -> AsyncIterator[None]:
+    """Stand in for the limiter of requests that are not limited."""
+    yield
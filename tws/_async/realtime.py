@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+from typing import Dict, Set
+
+from tws.base.client import TERMINAL_STATUSES, ClientException
+from tws.base.realtime import (
+    HEARTBEAT_INTERVAL,
+    MISSING_DEPENDENCY_MESSAGE,
+    RealtimeDisconnected,
+    heartbeat_message,
+    join_message,
+    parse_instance_update,
+    parse_join_reply,
+)
+
+try:
+    from websockets.asyncio.client import connect
+except ImportError:  # pragma: no cover
+    connect = None
+
+
+class AsyncRealtimeListener:
+    """Receives workflow instance status changes over a realtime websocket.
+
+    Waiters register the instances they are interested in with `watch` and are
+    resolved with the instance row once it reaches a terminal status. If the
+    connection is lost every waiter is failed with `RealtimeDisconnected`, so
+    that it can fall back to polling.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        access_token: str,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        connect_timeout: float = 10,
+    ):
+        """Initialize the listener.
+
+        Args:
+            url: The realtime websocket URL
+            access_token: The token used to authorize the subscription
+            heartbeat_interval: Time in seconds between heartbeat messages
+            connect_timeout: Time in seconds to wait for the subscription
+        """
+        self._url = url
+        self._access_token = access_token
+        self._heartbeat_interval = heartbeat_interval
+        self._connect_timeout = connect_timeout
+        self._refs = itertools.count(1)
+        self._websocket = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._watches: Dict[str, Set[asyncio.Future]] = {}
+
+    @property
+    def connected(self) -> bool:
+        """Whether the listener is currently subscribed to status changes."""
+        return self._websocket is not None
+
+    async def connect(self) -> None:
+        """Open the websocket and subscribe to workflow instance changes.
+
+        Raises:
+            ClientException: If the connection or subscription fails
+        """
+        if connect is None:  # pragma: no cover
+            raise ClientException(MISSING_DEPENDENCY_MESSAGE)
+
+        try:
+            websocket = await asyncio.wait_for(self._subscribe(), self._connect_timeout)
+        except ClientException:
+            raise
+        except Exception as e:
+            raise ClientException(f"Realtime connection failed: {e}")
+
+        self._websocket = websocket
+        self._tasks = {
+            asyncio.ensure_future(self._read(websocket)),
+            asyncio.ensure_future(self._heartbeat(websocket)),
+        }
+
+    async def _subscribe(self):
+        assert connect is not None
+        websocket = await connect(self._url)
+        try:
+            ref = str(next(self._refs))
+            await websocket.send(join_message(ref, self._access_token))
+            while True:
+                joined = parse_join_reply(await websocket.recv(), ref)
+                if joined is None:
+                    continue
+                if not joined:
+                    raise ClientException("Realtime subscription was rejected")
+                return websocket
+        except BaseException:
+            await websocket.close()
+            raise
+
+    def watch(self, workflow_instance_id: str) -> asyncio.Future:
+        """Register interest in a workflow instance.
+
+        Args:
+            workflow_instance_id: The workflow instance to watch
+
+        Returns:
+            A future resolved with the instance row once it reaches a terminal
+            status, or failed with `RealtimeDisconnected`
+
+        Raises:
+            RealtimeDisconnected: If the listener is not connected
+        """
+        if not self.connected:
+            raise RealtimeDisconnected("Realtime connection is not open")
+        future = asyncio.get_running_loop().create_future()
+        self._watches.setdefault(workflow_instance_id, set()).add(future)
+        return future
+
+    def unwatch(self, workflow_instance_id: str, future: asyncio.Future) -> None:
+        """Stop watching a workflow instance.
+
+        Args:
+            workflow_instance_id: The watched workflow instance
+            future: The future returned by `watch`
+        """
+        futures = self._watches.get(workflow_instance_id)
+        if futures is not None:
+            futures.discard(future)
+            if not futures:
+                del self._watches[workflow_instance_id]
+        if not future.done():
+            future.cancel()
+
+    async def aclose(self) -> None:
+        """Close the websocket and fail any remaining waiters."""
+        websocket = self._websocket
+        tasks = self._tasks
+        self._disconnect(RealtimeDisconnected("Realtime connection closed"))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if websocket is not None:
+            await websocket.close()
+
+    def _disconnect(self, exc: Exception) -> None:
+        self._websocket = None
+        self._tasks = set()
+        watches, self._watches = self._watches, {}
+        for futures in watches.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+
+    async def _read(self, websocket) -> None:
+        try:
+            async for raw in websocket:
+                record = parse_instance_update(raw)
+                if record is None or record.get("status") not in TERMINAL_STATUSES:
+                    continue
+                for future in self._watches.pop(str(record["id"]), ()):
+                    if not future.done():
+                        future.set_result(record)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+        if self._websocket is websocket:
+            tasks = self._tasks
+            self._disconnect(RealtimeDisconnected("Realtime connection lost"))
+            for task in tasks:
+                if task is not asyncio.current_task():
+                    task.cancel()
+
+    async def _heartbeat(self, websocket) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self._heartbeat_interval)
+                await websocket.send(heartbeat_message(str(next(self._refs))))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The reader notices the broken connection and fails the waiters
+            pass
@@ -0,0 +1,3 @@
+from .handle import WorkflowHandle, as_completed, wait_all, wait_any
+
+__all__ = ["WorkflowHandle", "as_completed", "wait_all", "wait_any"]
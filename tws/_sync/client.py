@@ -1,11 +1,129 @@
+import copy
+from contextlib import nullcontext
+from contextvars import copy_context
 import os
+import threading
 import time
-from typing import Dict, cast, Optional
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    FIRST_EXCEPTION,
+    CancelledError,
+    Future,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    as_completed,
+    wait,
+)
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    Set,
+    Tuple,
+    Union,
+    cast,
+    Optional,
+)
 
 import httpx
 from httpx import Client as SyncHttpClient
 
-from tws.base.client import TWS_API_KEY_HEADER, TWSClient, ClientException
+from tws.base.batch import WorkflowRequest, WorkflowResult, validate_concurrency
+from tws.base.circuit_breaker import (
+    STORAGE,
+    CircuitBreakerPolicy,
+    create_circuit_breakers,
+    endpoint_class,
+    resolve_circuit_breaker_policy,
+)
+from tws.base.client import (
+    TERMINAL_STATUSES,
+    TWS_API_KEY_HEADER,
+    TWSClient,
+    CircuitOpenError,
+    ClientException,
+    WorkflowTimeoutError,
+)
+from tws._sync.handle import WorkflowHandle
+from tws._sync.rate_limit import RateLimiter
+from tws._sync.realtime import RealtimeListener
+from tws.base.hedging import Hedger, HedgingPolicy, resolve_hedging_policy
+from tws.base.multipart import UPLOAD_CHUNK_SIZE
+from tws.base.metrics import MetricsRegistry, endpoint_label, resolve_metrics
+from tws.base.polling import (
+    PollingPolicy,
+    completion_latency,
+    resolve_polling_policy,
+)
+from tws.base.realtime import RealtimeDisconnected, realtime_url
+from tws.base.rate_limit import (
+    UPLOADS,
+    RateLimitPolicy,
+    request_kind,
+    resolve_rate_limit_policy,
+)
+from tws.base.report import (
+    RunRecorder,
+    record_coalesced,
+    record_polls,
+    record_start,
+    record_transfer,
+    record_upload,
+    recording,
+)
+from tws.base.result_cache import ResultCache
+from tws.base.retry import RetryBudget, RetryPolicy, resolve_retry_policy
+from tws.base.resumable import (
+    RESUMABLE_MAX_ATTEMPTS,
+    RESUMABLE_PART_SIZE,
+    RESUMABLE_UPLOAD_PATH,
+    RESUMABLE_UPLOAD_THRESHOLD,
+    creation_headers,
+    final_concat,
+    head_headers,
+    is_retryable,
+    patch_headers,
+    plan_segments,
+    retry_delay,
+    supports_concatenation,
+    upload_location,
+    upload_metadata,
+    upload_offset,
+)
+from tws.base.tracing import (
+    FILE_CACHED,
+    FILE_SIZE,
+    POLL,
+    POLLS,
+    RPC,
+    RPC_FUNCTION,
+    RUN_WORKFLOW,
+    UPLOAD_FILE,
+    WORKFLOW_DEFINITION_ID,
+    WORKFLOW_INSTANCE_ID,
+    WORKFLOW_STATUS,
+    Tracer,
+    count,
+    count_transfer,
+    resolve_tracer,
+    set_attribute,
+    trace,
+)
+from tws.base.session import SessionOptions, resolve_session_options
+from tws.base.transport import SharedTransport
+from tws.base.upload_cache import UploadCache
+from tws.base.user_id_cache import UserIdCache
+
+# Minimum time in seconds between attempts to (re)connect the realtime listener
+REALTIME_RECONNECT_INTERVAL = 30
+
+# Interval in seconds at which a stoppable wait for a notification checks
+# whether it was stopped
+STOP_CHECK_INTERVAL = 0.5
 
 
 class SyncClient(TWSClient):
@@ -14,16 +132,139 @@ class SyncClient(TWSClient):
     Provides synchronous methods for interfacing with the TWS API.
     """
 
-    def __init__(self, public_key: str, secret_key: str, api_url: str):
+    def __init__(
+        self,
+        public_key: str,
+        secret_key: str,
+        api_url: str,
+        max_workers: Optional[int] = None,
+        realtime: bool = False,
+        max_concurrent_uploads: int = 4,
+        upload_cache: Optional[UploadCache] = None,
+        resumable_upload_threshold: int = RESUMABLE_UPLOAD_THRESHOLD,
+        result_cache: Optional[ResultCache] = None,
+        coalesce_requests: bool = False,
+        user_id_cache: Optional[UserIdCache] = None,
+        session_options: Optional[SessionOptions] = None,
+        transport: Optional[SharedTransport] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limit: Optional[RateLimitPolicy] = None,
+        circuit_breaker: Optional[CircuitBreakerPolicy] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        tracer: Optional[Tracer] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         """Initialize the synchronous client.
 
         Args:
             public_key: The TWS public key
             secret_key: The TWS secret key
             api_url: The base URL for your TWS API instance
+            max_workers: Size of the thread pool used by `submit` and
+                `run_workflows`, defaults to the `ThreadPoolExecutor` default
+            realtime: Subscribe to workflow status changes over a realtime
+                websocket instead of polling, falling back to polling while the
+                connection is unavailable. Requires the `websockets` package.
+            max_concurrent_uploads: Maximum number of files, or segments of
+                large files, uploaded at once across all workflows started by
+                the client
+            upload_cache: Optional `UploadCache` used to reuse earlier uploads
+                of files with identical contents instead of uploading them again
+            resumable_upload_threshold: Files larger than this many bytes are
+                uploaded in parts that are resumed after a failure
+            result_cache: Optional `ResultCache` used to return the earlier
+                result of a workflow run with identical inputs instead of
+                executing it again
+            coalesce_requests: Execute identical concurrent `run_workflow`
+                calls once, returning the result to every caller
+            user_id_cache: Optional `UserIdCache` shared with other clients,
+                so only the first client using an API key looks up its user ID
+            session_options: Optional `SessionOptions` configuring the
+                connection pool, HTTP/2 and timeouts of the HTTP session
+            transport: Optional `SharedTransport` whose connection pool is
+                shared with other clients. The pool and HTTP/2 settings of the
+                transport apply instead of those in `session_options`.
+            retry_policy: Optional `RetryPolicy` for API requests that fail
+                transiently, defaults to `RetryPolicy()`
+            rate_limit: Optional `RateLimitPolicy` adapting the rate and
+                concurrency of workflow starts, status polls and uploads to
+                what the API sustains
+            circuit_breaker: Optional `CircuitBreakerPolicy` making requests
+                to rest, rpc and storage endpoints fail fast with
+                `CircuitOpenError` while those endpoints are failing
+            hedging: Optional `HedgingPolicy` sending slow status polls a
+                second time and using whichever response arrives first
+            tracer: Optional `Tracer` receiving spans for workflow runs,
+                uploads, RPCs and status polls
+            metrics: Optional `MetricsRegistry` collecting request latencies,
+                workflow runs in progress, polls per workflow, uploads and
+                errors, which can be shared with other clients
         """
+        if max_workers is not None:
+            validate_concurrency(max_workers, "Max workers")
+        validate_concurrency(max_concurrent_uploads, "Max concurrent uploads")
+        validate_concurrency(resumable_upload_threshold, "Resumable upload threshold")
+        if upload_cache is not None and not isinstance(upload_cache, UploadCache):
+            raise ClientException("Upload cache must be an UploadCache instance")
+        if result_cache is not None and not isinstance(result_cache, ResultCache):
+            raise ClientException("Result cache must be a ResultCache instance")
+        if user_id_cache is not None and not isinstance(user_id_cache, UserIdCache):
+            raise ClientException("User ID cache must be a UserIdCache instance")
+        if transport is not None and not isinstance(transport, SharedTransport):
+            raise ClientException("Transport must be a SharedTransport instance")
+        # Read by create_session, which the base class calls
+        self._session_options = resolve_session_options(session_options)
+        self._shared_transport = transport
+        self._retry_policy = resolve_retry_policy(retry_policy)
+        self._retry_budget = RetryBudget(
+            self._retry_policy.budget_ratio, self._retry_policy.budget_min_retries
+        )
+        self._circuit_breakers = create_circuit_breakers(
+            resolve_circuit_breaker_policy(circuit_breaker)
+        )
+        self._tracer = resolve_tracer(tracer)
+        self._metrics = resolve_metrics(metrics)
+        hedging = resolve_hedging_policy(hedging)
+        self._hedger = Hedger(hedging) if hedging is not None else None
+        rate_limit = resolve_rate_limit_policy(rate_limit)
+        self._rate_limiters: Dict[str, RateLimiter] = (
+            {kind: RateLimiter(limits) for kind, limits in rate_limit.limits().items()}
+            if rate_limit is not None
+            else {}
+        )
         super().__init__(public_key, secret_key, api_url)
         self.session = cast(SyncHttpClient, self.session)
+        # Resolved as `ThreadPoolExecutor` does, so `run_workflows` knows the
+        # size of the pool without creating it
+        self._max_workers = (
+            max_workers
+            if max_workers is not None
+            else min(32, (os.cpu_count() or 1) + 4)
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._max_concurrent_uploads = max_concurrent_uploads
+        # Every upload request in flight holds one of these, whether it sends
+        # a whole file or a segment of one
+        self._upload_slots = threading.Semaphore(max_concurrent_uploads)
+        self._upload_cache = upload_cache
+        self._resumable_upload_threshold = resumable_upload_threshold
+        self._result_cache = result_cache
+        self._coalesce_requests = coalesce_requests
+        self._user_id_cache = user_id_cache
+        self._in_flight: Dict[str, "Future[dict]"] = {}
+        self._in_flight_lock = threading.Lock()
+        self._resumable_concatenation: Optional[bool] = None
+        self._upload_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._user_id_lock = threading.Lock()
+        self._realtime = (
+            RealtimeListener(realtime_url(api_url, public_key), public_key)
+            if realtime
+            else None
+        )
+        self._realtime_lock = threading.Lock()
+        self._realtime_retry_at = 0.0
 
     def create_session(
         self,
@@ -39,20 +280,69 @@ class SyncClient(TWSClient):
         Returns:
             A configured synchronous HTTPX client instance
         """
+        options = self._session_options
+        shared = self._shared_transport
         return SyncHttpClient(
             base_url=base_url,
             headers=headers,
             follow_redirects=True,
-            http2=True,
+            http2=options.http2,
+            limits=options.limits(),
+            timeout=options.timeout(),
+            transport=shared.sync_transport() if shared is not None else None,
         )
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
+        # Let workflows running on the thread pool finish before closing the
+        # session they share
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._upload_executor is not None:
+            self._upload_executor.shutdown(wait=True)
+            self._upload_executor = None
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=True)
+            self._hedge_executor = None
+        if self._realtime is not None:
+            self._realtime.close()
         # Close the underlying HTTP session
         self.session.close()
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="tws"
+                )
+            return self._executor
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        # Polls and their hedges both run here, so the caller can wait for
+        # whichever returns first. Every workflow on the main pool may have a
+        # poll and its hedge in flight.
+        with self._executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=2 * self._max_workers,
+                    thread_name_prefix="tws-hedge",
+                )
+            return self._hedge_executor
+
+    def _get_upload_executor(self) -> ThreadPoolExecutor:
+        # Uploads get their own pool, workflows running on the main pool wait
+        # for them and would otherwise starve it
+        with self._executor_lock:
+            if self._upload_executor is None:
+                self._upload_executor = ThreadPoolExecutor(
+                    max_workers=self._max_concurrent_uploads,
+                    thread_name_prefix="tws-upload",
+                )
+            return self._upload_executor
+
     def _lookup_user_id(self) -> str:
         """Look up the user ID associated with the API key.
 
@@ -62,21 +352,49 @@ class SyncClient(TWSClient):
         Raises:
             ClientException: If the user ID cannot be found
         """
-        if self.user_id is None:
-            params = {
-                "select": "user_id",
-                "api_key": f"eq.{self.session.headers[TWS_API_KEY_HEADER]}",
-            }
-            try:
-                response = self._make_request("GET", "users_private", params=params)
-                if not response or len(response) == 0:
-                    raise ClientException("User ID not found, is your API key correct?")
-                self.user_id = response[0]["user_id"]
-            except Exception as e:
-                raise ClientException(f"Failed to look up user ID: {e}")
+        if self.user_id is not None:
+            return self.user_id
+
+        # Only one thread performs the lookup, the others wait for its result
+        with self._user_id_lock:
+            api_key = self.session.headers[TWS_API_KEY_HEADER]
+            if self.user_id is None and self._user_id_cache is not None:
+                self.user_id = self._user_id_cache.get(api_key)
+            if self.user_id is None:
+                params = {"select": "user_id", "api_key": f"eq.{api_key}"}
+                try:
+                    response = self._make_request("GET", "users_private", params=params)
+                    if not response or len(response) == 0:
+                        raise ClientException(
+                            "User ID not found, is your API key correct?"
+                        )
+                    self.user_id = response[0]["user_id"]
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    raise ClientException(f"Failed to look up user ID: {e}")
+                if self._user_id_cache is not None:
+                    self._user_id_cache.put(api_key, self.user_id)
 
         return self.user_id
 
+    def prefetch(self) -> None:
+        """Look up the user ID ahead of the first file upload.
+
+        Uploads need the user ID associated with the API key. Calling this
+        when the client is created moves the lookup out of the first workflow
+        run. The user ID is stored in `user_id`, and in the client's
+        `UserIdCache`, if any, for other clients using the same API key.
+
+        Returns:
+            None, once the user ID is known
+
+        Raises:
+            CircuitOpenError: If the API is considered down
+            ClientException: If the user ID cannot be found
+        """
+        self._lookup_user_id()
+
     def _make_request(
         self,
         method: str,
@@ -88,6 +406,8 @@ class SyncClient(TWSClient):
     ):
         """Make a HTTP request to the TWS API.
 
+        Transient failures are retried according to the client's retry policy.
+
         Args:
             method: HTTP method to use (GET, POST, etc)
             uri: API endpoint URI
@@ -100,14 +420,58 @@ class SyncClient(TWSClient):
         Raises:
             ClientException: If a request error occurs
         """
-        try:
-            response = self.session.request(
-                method, f"/{service}/v1/{uri}", json=payload, params=params, files=files
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.RequestError as e:
-            raise ClientException(f"Request error occurred: {e}")
+        self._retry_budget.deposit()
+        kind = request_kind(service, uri)
+        endpoint = endpoint_class(service, uri)
+        attempt = 1
+        while True:
+            try:
+                with self._circuit(endpoint), self._rate_limited(kind):
+                    with self._measured(service, uri):
+                        response = self.session.request(
+                            method,
+                            f"/{service}/v1/{uri}",
+                            json=payload,
+                            params=params,
+                            files=files,
+                        )
+                        count_transfer(response)
+                        record_transfer(response)
+                        response.raise_for_status()
+                return response.json()
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                # Files are read as they are sent and cannot be sent again
+                delay = (
+                    self._retry_policy.delay(e, method, attempt)
+                    if files is None
+                    else None
+                )
+                if delay is None or not self._retry_budget.withdraw():
+                    if isinstance(e, httpx.RequestError):
+                        raise ClientException(f"Request error occurred: {e}")
+                    raise
+            attempt += 1
+            time.sleep(delay)
+
+    def _circuit(self, endpoint: str) -> ContextManager[None]:
+        breaker = self._circuit_breakers.get(endpoint)
+        return breaker.request() if breaker is not None else nullcontext()
+
+    def _workflow_metrics(
+        self, recorder: Optional[RunRecorder]
+    ) -> ContextManager[None]:
+        if self._metrics is None:
+            return nullcontext()
+        return self._metrics.workflow(recorder)
+
+    def _measured(self, service: str, uri: str) -> ContextManager[None]:
+        if self._metrics is None:
+            return nullcontext()
+        return self._metrics.request(endpoint_label(service, uri))
+
+    def _rate_limited(self, kind: Optional[str]) -> ContextManager[None]:
+        limiter = self._rate_limiters.get(kind) if kind is not None else None
+        return limiter.request() if limiter is not None else nullcontext()
 
     def _make_rpc_request(self, function_name: str, payload: Optional[dict] = None):
         """Make an RPC request to the TWS API.
@@ -119,7 +483,8 @@ class SyncClient(TWSClient):
         Returns:
             Parsed JSON response from the API
         """
-        return self._make_request("POST", f"rpc/{function_name}", payload)
+        with trace(self._tracer, RPC, {RPC_FUNCTION: function_name}):
+            return self._make_request("POST", f"rpc/{function_name}", payload)
 
     def _upload_file(self, file_path: str) -> str:
         """Upload a file to the TWS API.
@@ -133,27 +498,254 @@ class SyncClient(TWSClient):
         Raises:
             ClientException: If the file upload fails
         """
-        try:
-            if not os.path.exists(file_path):
-                raise ClientException(f"File not found: {file_path}")
-            filename = os.path.basename(file_path)
+        with trace(self._tracer, UPLOAD_FILE, {}):
+            try:
+                if not os.path.exists(file_path):
+                    raise ClientException(f"File not found: {file_path}")
+                filename = os.path.basename(file_path)
+
+                # Reuse an earlier upload of a file with the same contents
+                cache = self._upload_cache
+                cache_key = None
+                if cache is not None:
+                    cache_key = cache.key(file_path, self._lookup_user_id())
+                    cached_path = cache.get(cache_key)
+                    set_attribute(FILE_CACHED, cached_path is not None)
+                    if cached_path is not None:
+                        return cached_path
 
-            with open(file_path, "rb") as file_obj:
-                # Upload the file to get a file URL
                 unique_filename = f"{int(time.time())}-{filename}"
-                user_id = self._lookup_user_id()
-                response = self._make_request(
-                    "POST",
-                    f"object/documents/{user_id}/{unique_filename}",
-                    files={"upload-file": file_obj},
-                    service="storage",
+                file_size = os.path.getsize(file_path)
+                set_attribute(FILE_SIZE, file_size)
+
+                started = time.monotonic()
+                if file_size > self._resumable_upload_threshold:
+                    # Large files are sent in parts, so a dropped connection only
+                    # costs the part in flight
+                    uploaded_path = f"{self._lookup_user_id()}/{unique_filename}"
+                    self._upload_resumable(file_path, uploaded_path, file_size)
+                else:
+                    with open(file_path, "rb") as file_obj:
+                        # Upload the file to get a file URL
+                        user_id = self._lookup_user_id()
+                        response = self._make_request(
+                            "POST",
+                            f"object/documents/{user_id}/{unique_filename}",
+                            files={"upload-file": file_obj},
+                            service="storage",
+                        )
+
+                    file_url = response["Key"]
+                    # Strip the prefix, the workflow automatically looks in the bucket
+                    uploaded_path = file_url[len("documents/") :]
+                if self._metrics is not None:
+                    self._metrics.record_upload(file_size, time.monotonic() - started)
+                if cache is not None and cache_key is not None:
+                    cache.put(cache_key, uploaded_path)
+                return uploaded_path
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                raise ClientException(f"File upload failed: {e}")
+
+    def _upload_resumable(
+        self, file_path: str, object_name: str, file_size: int
+    ) -> None:
+        """Upload a file in parts with the resumable upload protocol.
+
+        If the storage service supports concatenation, the file is split into
+        segments that are uploaded in parallel and joined afterwards. Besides
+        the upload slot held by the file, each further segment takes an upload
+        slot that is free at the start, so no more than `max_concurrent_uploads`
+        upload requests are in flight across the client.
+
+        Args:
+            file_path: Path to the file to upload
+            object_name: Path of the object within the documents bucket
+            file_size: Size of the file in bytes
+
+        Raises:
+            ClientException: If the upload cannot be completed
+        """
+        metadata = upload_metadata("documents", object_name)
+        extra_slots = 0
+        if self._max_concurrent_uploads > 1 and self._supports_concatenation():
+            wanted = plan_segments(
+                file_size, RESUMABLE_PART_SIZE, self._max_concurrent_uploads
+            )
+            # Slots are only taken while free, waiting for them could deadlock
+            # with uploads holding their own slot
+            while extra_slots < len(wanted) - 1 and self._upload_slots.acquire(
+                blocking=False
+            ):
+                extra_slots += 1
+        if not extra_slots:
+            self._upload_segment(
+                file_path, 0, file_size, creation_headers(file_size, metadata)
+            )
+            return
+
+        segments = plan_segments(file_size, RESUMABLE_PART_SIZE, extra_slots + 1)
+        try:
+            with ThreadPoolExecutor(
+                max_workers=len(segments), thread_name_prefix="tws-upload-part"
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        copy_context().run,
+                        self._upload_segment,
+                        file_path,
+                        start,
+                        length,
+                        creation_headers(length, concat="partial"),
+                    )
+                    for start, length in segments
+                ]
+                _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in not_done:
+                    future.cancel()
+        finally:
+            for _ in range(extra_slots):
+                self._upload_slots.release()
+        for future in futures:
+            if not future.cancelled() and future.exception() is not None:
+                raise cast(Exception, future.exception())
+        upload_urls = [future.result() for future in futures]
+        self._tus_request(
+            "POST",
+            RESUMABLE_UPLOAD_PATH,
+            creation_headers(metadata=metadata, concat=final_concat(upload_urls)),
+        )
+
+    def _upload_segment(
+        self, file_path: str, start: int, length: int, headers: Dict[str, str]
+    ) -> str:
+        """Create a resumable upload and send a segment of a file to it.
+
+        After a failed request the upload is resumed from the offset the server
+        has received, giving up after `RESUMABLE_MAX_ATTEMPTS` consecutive
+        failures.
+
+        Returns:
+            The URL of the upload
+        """
+        upload_url = upload_location(
+            self._tus_request("POST", RESUMABLE_UPLOAD_PATH, headers)
+        )
+        offset = 0
+        failures = 0
+        with open(file_path, "rb") as file_obj:
+            while offset < length:
+                try:
+                    if failures:
+                        response = self._tus_request("HEAD", upload_url, head_headers())
+                        offset = upload_offset(response)
+                        if offset >= length:
+                            break
+                    # Parts end on part boundaries, also after resuming
+                    part_size = RESUMABLE_PART_SIZE - offset % RESUMABLE_PART_SIZE
+                    part_length = min(part_size, length - offset)
+                    file_obj.seek(start + offset)
+                    response = self._tus_request(
+                        "PATCH",
+                        upload_url,
+                        patch_headers(offset, part_length),
+                        content=self._stream_part(file_obj, part_length),
+                    )
+                    offset = upload_offset(response)
+                    failures = 0
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    failures += 1
+                    if failures >= RESUMABLE_MAX_ATTEMPTS:
+                        raise ClientException(
+                            f"Resumable upload failed after {failures} attempts: {e}"
+                        )
+                    time.sleep(retry_delay(failures))
+        return upload_url
+
+    @staticmethod
+    def _stream_part(file_obj: BinaryIO, length: int) -> Iterator[bytes]:
+        # Parts are streamed in chunks rather than read whole, as httpx keeps
+        # a request's body until its response is garbage collected
+        while length > 0:
+            chunk = file_obj.read(min(UPLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+    def _supports_concatenation(self) -> bool:
+        """Check once whether the storage service can join partial uploads."""
+        if self._resumable_concatenation is None:
+            try:
+                response = self._tus_request(
+                    "OPTIONS", RESUMABLE_UPLOAD_PATH, head_headers()
                 )
+                self._resumable_concatenation = supports_concatenation(response)
+            except httpx.HTTPError:
+                self._resumable_concatenation = False
+        return self._resumable_concatenation
 
-            file_url = response["Key"]
-            # Strip the prefix, as the workflow automatically looks in the bucket
-            return file_url[len("documents/") :]
-        except Exception as e:
-            raise ClientException(f"File upload failed: {e}")
+    def _tus_request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        content: Optional[Iterable[bytes]] = None,
+    ) -> httpx.Response:
+        with self._circuit(STORAGE), self._rate_limited(UPLOADS):
+            with self._measured("storage", url):
+                response = self.session.request(
+                    method, url, headers=headers, content=content
+                )
+                count_transfer(response)
+                record_transfer(response)
+                response.raise_for_status()
+        return response
+
+    def _upload_files(self, files: Dict[str, str]) -> Dict[str, str]:
+        """Upload workflow input files concurrently on the upload thread pool.
+
+        If an upload fails the uploads that have not started yet are cancelled,
+        and those in progress are waited for.
+
+        Args:
+            files: Dictionary mapping workflow argument names to file paths
+
+        Returns:
+            Dictionary mapping the workflow argument names to uploaded file paths
+
+        Raises:
+            ClientException: If any file upload fails
+        """
+
+        def upload(arg_name: str, file_path: str) -> str:
+            with self._upload_slots:
+                started = time.monotonic()
+                uploaded_path = self._upload_file(file_path)
+                record_upload(arg_name, time.monotonic() - started)
+                return uploaded_path
+
+        executor = self._get_upload_executor()
+        futures = {
+            arg_name: executor.submit(copy_context().run, upload, arg_name, file_path)
+            for arg_name, file_path in files.items()
+        }
+        _, not_done = wait(futures.values(), return_when=FIRST_EXCEPTION)
+        for future in not_done:
+            future.cancel()
+        wait(not_done)
+
+        errors = {
+            arg_name: cast(Exception, future.exception())
+            for arg_name, future in futures.items()
+            if not future.cancelled() and future.exception() is not None
+        }
+        if errors:
+            raise self._upload_failure(errors)
+        return {arg_name: future.result() for arg_name, future in futures.items()}
 
     def run_workflow(
         self,
@@ -163,21 +755,137 @@ class SyncClient(TWSClient):
         retry_delay=1,
         tags: Optional[Dict[str, str]] = None,
         files: Optional[Dict[str, str]] = None,
+        polling_policy: Optional[PollingPolicy] = None,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+        return_report: bool = False,
     ):
+        recorder = RunRecorder() if return_report or self._metrics is not None else None
+        span = trace(
+            self._tracer, RUN_WORKFLOW, {WORKFLOW_DEFINITION_ID: workflow_definition_id}
+        )
+        with span, recording(recorder), self._workflow_metrics(recorder):
+            started_at = time.monotonic()
+            # Return the earlier result of a workflow run with the same inputs
+            cache = self._result_cache
+            cache_key = None
+            if cache is not None and use_cache:
+                self._validate_files(files)
+                cache_key = cache.key(
+                    workflow_definition_id,
+                    workflow_args,
+                    self._cache_namespace,
+                    files,
+                )
+                if not refresh_cache:
+                    cached_result = cache.get(cache_key)
+                    if cached_result is not None:
+                        if recorder is not None:
+                            recorder.cached = True
+                        return self._run_result(cached_result, recorder, return_report)
+
+            def execute() -> dict:
+                return self.start_workflow(
+                    workflow_definition_id,
+                    workflow_args,
+                    timeout=timeout,
+                    retry_delay=retry_delay,
+                    tags=tags,
+                    files=files,
+                    polling_policy=polling_policy,
+                ).wait()
+
+            request_key = None
+            if self._coalesce_requests:
+                # Callers that wait for a request in flight do not start one
+                # themselves, so their parameters are validated here
+                self._validate_workflow_params(timeout, retry_delay)
+                request_key = self._request_key(
+                    workflow_definition_id, workflow_args, tags, files
+                )
+            if request_key is not None:
+                result = self._coalesce(request_key, execute, timeout, started_at)
+            else:
+                result = execute()
+            if cache is not None and cache_key is not None:
+                cache.put(cache_key, result)
+            return self._run_result(result, recorder, return_report)
+
+    def _coalesce(
+        self,
+        request_key: str,
+        execute: Callable[[], dict],
+        timeout: Union[int, float],
+        started_at: float,
+    ) -> dict:
+        """Execute a workflow request unless an identical request is in flight.
+
+        The first caller executes the request, later callers wait for its
+        outcome, for no longer than their own timeout, and receive a copy of
+        the result.
+
+        Args:
+            request_key: The key identifying the request
+            execute: Executes the request and returns its result
+            timeout: Maximum time in seconds the caller waits for the result
+            started_at: Monotonic time at which the caller's run started
+
+        Returns:
+            The workflow execution result
+
+        Raises:
+            WorkflowTimeoutError: If the request in flight does not finish
+                within the caller's timeout
+        """
+        with self._in_flight_lock:
+            flight = self._in_flight.get(request_key)
+            if flight is None:
+                flight = self._in_flight[request_key] = Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            record_coalesced()
+            remaining = timeout - (time.monotonic() - started_at)
+            try:
+                result = flight.result(max(remaining, 0))
+            except FutureTimeoutError:
+                raise WorkflowTimeoutError(timeout)
+            return copy.deepcopy(result)
+
+        try:
+            result = execute()
+        except BaseException as e:
+            with self._in_flight_lock:
+                del self._in_flight[request_key]
+            flight.set_exception(e)
+            raise
+        with self._in_flight_lock:
+            del self._in_flight[request_key]
+        flight.set_result(result)
+        return result
+
+    def start_workflow(
+        self,
+        workflow_definition_id: str,
+        workflow_args: dict,
+        timeout=600,
+        retry_delay=1,
+        tags: Optional[Dict[str, str]] = None,
+        files: Optional[Dict[str, str]] = None,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> WorkflowHandle:
         self._validate_workflow_params(timeout, retry_delay)
         self._validate_tags(tags)
         self._validate_files(files)
+        policy = resolve_polling_policy(polling_policy, retry_delay)
 
         # Create a copy of workflow_args to avoid modifying the original
         merged_args = workflow_args.copy()
 
-        # Handle file uploads if provided
+        # Upload the files and merge their IDs into the workflow arguments
         if files:
-            for arg_name, file_path in files.items():
-                # Upload the file and get a file ID
-                file_url = self._upload_file(file_path)
-                # Merge the file ID into the workflow arguments
-                merged_args[arg_name] = file_url
+            merged_args.update(self._upload_files(files))
 
         payload = {
             "workflow_definition_id": workflow_definition_id,
@@ -186,6 +894,7 @@ class SyncClient(TWSClient):
         if tags is not None:
             payload["tags"] = tags
 
+        started = time.monotonic()
         try:
             result = self._make_rpc_request("start_workflow", payload)
         except httpx.HTTPStatusError as e:
@@ -196,24 +905,346 @@ class SyncClient(TWSClient):
                 raise ClientException("Workflow definition ID not found")
             raise ClientException(f"HTTP error occurred: {e}")
 
+        record_start(time.monotonic() - started, result["workflow_instance_id"])
+        set_attribute(WORKFLOW_INSTANCE_ID, result["workflow_instance_id"])
         # TODO typing on the responses -- codegen?
-        workflow_instance_id = result["workflow_instance_id"]
-        start_time = time.time()
+        return WorkflowHandle(
+            self,
+            result["workflow_instance_id"],
+            workflow_definition_id,
+            timeout,
+            policy,
+            started_at=time.monotonic(),
+        )
 
-        while True:
-            self._check_timeout(start_time, timeout)
+    def get_workflow_handle(
+        self,
+        workflow_instance_id: str,
+        workflow_definition_id: Optional[str] = None,
+        timeout=600,
+        retry_delay=1,
+        polling_policy: Optional[PollingPolicy] = None,
+    ) -> WorkflowHandle:
+        self._validate_workflow_params(timeout, retry_delay)
+        policy = resolve_polling_policy(polling_policy, retry_delay)
+        return WorkflowHandle(
+            self, workflow_instance_id, workflow_definition_id, timeout, policy
+        )
 
-            params = {"select": "status,result", "id": f"eq.{workflow_instance_id}"}
-            result = self._make_request("GET", "workflow_instances", params=params)
+    def _wait_for_instance(
+        self,
+        workflow_definition_id: Optional[str],
+        workflow_instance_id: str,
+        timeout: Union[int, float],
+        policy: PollingPolicy,
+        started_at: Optional[float] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> dict:
+        """Wait for a workflow instance to complete or fail.
 
-            if not result:
-                raise ClientException(
-                    f"Workflow instance {workflow_instance_id} not found"
+        Args:
+            stop: Set to give up waiting, the wait then raises
+                `concurrent.futures.CancelledError` before its next status check
+        """
+        delays = policy.delays(workflow_definition_id)
+        start_time = time.time()
+
+        workflow_result = None
+        watch = self._watch_instance(workflow_instance_id)
+        if watch is not None:
+            assert self._realtime is not None
+            try:
+                workflow_result = self._wait_for_notification(
+                    workflow_instance_id, watch, start_time, timeout, stop
                 )
+            finally:
+                self._realtime.unwatch(workflow_instance_id, watch)
+
+        # Without a realtime connection, or after losing it, poll for the status
+        polled = workflow_result is None
+        running_at = None
+        if workflow_result is None:
+            workflow_result, running_at = self._poll_until_complete(
+                workflow_instance_id, start_time, timeout, delays, stop
+            )
+
+        # Latencies are only known for workflows started by this client
+        if workflow_definition_id is not None and started_at is not None:
+            if polled:
+                latency = completion_latency(started_at, running_at)
+            else:
+                # Notifications arrive as soon as the workflow completes
+                latency = time.monotonic() - started_at
+            policy.record_completion(workflow_definition_id, latency)
+        return workflow_result
+
+    def _poll_until_complete(
+        self,
+        workflow_instance_id: str,
+        start_time: float,
+        timeout: Union[int, float],
+        delays: Iterator[float],
+        stop: Optional[threading.Event] = None,
+    ) -> Tuple[dict, Optional[float]]:
+        initial_delay = next(delays)
+        if initial_delay > 0:
+            self._sleep(initial_delay, stop)
+
+        # When a poll last found the workflow running
+        running_at = None
+        while True:
+            self._check_stopped(stop)
+            self._check_timeout(start_time, timeout)
 
-            instance = result[0]
+            instance = self._get_instance(workflow_instance_id)
             workflow_result = self._handle_workflow_status(instance)
             if workflow_result is not None:
-                return workflow_result
+                return workflow_result, running_at
+
+            running_at = time.monotonic()
+            self._sleep(next(delays), stop)
+
+    @staticmethod
+    def _sleep(delay: float, stop: Optional[threading.Event]) -> None:
+        if stop is None:
+            time.sleep(delay)
+        else:
+            stop.wait(delay)
+
+    @staticmethod
+    def _check_stopped(stop: Optional[threading.Event]) -> None:
+        if stop is not None and stop.is_set():
+            raise CancelledError()
+
+    def _poll_request(self, params: dict) -> Any:
+        """Query workflow instances, hedging the request if it is slow.
+
+        With a hedging policy, the request is sent again when it has not
+        returned after the hedge delay, and the first successful response is
+        used. The other request runs to completion on the hedge thread pool.
+
+        Args:
+            params: URL query parameters selecting the instances
+
+        Returns:
+            Parsed JSON response from the API
+        """
+
+        def send() -> Any:
+            return self._make_request("GET", "workflow_instances", params=params)
+
+        hedger = self._hedger
+        if hedger is None:
+            return send()
+
+        sent = threading.Event()
 
-            time.sleep(retry_delay)
+        def timed() -> Any:
+            sent.set()
+            start = time.monotonic()
+            result = send()
+            hedger.record_latency(time.monotonic() - start)
+            return result
+
+        delay = hedger.delay()
+        if delay is None:
+            return timed()
+
+        executor = self._get_hedge_executor()
+        primary = executor.submit(copy_context().run, timed)
+        # Time the poll from when it is sent, as time spent queued behind other
+        # polls says nothing about the API being slow
+        sent.wait()
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        if not hedger.try_hedge():
+            return primary.result()
+
+        hedge = executor.submit(copy_context().run, timed)
+        for future in as_completed([primary, hedge]):
+            if future.exception() is None:
+                if future is hedge:
+                    hedger.record_win()
+                return future.result()
+        return primary.result()
+
+    def _get_instance(self, workflow_instance_id: str) -> dict:
+        params = {"select": "status,result", "id": f"eq.{workflow_instance_id}"}
+        count(POLLS)
+        sent_at = time.monotonic()
+        with trace(self._tracer, POLL, {WORKFLOW_INSTANCE_ID: workflow_instance_id}):
+            result = self._poll_request(params)
+
+        if not result:
+            raise ClientException(f"Workflow instance {workflow_instance_id} not found")
+
+        status = result[0].get("status")
+        record_polls(1, int(status not in TERMINAL_STATUSES), sent_at)
+        set_attribute(WORKFLOW_STATUS, status)
+        return result[0]
+
+    def _watch_instance(self, workflow_instance_id: str) -> Optional["Future[dict]"]:
+        """Subscribe to realtime status changes of a workflow instance.
+
+        Connects the realtime listener if needed. Failed connection attempts are
+        retried at most every `REALTIME_RECONNECT_INTERVAL` seconds, in between
+        workflows fall back to polling.
+
+        Returns:
+            A future resolved with the instance once it reaches a terminal
+            status, or None if realtime notifications are unavailable
+        """
+        if self._realtime is None:
+            return None
+
+        if not self._realtime.connected:
+            if time.monotonic() < self._realtime_retry_at:
+                return None
+            with self._realtime_lock:
+                if (
+                    not self._realtime.connected
+                    and time.monotonic() >= self._realtime_retry_at
+                ):
+                    try:
+                        self._realtime.connect()
+                    except ClientException:
+                        self._realtime_retry_at = (
+                            time.monotonic() + REALTIME_RECONNECT_INTERVAL
+                        )
+
+        try:
+            return self._realtime.watch(workflow_instance_id)
+        except RealtimeDisconnected:
+            return None
+
+    def _wait_for_notification(
+        self,
+        workflow_instance_id: str,
+        watch: "Future[dict]",
+        start_time: float,
+        timeout: Union[int, float],
+        stop: Optional[threading.Event] = None,
+    ) -> Optional[dict]:
+        # The workflow may have finished before the subscription was registered,
+        # so check its status once before waiting for a notification
+        instance = self._get_instance(workflow_instance_id)
+        workflow_result = self._handle_workflow_status(instance)
+        if workflow_result is not None:
+            return workflow_result
+
+        while True:
+            self._check_stopped(stop)
+            remaining = max(timeout - (time.time() - start_time), 0)
+            # A stoppable wait wakes up regularly to check whether it was stopped
+            wait_time = remaining
+            if stop is not None:
+                wait_time = min(remaining, STOP_CHECK_INTERVAL)
+            try:
+                instance = watch.result(timeout=wait_time)
+                break
+            except FutureTimeoutError:
+                if wait_time == remaining:
+                    raise WorkflowTimeoutError(timeout)
+            except RealtimeDisconnected:
+                return None
+        set_attribute(WORKFLOW_STATUS, instance.get("status"))
+        return self._handle_workflow_status(instance)
+
+    def submit(
+        self,
+        workflow_definition_id: str,
+        workflow_args: dict,
+        timeout=600,
+        retry_delay=1,
+        tags: Optional[Dict[str, str]] = None,
+        files: Optional[Dict[str, str]] = None,
+        polling_policy: Optional[PollingPolicy] = None,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+        return_report: bool = False,
+    ) -> "Future[Any]":
+        """Execute a workflow on the client's thread pool.
+
+        Takes the same arguments as `run_workflow`.
+
+        Returns:
+            A future resolving to the workflow execution result
+        """
+        return self._get_executor().submit(
+            self.run_workflow,
+            workflow_definition_id,
+            workflow_args,
+            timeout=timeout,
+            retry_delay=retry_delay,
+            tags=tags,
+            files=files,
+            polling_policy=polling_policy,
+            use_cache=use_cache,
+            refresh_cache=refresh_cache,
+            return_report=return_report,
+        )
+
+    def run_workflows(
+        self,
+        requests: Iterable[Any],
+        max_workers: Optional[int] = None,
+    ) -> Iterator[WorkflowResult]:
+        """Execute many workflows concurrently, yielding results as they complete.
+
+        Workflows run on the client's thread pool and share its HTTP session.
+        Requests are consumed lazily from the iterable, so at most `max_workers`
+        workflows are in flight, and held in memory, at once.
+
+        Args:
+            requests: An iterable of `WorkflowRequest` instances or dictionaries
+                of `run_workflow` arguments
+            max_workers: Maximum number of workflows to execute at once, defaults
+                to the size of the client's thread pool
+
+        Yields:
+            A `WorkflowResult` for each request, in order of completion. Failed
+            workflows are reported through the result's `error` attribute.
+
+        Raises:
+            ClientException: If invalid parameters or requests are provided
+        """
+        if max_workers is not None:
+            validate_concurrency(max_workers, "Max workers")
+
+        executor = self._get_executor()
+        window = max_workers or self._max_workers
+        iterator = iter(requests)
+        pending: Set["Future[WorkflowResult]"] = set()
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < window:
+                    try:
+                        request = WorkflowRequest.coerce(next(iterator))
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(self._run_batch_item, index, request))
+                    index += 1
+
+                if not pending:
+                    return
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            # Workflows that already started keep running in the background
+            for future in pending:
+                future.cancel()
+
+    def _run_batch_item(self, index: int, request: WorkflowRequest) -> WorkflowResult:
+        try:
+            result = self.run_workflow(**request.to_kwargs())
+        except Exception as e:
+            return WorkflowResult(index=index, request=request, error=e)
+        # Batch requests do not ask for a run report, so only the result is returned
+        return WorkflowResult(index=index, request=request, result=cast(dict, result))
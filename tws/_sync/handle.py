@@ -0,0 +1,182 @@
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from tws.base.client import (
+    ClientException,
+    TWSClient,
+    WorkflowFailedError,
+    WorkflowTimeoutError,
+)
+from tws.base.handle import BaseWorkflowHandle
+
+if TYPE_CHECKING:
+    from tws._sync.client import SyncClient
+
+
+class WorkflowHandle(BaseWorkflowHandle):
+    """A handle to a workflow instance, returned by `Client.start_workflow`."""
+
+    _client: "SyncClient"
+
+    def poll(self) -> Optional[dict]:
+        """Check the workflow status once, without waiting.
+
+        Returns:
+            The workflow execution result if it completed, otherwise None
+
+        Raises:
+            ClientException: If the workflow failed or the status check fails
+        """
+        if self._finished():
+            return self._result
+        return self._check_instance(
+            self._client._get_instance(self.workflow_instance_id)
+        )
+
+    def wait(self, timeout: Optional[Union[int, float]] = None) -> dict:
+        """Wait for the workflow to complete or fail.
+
+        Args:
+            timeout: Maximum time in seconds to wait (1-3600), defaults to the
+                timeout the handle was created with
+
+        Returns:
+            The workflow execution result
+
+        Raises:
+            ClientException: If the workflow fails
+            WorkflowTimeoutError: If the workflow does not finish in time
+        """
+        return self._wait(timeout)
+
+    def _wait(
+        self,
+        timeout: Optional[Union[int, float]],
+        stop: Optional[threading.Event] = None,
+    ) -> dict:
+        if self._finished():
+            return self._result
+        timeout = self._resolve_timeout(timeout)
+        try:
+            result = self._client._wait_for_instance(
+                self.workflow_definition_id,
+                self.workflow_instance_id,
+                timeout,
+                self.polling_policy,
+                started_at=self._started_at,
+                stop=stop,
+            )
+        except WorkflowFailedError as e:
+            raise self._fail(e)
+        return self._complete(result)
+
+
+def _wait_concurrently(
+    handles: List[WorkflowHandle], timeout: Optional[Union[int, float]]
+) -> Iterator[Tuple[WorkflowHandle, "Future[dict]"]]:
+    deadline = None
+    if timeout is not None:
+        TWSClient._validate_timeout(timeout)
+        deadline = time.monotonic() + timeout
+
+    # Set once the caller stops iterating, so that waits still running give up
+    stop = threading.Event()
+    pending: Dict["Future[dict]", WorkflowHandle] = {
+        handle._client._get_executor().submit(handle._wait, timeout, stop): handle
+        for handle in handles
+    }
+    try:
+        while pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done and timeout is not None:
+                raise WorkflowTimeoutError(timeout)
+            for future in done:
+                yield pending.pop(future), future
+    finally:
+        stop.set()
+        for future in pending:
+            future.cancel()
+
+
+def as_completed(
+    handles: Iterable[WorkflowHandle], timeout: Optional[Union[int, float]] = None
+) -> Iterator[WorkflowHandle]:
+    """Wait on many workflows, yielding each handle as its workflow finishes.
+
+    Handles are waited on concurrently using their clients' thread pools. A
+    handle is yielded once its workflow completed or failed, calling `wait` on
+    it then returns the result or raises the failure.
+
+    Args:
+        handles: The workflow handles to wait on
+        timeout: Maximum time in seconds to wait for all workflows (1-3600),
+            defaults to each handle's own timeout
+
+    Yields:
+        The handles, in order of completion
+
+    Raises:
+        WorkflowTimeoutError: If a workflow does not finish within the timeout
+    """
+    for handle, future in _wait_concurrently(list(handles), timeout):
+        error = future.exception()
+        if isinstance(error, WorkflowTimeoutError):
+            raise error
+        yield handle
+
+
+def wait_any(
+    handles: Iterable[WorkflowHandle], timeout: Optional[Union[int, float]] = None
+) -> WorkflowHandle:
+    """Wait until any of the workflows finishes.
+
+    Args:
+        handles: The workflow handles to wait on
+        timeout: Maximum time in seconds to wait (1-3600), defaults to each
+            handle's own timeout
+
+    Returns:
+        The handle of the first workflow to complete or fail
+
+    Raises:
+        ClientException: If no handles are given
+        WorkflowTimeoutError: If no workflow finishes within the timeout
+    """
+    for handle in as_completed(handles, timeout):
+        return handle
+    raise ClientException("At least one workflow handle is required")
+
+
+def wait_all(
+    handles: Iterable[WorkflowHandle], timeout: Optional[Union[int, float]] = None
+) -> List[dict]:
+    """Wait until all of the workflows complete.
+
+    Args:
+        handles: The workflow handles to wait on
+        timeout: Maximum time in seconds to wait (1-3600), defaults to each
+            handle's own timeout
+
+    Returns:
+        The workflow execution results, in the order of the handles
+
+    Raises:
+        ClientException: If any workflow fails, raised as soon as it does
+        WorkflowTimeoutError: If the workflows do not finish within the timeout
+    """
+    handles = list(handles)
+    for _, future in _wait_concurrently(handles, timeout):
+        future.result()
+    return [handle.wait() for handle in handles]
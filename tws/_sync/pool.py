@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from tws._sync.client import SyncClient
+from tws.base.pool import BaseClientPool
+
+
+class ClientPool(BaseClientPool[SyncClient]):
+    """Hands out synchronous clients for many sets of API keys.
+
+    Example:
+        with ClientPool(max_clients=256) as pool:
+            with pool.client(public_key, secret_key, api_url) as client:
+                client.run_workflow(workflow_definition_id, workflow_args)
+    """
+
+    def _create_client(
+        self, public_key: str, secret_key: str, api_url: str, **options: Any
+    ) -> SyncClient:
+        return SyncClient(public_key, secret_key, api_url, **options)
+
+    @contextmanager
+    def client(
+        self, public_key: str, secret_key: str, api_url: str
+    ) -> Iterator[SyncClient]:
+        """Lease the client of a set of credentials.
+
+        The client stays open until the block exits, even if it is evicted
+        meanwhile. Do not keep a reference to it after the block.
+
+        Args:
+            public_key: The TWS public key
+            secret_key: The TWS secret key
+            api_url: The base URL for your TWS API instance
+
+        Raises:
+            ClientException: If the credentials are malformed
+        """
+        entry, closable = self._checkout(public_key, secret_key, api_url)
+        try:
+            for evicted in closable:
+                evicted.__exit__(None, None, None)
+            yield entry.client
+        finally:
+            if self._checkin(entry):
+                entry.client.__exit__(None, None, None)
+
+    def close(self) -> None:
+        """Close every client that is not in use, and the transport if owned.
+
+        Clients in use are closed once released, so only close the pool after
+        they are.
+        """
+        for client in self._drain():
+            client.__exit__(None, None, None)
+        if self._owns_transport:
+            self._transport.close()
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+import threading
+from typing import Iterator, Optional
+
+from tws.base.rate_limit import AdaptiveLimits, LimiterState
+
+
+class RateLimiter:
+    """Limits the rate and concurrency of one kind of request across threads."""
+
+    def __init__(self, limits: AdaptiveLimits):
+        self._state = LimiterState(limits)
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """The current concurrency limit."""
+        return int(self._state.limit)
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Wait until a request may start, and record its outcome."""
+        with self._condition:
+            while True:
+                generation, delay = self._state.try_acquire()
+                if generation is not None:
+                    break
+                self._condition.wait(delay)
+
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._condition:
+                self._state.release(generation, error)
+                self._condition.notify_all()
@@ -0,0 +1,185 @@
+from concurrent.futures import Future
+import itertools
+import threading
+import time
+from typing import Dict, Set
+
+from tws.base.client import TERMINAL_STATUSES, ClientException
+from tws.base.realtime import (
+    HEARTBEAT_INTERVAL,
+    MISSING_DEPENDENCY_MESSAGE,
+    RealtimeDisconnected,
+    heartbeat_message,
+    join_message,
+    parse_instance_update,
+    parse_join_reply,
+)
+
+try:
+    from websockets.sync.client import connect
+except ImportError:  # pragma: no cover
+    connect = None
+
+
+class RealtimeListener:
+    """Receives workflow instance status changes over a realtime websocket.
+
+    Messages are read on a background thread. Waiters register the instances
+    they are interested in with `watch` and are resolved with the instance row
+    once it reaches a terminal status. If the connection is lost every waiter
+    is failed with `RealtimeDisconnected`, so that it can fall back to polling.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        access_token: str,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        connect_timeout: float = 10,
+    ):
+        """Initialize the listener.
+
+        Args:
+            url: The realtime websocket URL
+            access_token: The token used to authorize the subscription
+            heartbeat_interval: Time in seconds between heartbeat messages
+            connect_timeout: Time in seconds to wait for the subscription
+        """
+        self._url = url
+        self._access_token = access_token
+        self._heartbeat_interval = heartbeat_interval
+        self._connect_timeout = connect_timeout
+        self._refs = itertools.count(1)
+        self._lock = threading.Lock()
+        self._websocket = None
+        self._closed = threading.Event()
+        self._watches: Dict[str, Set[Future]] = {}
+
+    @property
+    def connected(self) -> bool:
+        """Whether the listener is currently subscribed to status changes."""
+        return self._websocket is not None
+
+    def connect(self) -> None:
+        """Open the websocket and subscribe to workflow instance changes.
+
+        Raises:
+            ClientException: If the connection or subscription fails
+        """
+        if connect is None:  # pragma: no cover
+            raise ClientException(MISSING_DEPENDENCY_MESSAGE)
+
+        try:
+            # Entering the connection's context marks it as explicitly managed,
+            # it is closed by `close` or when the reader thread exits
+            websocket = connect(self._url, open_timeout=self._connect_timeout)
+            websocket.__enter__()
+        except Exception as e:
+            raise ClientException(f"Realtime connection failed: {e}")
+
+        try:
+            self._subscribe(websocket)
+        except BaseException as e:
+            websocket.close()
+            if isinstance(e, ClientException):
+                raise
+            raise ClientException(f"Realtime connection failed: {e}")
+
+        self._closed = threading.Event()
+        self._websocket = websocket
+        threading.Thread(target=self._read, args=(websocket,), daemon=True).start()
+        threading.Thread(
+            target=self._heartbeat, args=(websocket, self._closed), daemon=True
+        ).start()
+
+    def _subscribe(self, websocket) -> None:
+        ref = str(next(self._refs))
+        websocket.send(join_message(ref, self._access_token))
+        deadline = time.monotonic() + self._connect_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ClientException("Timed out waiting for realtime subscription")
+            joined = parse_join_reply(websocket.recv(timeout=remaining), ref)
+            if joined is None:
+                continue
+            if not joined:
+                raise ClientException("Realtime subscription was rejected")
+            return
+
+    def watch(self, workflow_instance_id: str) -> "Future[dict]":
+        """Register interest in a workflow instance.
+
+        Args:
+            workflow_instance_id: The workflow instance to watch
+
+        Returns:
+            A future resolved with the instance row once it reaches a terminal
+            status, or failed with `RealtimeDisconnected`
+
+        Raises:
+            RealtimeDisconnected: If the listener is not connected
+        """
+        future: "Future[dict]" = Future()
+        with self._lock:
+            if not self.connected:
+                raise RealtimeDisconnected("Realtime connection is not open")
+            self._watches.setdefault(workflow_instance_id, set()).add(future)
+        return future
+
+    def unwatch(self, workflow_instance_id: str, future: Future) -> None:
+        """Stop watching a workflow instance.
+
+        Args:
+            workflow_instance_id: The watched workflow instance
+            future: The future returned by `watch`
+        """
+        with self._lock:
+            futures = self._watches.get(workflow_instance_id)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._watches[workflow_instance_id]
+        future.cancel()
+
+    def close(self) -> None:
+        """Close the websocket and fail any remaining waiters."""
+        websocket = self._websocket
+        self._disconnect(websocket, RealtimeDisconnected("Realtime connection closed"))
+        if websocket is not None:
+            websocket.close()
+
+    def _disconnect(self, websocket, exc: Exception) -> None:
+        with self._lock:
+            if websocket is None or self._websocket is not websocket:
+                return
+            self._websocket = None
+            self._closed.set()
+            watches, self._watches = self._watches, {}
+        for futures in watches.values():
+            for future in futures:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(exc)
+
+    def _read(self, websocket) -> None:
+        try:
+            for raw in websocket:
+                record = parse_instance_update(raw)
+                if record is None or record.get("status") not in TERMINAL_STATUSES:
+                    continue
+                with self._lock:
+                    futures = self._watches.pop(str(record["id"]), set())
+                for future in futures:
+                    if future.set_running_or_notify_cancel():
+                        future.set_result(record)
+        except Exception:
+            pass
+        self._disconnect(websocket, RealtimeDisconnected("Realtime connection lost"))
+
+    def _heartbeat(self, websocket, closed: threading.Event) -> None:
+        while not closed.wait(self._heartbeat_interval):
+            try:
+                websocket.send(heartbeat_message(str(next(self._refs))))
+            except Exception:
+                # The reader notices the broken connection and fails the waiters
+                return
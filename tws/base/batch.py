@@ -0,0 +1,83 @@
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Union
+
+from tws.base.client import ClientException
+from tws.base.polling import PollingPolicy
+
+
+@dataclass
+class WorkflowRequest:
+    """A single workflow execution submitted as part of a batch.
+
+    The fields mirror the arguments of `run_workflow`.
+    """
+
+    workflow_definition_id: str
+    workflow_args: dict
+    timeout: Union[int, float] = 600
+    retry_delay: Union[int, float] = 1
+    tags: Optional[Dict[str, str]] = None
+    files: Optional[Dict[str, str]] = None
+    polling_policy: Optional[PollingPolicy] = None
+    use_cache: bool = True
+    refresh_cache: bool = False
+
+    @classmethod
+    def coerce(cls, request: Any) -> "WorkflowRequest":
+        """Build a request from a `WorkflowRequest` or a dictionary of arguments.
+
+        Args:
+            request: A `WorkflowRequest`, or a dictionary of `run_workflow` arguments
+
+        Returns:
+            The workflow request
+
+        Raises:
+            ClientException: If the request is not a supported type
+        """
+        if isinstance(request, cls):
+            return request
+        if isinstance(request, dict):
+            try:
+                return cls(**request)
+            except TypeError as e:
+                raise ClientException(f"Invalid workflow request: {e}")
+        raise ClientException(
+            "Workflow requests must be WorkflowRequest instances or dictionaries"
+        )
+
+    def to_kwargs(self) -> Dict[str, Any]:
+        """Return the request as keyword arguments for `run_workflow`."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+@dataclass
+class WorkflowResult:
+    """The outcome of a workflow request executed as part of a batch.
+
+    Exactly one of `result` and `error` is set.
+    """
+
+    index: int
+    request: WorkflowRequest
+    result: Optional[dict] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the workflow completed successfully."""
+        return self.error is None
+
+
+def validate_concurrency(value: Any, name: str) -> None:
+    """Validate a concurrency limit.
+
+    Args:
+        value: The limit to validate
+        name: Human readable name of the limit used in the error message
+
+    Raises:
+        ClientException: If the limit is not a positive integer
+    """
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ClientException(f"{name} must be a positive integer")
@@ -0,0 +1,199 @@
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+import threading
+import time
+from typing import Deque, Dict, Iterator, Optional, Union
+
+import httpx
+
+from tws.base.client import CircuitOpenError, ClientException
+
+# Classes of endpoints with a circuit breaker each
+REST = "rest"
+RPC = "rpc"
+STORAGE = "storage"
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreakerPolicy:
+    """When requests to a class of API endpoints fail fast.
+
+    A circuit opens once at least `failure_rate` of the last `window_size`
+    requests, and at least `minimum_requests` of them, failed with a
+    connection error, a timeout or a server error. While open, requests raise
+    `CircuitOpenError` without being sent. After `open_duration` seconds, up to
+    `half_open_requests` probe requests are let through at a time: the circuit
+    closes once a probe succeeds, and opens again if it fails.
+    """
+
+    failure_rate: float = 0.5
+    minimum_requests: int = 10
+    window_size: int = 20
+    open_duration: Union[int, float] = 30
+    half_open_requests: int = 1
+
+    def __post_init__(self):
+        if (
+            isinstance(self.failure_rate, bool)
+            or not isinstance(self.failure_rate, (int, float))
+            or not 0 < self.failure_rate <= 1
+        ):
+            raise ClientException("Failure rate must be between 0 and 1")
+        for name in ("minimum_requests", "window_size", "half_open_requests"):
+            value = getattr(self, name)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                label = name.replace("_", " ").capitalize()
+                raise ClientException(f"{label} must be a positive integer")
+        if self.minimum_requests > self.window_size:
+            raise ClientException("Minimum requests must not exceed the window size")
+        if (
+            isinstance(self.open_duration, bool)
+            or not isinstance(self.open_duration, (int, float))
+            or self.open_duration <= 0
+        ):
+            raise ClientException("Open duration must be a positive number of seconds")
+
+
+def resolve_circuit_breaker_policy(
+    policy: Optional[CircuitBreakerPolicy],
+) -> Optional[CircuitBreakerPolicy]:
+    """Validate the circuit breaker policy of a client.
+
+    Raises:
+        ClientException: If the policy is not a `CircuitBreakerPolicy` instance
+    """
+    if policy is not None and not isinstance(policy, CircuitBreakerPolicy):
+        raise ClientException("Circuit breaker must be a CircuitBreakerPolicy instance")
+    return policy
+
+
+def endpoint_class(service: str, uri: str) -> str:
+    """Return the class of endpoints an API request belongs to."""
+    if service == "storage":
+        return STORAGE
+    if uri.startswith("rpc/"):
+        return RPC
+    return REST
+
+
+def is_failure(error: BaseException) -> bool:
+    """Check whether a failed request indicates the API is degraded."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """Tracks the failures of one class of endpoints, failing fast when open.
+
+    Thread safe, and used from the event loop by the async client as it never
+    blocks.
+    """
+
+    def __init__(self, endpoint: str, policy: CircuitBreakerPolicy):
+        self.endpoint = endpoint
+        self.policy = policy
+        self._outcomes: Deque[bool] = deque(maxlen=policy.window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """The state of the circuit: "closed", "open" or "half_open"."""
+        with self._lock:
+            self._update()
+            return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        """The fraction of recent requests that failed."""
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return sum(self._outcomes) / len(self._outcomes)
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Send a request through the circuit, recording its outcome.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            self._update()
+            if self._state == OPEN:
+                remaining = self._opened_at + self.policy.open_duration
+                raise CircuitOpenError(self.endpoint, remaining - time.monotonic())
+            probe = self._state == HALF_OPEN
+            if probe:
+                if self._probes >= self.policy.half_open_requests:
+                    raise CircuitOpenError(self.endpoint, 0)
+                self._probes += 1
+
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record(probe, error)
+
+    def _update(self) -> None:
+        if (
+            self._state == OPEN
+            and time.monotonic() - self._opened_at >= self.policy.open_duration
+        ):
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+
+    def _record(self, probe: bool, error: Optional[BaseException]) -> None:
+        failure = error is not None and is_failure(error)
+        # Errors other than failed responses, like a cancelled request, say
+        # nothing about the health of the API
+        answered = error is None or isinstance(error, httpx.HTTPStatusError)
+        with self._lock:
+            if probe:
+                self._probes -= 1
+            if not failure and not answered:
+                return
+            if probe:
+                if failure:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                return
+            # Requests started before the circuit opened do not count
+            if self._state != CLOSED:
+                return
+            self._outcomes.append(failure)
+            if (
+                len(self._outcomes) >= self.policy.minimum_requests
+                and sum(self._outcomes) / len(self._outcomes)
+                >= self.policy.failure_rate
+            ):
+                self._open()
+
+
+def create_circuit_breakers(
+    policy: Optional[CircuitBreakerPolicy],
+) -> Dict[str, CircuitBreaker]:
+    """Create a circuit breaker for each class of endpoints, if enabled."""
+    if policy is None:
+        return {}
+    return {
+        endpoint: CircuitBreaker(endpoint, policy) for endpoint in (REST, RPC, STORAGE)
+    }
@@ -1,22 +1,66 @@
 from abc import ABC, abstractmethod
+import hashlib
+import json
+import os
 import re
 import time
-from typing import Optional, Union, Coroutine, Any, Dict
+from typing import TYPE_CHECKING, Optional, Tuple, Union, Coroutine, Any, Dict
 from urllib.parse import urlparse
 
 from httpx import Client as SyncClient, AsyncClient
 
 from tws.utils import is_valid_jwt
 
+if TYPE_CHECKING:
+    from tws.base.circuit_breaker import CircuitBreaker
+    from tws.base.handle import BaseWorkflowHandle
+    from tws.base.hedging import Hedger, HedgingStats
+    from tws.base.polling import PollingPolicy
+    from tws.base.report import RunRecorder, RunReport
+
 TWS_API_KEY_HEADER = "X-TWS-API-KEY"
 
+# Workflow instance statuses after which the status no longer changes
+TERMINAL_STATUSES = frozenset({"COMPLETED", "FAILED"})
+
 
 class ClientException(Exception):
     def __init__(self, message: str):
         super().__init__(message)
 
 
+class WorkflowTimeoutError(ClientException):
+    """Raised when a workflow does not finish within the timeout."""
+
+    def __init__(self, timeout: Union[int, float]):
+        super().__init__(f"Workflow execution timed out after {timeout} seconds")
+        self.timeout = timeout
+
+
+class WorkflowFailedError(ClientException):
+    """Raised when a workflow execution fails."""
+
+    def __init__(self, result: Any):
+        super().__init__(f"Workflow execution failed: {result}")
+        self.result = result
+
+
+class CircuitOpenError(ClientException):
+    """Raised instead of sending a request while the API is considered down."""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(
+            f"The TWS API {endpoint} endpoints are unavailable, "
+            f"retry in {retry_after:.0f} seconds"
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
 class TWSClient(ABC):
+    _circuit_breakers: Dict[str, "CircuitBreaker"]
+    _hedger: Optional["Hedger"]
+
     def __init__(
         self,
         public_key: str,
@@ -54,6 +98,9 @@ class TWSClient(ABC):
         }
         self.session = self.create_session(base_url, headers)
         self.user_id = None
+        # Scopes cached results to the API key, without keeping the key itself
+        # in the cache
+        self._cache_namespace = hashlib.sha256(secret_key.encode()).hexdigest()
 
     @abstractmethod
     def create_session(
@@ -68,8 +115,7 @@ class TWSClient(ABC):
         timeout: Union[int, float],
         retry_delay: Union[int, float],
     ) -> None:
-        if not isinstance(timeout, (int, float)) or timeout < 1 or timeout > 3600:
-            raise ClientException("Timeout must be between 1 and 3600 seconds")
+        TWSClient._validate_timeout(timeout)
         if (
             not isinstance(retry_delay, (int, float))
             or retry_delay < 1
@@ -77,6 +123,11 @@ class TWSClient(ABC):
         ):
             raise ClientException("Retry delay must be between 1 and 60 seconds")
 
+    @staticmethod
+    def _validate_timeout(timeout: Union[int, float]) -> None:
+        if not isinstance(timeout, (int, float)) or timeout < 1 or timeout > 3600:
+            raise ClientException("Timeout must be between 1 and 3600 seconds")
+
     @staticmethod
     def _handle_workflow_status(instance: dict) -> Optional[dict]:
         status = instance.get("status")
@@ -85,17 +136,13 @@ class TWSClient(ABC):
         if status == "COMPLETED":
             return instance.get("result", {})
         elif status == "FAILED":
-            raise ClientException(
-                f"Workflow execution failed: {instance.get('result', {})}"
-            )
+            raise WorkflowFailedError(instance.get("result", {}))
         return None
 
     @staticmethod
     def _check_timeout(start_time: float, timeout: Union[int, float]) -> None:
         if time.time() - start_time > timeout:
-            raise ClientException(
-                f"Workflow execution timed out after {timeout} seconds"
-            )
+            raise WorkflowTimeoutError(timeout)
 
     @staticmethod
     def _validate_tags(tags: Optional[Dict[str, str]]) -> None:
@@ -110,6 +157,58 @@ class TWSClient(ABC):
                         "Tag keys and values must be <= 255 characters"
                     )
 
+    @staticmethod
+    def _upload_failure(errors: Dict[str, Exception]) -> Exception:
+        """Combine the errors of failed file uploads into a single exception.
+
+        Args:
+            errors: Dictionary mapping workflow argument names to upload errors
+
+        Returns:
+            The exception to raise
+        """
+        if len(errors) == 1:
+            return next(iter(errors.values()))
+        details = "; ".join(f"{name}: {error}" for name, error in errors.items())
+        return ClientException(f"{len(errors)} file uploads failed: {details}")
+
+    @staticmethod
+    def _request_key(
+        workflow_definition_id: str,
+        workflow_args: dict,
+        tags: Optional[Dict[str, str]],
+        files: Optional[Dict[str, str]],
+    ) -> Optional[str]:
+        """Identify a workflow request, to coalesce identical in-flight requests.
+
+        The timeout, retry delay and polling policy are not part of the key, as
+        they do not change the result. A caller coalesced with a request in
+        flight still waits no longer than its own timeout.
+
+        Args:
+            workflow_definition_id: The workflow definition to execute
+            workflow_args: The arguments passed to the workflow
+            tags: The tags attached to the workflow
+            files: Dictionary mapping workflow argument names to file paths
+
+        Returns:
+            A hash of the request, or None if the arguments are not JSON
+            serializable and the request cannot be coalesced
+        """
+        file_paths = {
+            arg_name: os.path.abspath(file_path)
+            for arg_name, file_path in (files or {}).items()
+        }
+        try:
+            canonical = json.dumps(
+                [workflow_definition_id, workflow_args, tags, file_paths],
+                sort_keys=True,
+                separators=(",", ":"),
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
     @abstractmethod
     def _lookup_user_id(self) -> Union[str, Coroutine[Any, Any, str]]:
         """Look up the user ID associated with the API key.
@@ -124,6 +223,49 @@ class TWSClient(ABC):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def prefetch(self) -> Union[None, Coroutine[Any, Any, None]]:
+        """Look up the user ID ahead of the first file upload.
+
+        Uploads need the user ID associated with the API key. Calling this
+        when the client is created moves the lookup out of the first workflow
+        run.
+
+        Raises:
+            ClientException: If the user ID cannot be found
+        """
+        raise NotImplementedError()
+
+    def circuit_states(self) -> Dict[str, str]:
+        """Return the state of the circuit breakers, for use in health checks.
+
+        Returns:
+            Dictionary mapping the "rest", "rpc" and "storage" endpoint classes
+            to "closed", "open" or "half_open", empty without a circuit breaker
+        """
+        return {
+            endpoint: breaker.state
+            for endpoint, breaker in self._circuit_breakers.items()
+        }
+
+    def hedging_stats(self) -> Optional["HedgingStats"]:
+        """Return how often status polls were hedged, and how often that helped.
+
+        Returns:
+            The hedging statistics, or None without a hedging policy
+        """
+        return self._hedger.stats() if self._hedger is not None else None
+
+    @staticmethod
+    def _run_result(
+        result: dict, recorder: Optional["RunRecorder"], return_report: bool
+    ) -> Union[dict, Tuple[dict, "RunReport"]]:
+        """Return the result of a workflow run, with its report if requested."""
+        if not return_report:
+            return result
+        assert recorder is not None
+        return result, recorder.report()
+
     @staticmethod
     def _validate_files(files: Optional[Dict[str, str]]) -> None:
         """Validate file upload parameters.
@@ -154,7 +296,15 @@ class TWSClient(ABC):
         retry_delay=1,
         tags: Optional[Dict[str, str]] = None,
         files: Optional[Dict[str, str]] = None,
-    ) -> Union[dict, Coroutine[Any, Any, dict]]:
+        polling_policy: Optional["PollingPolicy"] = None,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+        return_report: bool = False,
+    ) -> Union[
+        dict,
+        Tuple[dict, "RunReport"],
+        Coroutine[Any, Any, Union[dict, Tuple[dict, "RunReport"]]],
+    ]:
         """Execute a workflow and wait for it to complete or fail.
 
         Args:
@@ -164,11 +314,74 @@ class TWSClient(ABC):
             retry_delay: Time in seconds between status checks (1-60)
             tags: Optional dictionary of tag key-value pairs to attach to the workflow
             files: Optional dictionary mapping workflow argument names to file paths
+            polling_policy: Optional `PollingPolicy` deciding when to check the
+                workflow status, overriding `retry_delay`
+            use_cache: Look up and store the result in the client's result
+                cache, if it has one
+            refresh_cache: Execute the workflow even if a cached result exists,
+                replacing it with the new result
+            return_report: Also return a `RunReport` of where the time of the
+                run went
 
         Returns:
-            The workflow execution result as a dictionary
+            The workflow execution result as a dictionary, or a tuple of the
+            result and its `RunReport` if `return_report` is set
 
         Raises:
             ClientException: If the workflow fails, times out, or if invalid parameters are provided
         """
         pass
+
+    @abstractmethod
+    def start_workflow(
+        self,
+        workflow_definition_id: str,
+        workflow_args: dict,
+        timeout=600,
+        retry_delay=1,
+        tags: Optional[Dict[str, str]] = None,
+        files: Optional[Dict[str, str]] = None,
+        polling_policy: Optional["PollingPolicy"] = None,
+    ) -> Union["BaseWorkflowHandle", Coroutine[Any, Any, "BaseWorkflowHandle"]]:
+        """Start a workflow without waiting for it to complete.
+
+        Takes the same arguments as `run_workflow`. The timeout and polling
+        arguments become the defaults used when waiting on the returned handle.
+
+        Returns:
+            A handle to the started workflow instance
+
+        Raises:
+            ClientException: If the workflow cannot be started, or if invalid parameters are provided
+        """
+        pass
+
+    @abstractmethod
+    def get_workflow_handle(
+        self,
+        workflow_instance_id: str,
+        workflow_definition_id: Optional[str] = None,
+        timeout=600,
+        retry_delay=1,
+        polling_policy: Optional["PollingPolicy"] = None,
+    ) -> "BaseWorkflowHandle":
+        """Create a handle to an existing workflow instance.
+
+        Allows waiting on a workflow started elsewhere, for example by another
+        process, from its instance ID alone.
+
+        Args:
+            workflow_instance_id: The ID of the workflow instance
+            workflow_definition_id: The workflow definition of the instance, if
+                known, passed to the polling policy
+            timeout: Default maximum time in seconds to wait for completion (1-3600)
+            retry_delay: Default time in seconds between status checks (1-60)
+            polling_policy: Optional `PollingPolicy` overriding `retry_delay`
+
+        Returns:
+            A handle to the workflow instance
+
+        Raises:
+            ClientException: If invalid parameters are provided
+        """
+        pass
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+import os
+import threading
+from typing import Tuple
+
+from tws.utils import file_sha256
+
+
+class FileDigests:
+    """Computes SHA-256 digests of files, remembering them while files are unchanged.
+
+    A digest is reused as long as the file's size and modification time are
+    the same, so unchanged files are not hashed again.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """Initialize the digests.
+
+        Args:
+            max_entries: Maximum number of file digests remembered
+        """
+        self.max_entries = max_entries
+        self._digests: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, file_path: str) -> str:
+        """Return the SHA-256 hex digest of a file's contents."""
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        with self._lock:
+            known = self._digests.get(file_path)
+        if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return known[2]
+
+        digest = file_sha256(file_path)
+        with self._lock:
+            self._digests[file_path] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._digests.move_to_end(file_path)
+            while len(self._digests) > self.max_entries:
+                self._digests.popitem(last=False)
+        return digest
+
+    def clear(self) -> None:
+        """Forget all remembered digests."""
+        with self._lock:
+            self._digests.clear()
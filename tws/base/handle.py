@@ -0,0 +1,91 @@
+from typing import Any, Optional, Union
+
+from tws.base.client import TERMINAL_STATUSES, TWSClient, WorkflowFailedError
+from tws.base.polling import PollingPolicy
+
+
+class BaseWorkflowHandle:
+    """State shared by the synchronous and asynchronous workflow handles.
+
+    A handle refers to a single workflow instance. Once the instance is seen
+    to complete or fail its outcome is cached on the handle, so waiting on or
+    polling a finished handle again does not make any requests.
+    """
+
+    def __init__(
+        self,
+        client: TWSClient,
+        workflow_instance_id: str,
+        workflow_definition_id: Optional[str],
+        timeout: Union[int, float],
+        polling_policy: PollingPolicy,
+        started_at: Optional[float] = None,
+    ):
+        """Initialize the handle.
+
+        Args:
+            client: The client used to check the workflow status
+            workflow_instance_id: The ID of the workflow instance
+            workflow_definition_id: The workflow definition of the instance,
+                or None if it is unknown
+            timeout: Default maximum time in seconds to wait for completion
+            polling_policy: The policy deciding when to check the status
+            started_at: Monotonic time at which the workflow was started, if it
+                was started by this process. Completion latencies are only
+                recorded with the polling policy when it is known.
+        """
+        self._client = client
+        self.workflow_instance_id = workflow_instance_id
+        self.workflow_definition_id = workflow_definition_id
+        self.timeout = timeout
+        self.polling_policy = polling_policy
+        self._started_at = started_at
+        self._done = False
+        self._result: Any = None
+        self._error: Optional[WorkflowFailedError] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(workflow_instance_id="
+            f"{self.workflow_instance_id!r}, done={self._done})"
+        )
+
+    @property
+    def done(self) -> bool:
+        """Whether the workflow has been seen to complete successfully."""
+        return self._done
+
+    def _resolve_timeout(self, timeout: Optional[Union[int, float]]):
+        if timeout is None:
+            return self.timeout
+        self._client._validate_timeout(timeout)
+        return timeout
+
+    def _finished(self) -> bool:
+        """Whether the outcome is cached, raising it if the workflow failed."""
+        if self._error is not None:
+            raise self._error
+        return self._done
+
+    def _fail(self, error: WorkflowFailedError) -> WorkflowFailedError:
+        self._error = error
+        return error
+
+    def _complete(self, result: Any) -> Any:
+        self._done = True
+        self._result = result
+        return result
+
+    def _check_instance(self, instance: dict) -> Optional[dict]:
+        """Return the result of a completed instance, or None if still running.
+
+        Raises:
+            ClientException: If the workflow failed
+        """
+        try:
+            workflow_result = self._client._handle_workflow_status(instance)
+        except WorkflowFailedError as e:
+            raise self._fail(e)
+        if instance.get("status") in TERMINAL_STATUSES:
+            self._complete(workflow_result)
+        return workflow_result
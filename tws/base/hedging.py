@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+import threading
+from typing import Optional, Union
+
+from tws.base.client import ClientException
+from tws.base.latency import LatencyModel
+
+# Key under which poll latencies are recorded
+_POLLS = "workflow_instances"
+
+
+@dataclass
+class HedgingPolicy:
+    """When a status poll is sent a second time to cut tail latency.
+
+    Once `min_samples` polls completed, a poll that has not returned after the
+    `quantile` of the last `window_size` poll latencies, and at least
+    `min_delay` seconds, is sent again; whichever response arrives first is
+    used. At most `max_hedge_rate` hedges are sent per poll, so a slow API is
+    not flooded with duplicate polls.
+    """
+
+    quantile: float = 0.95
+    min_delay: Union[int, float] = 0.05
+    max_hedge_rate: float = 0.1
+    window_size: int = 100
+    min_samples: int = 20
+
+    def __post_init__(self):
+        for name in ("quantile", "max_hedge_rate"):
+            value = getattr(self, name)
+            if (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or not 0 < value <= 1
+            ):
+                label = name.replace("_", " ").capitalize()
+                raise ClientException(f"{label} must be between 0 and 1")
+        if (
+            isinstance(self.min_delay, bool)
+            or not isinstance(self.min_delay, (int, float))
+            or self.min_delay < 0
+        ):
+            raise ClientException("Min delay must be a non-negative number of seconds")
+        for name in ("window_size", "min_samples"):
+            value = getattr(self, name)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                label = name.replace("_", " ").capitalize()
+                raise ClientException(f"{label} must be a positive integer")
+        if self.min_samples > self.window_size:
+            raise ClientException("Min samples must not exceed the window size")
+
+
+@dataclass
+class HedgingStats:
+    """How often polls were hedged, and how often the hedge returned first."""
+
+    polls: int
+    hedges: int
+    hedge_wins: int
+
+    @property
+    def hedge_rate(self) -> float:
+        """The fraction of polls that were hedged."""
+        return self.hedges / self.polls if self.polls else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        """The fraction of hedges that returned before the original poll."""
+        return self.hedge_wins / self.hedges if self.hedges else 0.0
+
+
+def resolve_hedging_policy(
+    policy: Optional[HedgingPolicy],
+) -> Optional[HedgingPolicy]:
+    """Validate the hedging policy of a client.
+
+    Raises:
+        ClientException: If the policy is not a `HedgingPolicy` instance
+    """
+    if policy is not None and not isinstance(policy, HedgingPolicy):
+        raise ClientException("Hedging must be a HedgingPolicy instance")
+    return policy
+
+
+class Hedger:
+    """Decides when to hedge status polls, and keeps count of the outcomes."""
+
+    def __init__(self, policy: HedgingPolicy):
+        self.policy = policy
+        self._latencies = LatencyModel(max_samples=policy.window_size, autosave_every=0)
+        self._polls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self) -> Optional[float]:
+        """Record a poll, returning how long to wait for it before hedging.
+
+        Returns:
+            The delay in seconds, or None while too few polls were observed
+        """
+        with self._lock:
+            self._polls += 1
+            self._tokens = min(1.0, self._tokens + self.policy.max_hedge_rate)
+        if self._latencies.count(_POLLS) < self.policy.min_samples:
+            return None
+        quantiles = self._latencies.quantiles(_POLLS, [self.policy.quantile])
+        return max(self.policy.min_delay, quantiles[0]) if quantiles else None
+
+    def try_hedge(self) -> bool:
+        """Spend a hedge, returning whether the hedge rate allows it."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self._hedges += 1
+            return True
+
+    def record_latency(self, latency: float) -> None:
+        """Record the latency of a completed poll request."""
+        self._latencies.record(_POLLS, latency)
+
+    def record_win(self) -> None:
+        """Record that a hedge returned before the poll it duplicated."""
+        with self._lock:
+            self._hedge_wins += 1
+
+    def stats(self) -> HedgingStats:
+        """Return the number of polls, hedges and hedges that won."""
+        with self._lock:
+            return HedgingStats(self._polls, self._hedges, self._hedge_wins)
@@ -0,0 +1,194 @@
+from collections import deque
+import json
+import math
+import os
+import tempfile
+import threading
+from typing import Deque, Dict, List, Optional, Sequence
+
+from tws.base.client import ClientException
+
+
+class LatencyModel:
+    """Records observed workflow completion latencies per workflow definition.
+
+    Keeps a sliding window of the most recent samples for each definition and
+    answers quantile queries over it. Optionally persists the samples to a JSON
+    file so that the model survives process restarts and can be shared by
+    processes that run the same workflows.
+    """
+
+    def __init__(
+        self,
+        max_samples: int = 1000,
+        path: Optional[str] = None,
+        autosave_every: int = 100,
+    ):
+        """Initialize the model.
+
+        Args:
+            max_samples: Number of recent samples kept per workflow definition
+            path: Optional JSON file the samples are loaded from and saved to
+            autosave_every: Save to `path` after this many new samples, 0 to
+                only save when `save` is called
+
+        Raises:
+            ClientException: If invalid parameters are provided or the file
+                at `path` cannot be read
+        """
+        if (
+            isinstance(max_samples, bool)
+            or not isinstance(max_samples, int)
+            or max_samples < 1
+        ):
+            raise ClientException("Max samples must be a positive integer")
+        if not isinstance(autosave_every, int) or autosave_every < 0:
+            raise ClientException("Autosave interval must be a non-negative integer")
+
+        self.max_samples = max_samples
+        self.path = path
+        self.autosave_every = autosave_every
+        self._samples: Dict[str, Deque[float]] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def record(self, workflow_definition_id: str, latency: float) -> None:
+        """Record the completion latency of a workflow execution.
+
+        Args:
+            workflow_definition_id: The workflow definition that was executed
+            latency: Time in seconds between starting the workflow and
+                its completion, as estimated by the client
+        """
+        with self._lock:
+            samples = self._samples.get(workflow_definition_id)
+            if samples is None:
+                samples = deque(maxlen=self.max_samples)
+                self._samples[workflow_definition_id] = samples
+            samples.append(float(latency))
+            self._unsaved += 1
+            autosave = (
+                self.path is not None
+                and self.autosave_every > 0
+                and self._unsaved >= self.autosave_every
+            )
+        if autosave:
+            self.save()
+
+    def count(self, workflow_definition_id: str) -> int:
+        """Return the number of samples recorded for a workflow definition."""
+        with self._lock:
+            return len(self._samples.get(workflow_definition_id, ()))
+
+    def quantiles(
+        self, workflow_definition_id: str, qs: Sequence[float]
+    ) -> Optional[List[float]]:
+        """Return latency quantiles for a workflow definition.
+
+        Args:
+            workflow_definition_id: The workflow definition to query
+            qs: The quantiles to compute, each between 0 and 1
+
+        Returns:
+            The latency in seconds at each quantile, or None if no samples
+            have been recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(workflow_definition_id, ()))
+        if not samples:
+            return None
+        return [_quantile(samples, q) for q in qs]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return summary statistics of the learned latencies.
+
+        Returns:
+            A dictionary mapping each workflow definition ID to its sample
+            count, mean, minimum, maximum, and p50/p90/p99 latencies in seconds
+        """
+        with self._lock:
+            snapshot = {
+                definition_id: sorted(samples)
+                for definition_id, samples in self._samples.items()
+                if samples
+            }
+        return {
+            definition_id: {
+                "count": len(samples),
+                "mean": sum(samples) / len(samples),
+                "min": samples[0],
+                "max": samples[-1],
+                "p50": _quantile(samples, 0.5),
+                "p90": _quantile(samples, 0.9),
+                "p99": _quantile(samples, 0.99),
+            }
+            for definition_id, samples in snapshot.items()
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the recorded samples to a JSON file.
+
+        The file is replaced atomically, so concurrent readers never observe a
+        partially written model.
+
+        Args:
+            path: File to write, defaults to the model's `path`
+
+        Raises:
+            ClientException: If no path is configured
+        """
+        path = path or self.path
+        if path is None:
+            raise ClientException("No path configured for the latency model")
+
+        with self._lock:
+            data = {
+                definition_id: list(samples)
+                for definition_id, samples in self._samples.items()
+            }
+            self._unsaved = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(data, tmp_file)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, path: str) -> None:
+        """Merge samples from a JSON file written by `save`.
+
+        Args:
+            path: File to read
+
+        Raises:
+            ClientException: If the file cannot be read or parsed
+        """
+        try:
+            with open(path) as model_file:
+                data = json.load(model_file)
+            loaded = {
+                str(definition_id): [float(sample) for sample in samples]
+                for definition_id, samples in data.items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            raise ClientException(f"Failed to load latency model: {e}")
+
+        with self._lock:
+            for definition_id, samples in loaded.items():
+                existing = self._samples.setdefault(
+                    definition_id, deque(maxlen=self.max_samples)
+                )
+                existing.extend(samples)
+
+
+def _quantile(sorted_samples: List[float], q: float) -> float:
+    # Nearest-rank quantile, which always returns an observed latency
+    rank = max(math.ceil(q * len(sorted_samples)), 1)
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
@@ -0,0 +1,282 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from tws.base.client import ClientException
+from tws.base.report import RunRecorder
+
+# Upper bounds of the request latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Upper bounds of the polls per workflow buckets
+POLL_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+# Upper bounds of the upload duration buckets, in seconds
+UPLOAD_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def endpoint_label(service: str, uri: str) -> str:
+    """Label the endpoint of a request, without IDs or file names in its path."""
+    if service == "storage":
+        return "storage"
+    return uri
+
+
+def error_type(error: BaseException) -> str:
+    """Label the type of a request or workflow error."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    return type(error).__name__
+
+
+class Histogram:
+    """Counts observations in buckets with fixed upper bounds.
+
+    Recording an observation finds its bucket before taking the lock, which is
+    only held to update two numbers.
+    """
+
+    def __init__(self, buckets: Sequence[Union[int, float]]):
+        self.buckets = tuple(buckets)
+        # The last count is for observations above every bucket
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: Union[int, float]) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cumulative count of each bucket, the count and the sum.
+
+        Returns:
+            Dictionary with "buckets", mapping each upper bound to the number
+            of observations at or below it, "count" and "sum"
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        return {"buckets": buckets, "count": sum(counts), "sum": total}
+
+
+class MetricsRegistry:
+    """Aggregate metrics of the requests and workflow runs of clients.
+
+    A registry can be shared by many clients. It collects:
+
+    - the latency of API requests, per endpoint
+    - the number of workflow runs in progress
+    - the number of status polls per completed workflow run
+    - the bytes and duration of file uploads
+    - the number of failed requests and workflow runs, per type of error
+
+    Read the metrics with `snapshot`, or with `prometheus` in the Prometheus
+    text exposition format.
+    """
+
+    def __init__(self, latency_buckets: Sequence[Union[int, float]] = LATENCY_BUCKETS):
+        """Initialize the registry.
+
+        Args:
+            latency_buckets: Upper bounds in seconds of the request latency
+                histogram buckets
+
+        Raises:
+            ClientException: If the buckets are not increasing positive numbers
+        """
+        latency_buckets = tuple(latency_buckets)
+        if (
+            not latency_buckets
+            or any(
+                isinstance(bound, bool)
+                or not isinstance(bound, (int, float))
+                or bound <= 0
+                for bound in latency_buckets
+            )
+            or list(latency_buckets) != sorted(set(latency_buckets))
+        ):
+            raise ClientException("Latency buckets must be increasing positive numbers")
+        self._latency_buckets = latency_buckets
+        self._requests: Dict[str, Histogram] = {}
+        self._polls = Histogram(POLL_BUCKETS)
+        self._uploads = Histogram(UPLOAD_BUCKETS)
+        self._upload_bytes = 0
+        self._in_flight = 0
+        self._request_errors: Dict[str, int] = {}
+        self._workflow_errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def request(self, endpoint: str) -> Iterator[None]:
+        """Measure an API request, counting the error it fails with."""
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self._count(self._request_errors, error_type(e))
+            raise
+        finally:
+            self._request_histogram(endpoint).observe(time.monotonic() - start)
+
+    @contextmanager
+    def workflow(self, recorder: Optional[RunRecorder] = None) -> Iterator[None]:
+        """Track a workflow run, counting the error it fails with.
+
+        Args:
+            recorder: The recorder of the run, whose polls are counted once the
+                run completes
+        """
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        except Exception as e:
+            self._count(self._workflow_errors, error_type(e))
+            raise
+        else:
+            # Results returned from a cache or by an identical run were not
+            # polled for
+            if recorder is not None and recorder.polls:
+                self._polls.observe(recorder.polls)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def record_upload(self, size: int, duration: float) -> None:
+        """Record a completed file upload."""
+        self._uploads.observe(duration)
+        with self._lock:
+            self._upload_bytes += size
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current value of every metric.
+
+        Returns:
+            Dictionary with "request_duration_seconds", mapping endpoints to
+            latency histograms, "workflows_in_flight", "polls_per_workflow",
+            "upload_bytes", "upload_duration_seconds", "request_errors" and
+            "workflow_errors", mapping error types to counts
+        """
+        with self._lock:
+            requests = dict(self._requests)
+            in_flight = self._in_flight
+            upload_bytes = self._upload_bytes
+            request_errors = dict(self._request_errors)
+            workflow_errors = dict(self._workflow_errors)
+        return {
+            "request_duration_seconds": {
+                endpoint: histogram.snapshot()
+                for endpoint, histogram in sorted(requests.items())
+            },
+            "workflows_in_flight": in_flight,
+            "polls_per_workflow": self._polls.snapshot(),
+            "upload_bytes": upload_bytes,
+            "upload_duration_seconds": self._uploads.snapshot(),
+            "request_errors": request_errors,
+            "workflow_errors": workflow_errors,
+        }
+
+    def prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        _histogram_lines(
+            lines,
+            "tws_request_duration_seconds",
+            "Latency of TWS API requests.",
+            [
+                ((("endpoint", endpoint),), histogram)
+                for endpoint, histogram in snapshot["request_duration_seconds"].items()
+            ],
+        )
+        lines += [
+            "# HELP tws_workflows_in_flight Workflow runs in progress.",
+            "# TYPE tws_workflows_in_flight gauge",
+            f"tws_workflows_in_flight {snapshot['workflows_in_flight']}",
+        ]
+        _histogram_lines(
+            lines,
+            "tws_polls_per_workflow",
+            "Status polls per completed workflow run.",
+            [((), snapshot["polls_per_workflow"])],
+        )
+        lines += [
+            "# HELP tws_upload_bytes_total Bytes of uploaded files.",
+            "# TYPE tws_upload_bytes_total counter",
+            f"tws_upload_bytes_total {snapshot['upload_bytes']}",
+        ]
+        _histogram_lines(
+            lines,
+            "tws_upload_duration_seconds",
+            "Duration of file uploads.",
+            [((), snapshot["upload_duration_seconds"])],
+        )
+        for name, key, description in (
+            ("tws_request_errors_total", "request_errors", "Failed API requests."),
+            ("tws_workflow_errors_total", "workflow_errors", "Failed workflow runs."),
+        ):
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for error, error_count in sorted(snapshot[key].items()):
+                lines.append(f"{name}{_labels((('type', error),))} {error_count}")
+        return "\n".join(lines) + "\n"
+
+    def _request_histogram(self, endpoint: str) -> Histogram:
+        histogram = self._requests.get(endpoint)
+        if histogram is None:
+            with self._lock:
+                histogram = self._requests.setdefault(
+                    endpoint, Histogram(self._latency_buckets)
+                )
+        return histogram
+
+    def _count(self, counts: Dict[str, int], key: str) -> None:
+        with self._lock:
+            counts[key] = counts.get(key, 0) + 1
+
+
+def resolve_metrics(metrics: Optional[MetricsRegistry]) -> Optional[MetricsRegistry]:
+    """Validate the metrics registry of a client.
+
+    Raises:
+        ClientException: If the registry is not a `MetricsRegistry` instance
+    """
+    if metrics is not None and not isinstance(metrics, MetricsRegistry):
+        raise ClientException("Metrics must be a MetricsRegistry instance")
+    return metrics
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _histogram_lines(
+    lines: List[str],
+    name: str,
+    description: str,
+    histograms: List[Tuple[Tuple[Tuple[str, str], ...], Dict[str, Any]]],
+) -> None:
+    lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    for labels, histogram in histograms:
+        for bound, bucket_count in histogram["buckets"].items():
+            bucket_labels = _labels(labels + (("le", f"{float(bound):g}"),))
+            lines.append(f"{name}_bucket{bucket_labels} {bucket_count}")
+        inf_labels = _labels(labels + (("le", "+Inf"),))
+        lines.append(f"{name}_bucket{inf_labels} {histogram['count']}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram['sum']}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram['count']}")
@@ -0,0 +1,67 @@
+import mimetypes
+import os
+import secrets
+from typing import Dict, Optional
+
+# Size of the chunks files are streamed from disk in while uploading
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Form field the storage service expects the file contents in
+UPLOAD_FIELD_NAME = "upload-file"
+
+# Quote characters that are not allowed in form parameters, the same way
+# browsers and httpx do
+_FORM_PARAM_REPLACEMENTS = {ord('"'): "%22", ord("\\"): "\\\\"}
+_FORM_PARAM_REPLACEMENTS.update(
+    {code: f"%{code:02X}" for code in range(0x20) if code != 0x1B}
+)
+
+
+class MultipartFile:
+    """Framing of a single file sent as a `multipart/form-data` request body.
+
+    Allows the file contents to be streamed from disk between the `preamble`
+    and `epilogue`, rather than building the whole body in memory.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        content_type: Optional[str] = None,
+        boundary: Optional[str] = None,
+    ):
+        """Initialize the multipart framing.
+
+        Args:
+            filename: The name of the uploaded file
+            content_type: MIME type of the file, defaults to
+                `application/octet-stream`
+            boundary: The multipart boundary, randomly generated by default
+        """
+        self.boundary = boundary or secrets.token_hex(16)
+        content_type = content_type or "application/octet-stream"
+        quoted_filename = filename.translate(_FORM_PARAM_REPLACEMENTS)
+        self.preamble = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{UPLOAD_FIELD_NAME}"; '
+            f'filename="{quoted_filename}"\r\n'
+            f"Content-Type: {content_type}\r\n"
+            "\r\n"
+        ).encode()
+        self.epilogue = f"\r\n--{self.boundary}--\r\n".encode()
+
+    @classmethod
+    def for_path(cls, file_path: str) -> "MultipartFile":
+        """Create the framing for a file on disk, detecting its MIME type."""
+        content_type, _ = mimetypes.guess_type(file_path)
+        return cls(os.path.basename(file_path), content_type)
+
+    def headers(self, file_size: int) -> Dict[str, str]:
+        """Return the request headers for a body containing `file_size` bytes.
+
+        Setting the content length up front avoids chunked transfer encoding.
+        """
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(len(self.preamble) + file_size + len(self.epilogue)),
+        }
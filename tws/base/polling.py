@@ -0,0 +1,264 @@
+from abc import ABC, abstractmethod
+import random
+import time
+from typing import Dict, Iterator, Optional, Sequence, Union
+
+from tws.base.client import ClientException
+from tws.base.latency import LatencyModel
+
+# Longest delay any policy may wait between two status polls
+MAX_POLL_DELAY = 60
+
+
+class PollingPolicy(ABC):
+    """Decides when to check the status of a running workflow."""
+
+    @abstractmethod
+    def delays(self, workflow_definition_id: Optional[str]) -> Iterator[float]:
+        """Generate the polling schedule for a single workflow execution.
+
+        Args:
+            workflow_definition_id: The workflow definition being executed, or
+                None when waiting on an instance whose definition is unknown
+
+        Yields:
+            The delay in seconds before each successive status poll. The first
+            value is the delay between starting the workflow and the first poll.
+        """
+        raise NotImplementedError()
+
+    def record_completion(self, workflow_definition_id: str, latency: float) -> None:
+        """Called by the client when a workflow execution completes.
+
+        Policies that learn from observed latencies override this, the default
+        implementation does nothing.
+
+        Args:
+            workflow_definition_id: The workflow definition that was executed
+            latency: Time in seconds between starting the workflow and
+                its completion, as estimated by the client
+        """
+
+
+class FixedDelay(PollingPolicy):
+    """Polls at a fixed interval, the behavior of the `retry_delay` argument."""
+
+    def __init__(self, delay: Union[int, float], initial_delay: Union[int, float] = 0):
+        """Initialize the policy.
+
+        Args:
+            delay: Time in seconds between status checks
+            initial_delay: Time in seconds before the first status check
+
+        Raises:
+            ClientException: If invalid parameters are provided
+        """
+        _validate_delay(delay, "Delay", minimum_exclusive=True)
+        _validate_delay(initial_delay, "Initial delay")
+        self.delay = delay
+        self.initial_delay = initial_delay
+
+    def delays(self, workflow_definition_id: Optional[str]) -> Iterator[float]:
+        yield self.initial_delay
+        while True:
+            yield self.delay
+
+
+class ExponentialBackoff(PollingPolicy):
+    """Polls quickly at first, then increasingly rarely.
+
+    Short workflows are noticed soon after they complete, while long running
+    ones are polled at most every `max_delay` seconds.
+    """
+
+    def __init__(
+        self,
+        initial_delay: Union[int, float] = 0.1,
+        min_delay: Union[int, float] = 0.25,
+        max_delay: Union[int, float] = 10,
+        multiplier: Union[int, float] = 2,
+        jitter: Union[int, float] = 0.1,
+        rng: Optional[random.Random] = None,
+    ):
+        """Initialize the policy.
+
+        Args:
+            initial_delay: Time in seconds before the first status check
+            min_delay: Time in seconds between the first and second checks
+            max_delay: Upper bound for the time in seconds between checks
+            multiplier: Factor the delay grows by after each check
+            jitter: Fraction by which each delay is randomly varied, which keeps
+                many workflows started together from polling in lockstep
+            rng: Optional random number generator used for jitter
+
+        Raises:
+            ClientException: If invalid parameters are provided
+        """
+        _validate_delay(initial_delay, "Initial delay")
+        _validate_delay(min_delay, "Minimum delay", minimum_exclusive=True)
+        _validate_delay(max_delay, "Maximum delay", minimum_exclusive=True)
+        if max_delay < min_delay:
+            raise ClientException("Maximum delay must not be less than minimum delay")
+        if not isinstance(multiplier, (int, float)) or multiplier < 1:
+            raise ClientException("Multiplier must be at least 1")
+        if not isinstance(jitter, (int, float)) or jitter < 0 or jitter > 1:
+            raise ClientException("Jitter must be between 0 and 1")
+
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+
+    def delays(self, workflow_definition_id: Optional[str]) -> Iterator[float]:
+        yield self.initial_delay
+        delay = self.min_delay
+        while True:
+            spread = delay * self.jitter
+            yield min(
+                max(delay + self._rng.uniform(-spread, spread), self.min_delay),
+                self.max_delay,
+            )
+            delay = min(delay * self.multiplier, self.max_delay)
+
+
+class LearnedPolling(PollingPolicy):
+    """Schedules polls around the latencies previously observed for a workflow.
+
+    Once enough executions of a workflow definition have been observed, the
+    first poll happens near the median completion latency and subsequent polls
+    at the higher quantiles of the distribution, so that most executions are
+    noticed with one or two requests. Past the observed tail, and for
+    definitions without enough samples, the `fallback` policy takes over.
+    """
+
+    def __init__(
+        self,
+        model: Optional[LatencyModel] = None,
+        fallback: Optional[PollingPolicy] = None,
+        min_samples: int = 10,
+        quantiles: Sequence[float] = (0.5, 0.75, 0.9, 0.95, 0.99),
+        max_delay: Union[int, float] = MAX_POLL_DELAY,
+    ):
+        """Initialize the policy.
+
+        Args:
+            model: The latency model to learn from and record into, a new
+                in-memory model by default
+            fallback: Policy used until enough samples are available and
+                after the last learned quantile, `ExponentialBackoff` by default
+            min_samples: Number of samples required before using the model
+            quantiles: Latency quantiles at which to poll, in increasing order
+            max_delay: Upper bound for the time in seconds between checks
+
+        Raises:
+            ClientException: If invalid parameters are provided
+        """
+        if (
+            isinstance(min_samples, bool)
+            or not isinstance(min_samples, int)
+            or min_samples < 1
+        ):
+            raise ClientException("Min samples must be a positive integer")
+        if not quantiles or any(
+            not isinstance(q, (int, float)) or q <= 0 or q > 1 for q in quantiles
+        ):
+            raise ClientException("Quantiles must be between 0 and 1")
+        if list(quantiles) != sorted(quantiles):
+            raise ClientException("Quantiles must be in increasing order")
+        _validate_delay(max_delay, "Maximum delay", minimum_exclusive=True)
+        if fallback is not None and not isinstance(fallback, PollingPolicy):
+            raise ClientException("Fallback must be a PollingPolicy instance")
+
+        self.model = model if model is not None else LatencyModel()
+        self.fallback = fallback if fallback is not None else ExponentialBackoff()
+        self.min_samples = min_samples
+        self.quantiles = tuple(quantiles)
+        self.max_delay = max_delay
+
+    def delays(self, workflow_definition_id: Optional[str]) -> Iterator[float]:
+        fallback = self.fallback.delays(workflow_definition_id)
+        if (
+            workflow_definition_id is None
+            or self.model.count(workflow_definition_id) < self.min_samples
+        ):
+            yield from fallback
+            return
+
+        targets = self.model.quantiles(workflow_definition_id, self.quantiles) or []
+        elapsed = 0.0
+        for target in targets:
+            # Long gaps are split so no single wait exceeds the maximum delay
+            while target - elapsed > 0:
+                delay = min(target - elapsed, self.max_delay)
+                elapsed += delay
+                yield delay
+
+        # Skip the fallback's initial delay, the first poll already happened
+        next(fallback)
+        yield from fallback
+
+    def record_completion(self, workflow_definition_id: str, latency: float) -> None:
+        self.model.record(workflow_definition_id, latency)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return the learned latency statistics, see `LatencyModel.stats`."""
+        return self.model.stats()
+
+
+def completion_latency(started_at: float, running_at: Optional[float]) -> float:
+    """Estimate the completion latency of a workflow found complete just now.
+
+    A poll only shows that the workflow completed at some point since the last
+    poll that found it running, or since it started. The midpoint of that
+    interval is used rather than the time of the poll, otherwise a learned
+    schedule would keep observing, and converge on, its own poll times.
+
+    Args:
+        started_at: Monotonic time at which the workflow was started
+        running_at: Monotonic time at which a poll last found the workflow
+            running, or None if it was not polled while running
+
+    Returns:
+        The estimated time in seconds between starting the workflow and its
+        completion
+    """
+    lower = started_at if running_at is None else max(running_at, started_at)
+    return (lower + time.monotonic()) / 2 - started_at
+
+
+def resolve_polling_policy(
+    polling_policy: Optional[PollingPolicy], retry_delay: Union[int, float]
+) -> PollingPolicy:
+    """Return the polling policy to use for a workflow execution.
+
+    Args:
+        polling_policy: The policy passed to `run_workflow`, if any
+        retry_delay: The fixed delay used when no policy is passed
+
+    Returns:
+        The polling policy
+
+    Raises:
+        ClientException: If the policy is not a `PollingPolicy`
+    """
+    if polling_policy is None:
+        return FixedDelay(retry_delay)
+    if not isinstance(polling_policy, PollingPolicy):
+        raise ClientException("Polling policy must be a PollingPolicy instance")
+    return polling_policy
+
+
+def _validate_delay(value, name: str, minimum_exclusive: bool = False) -> None:
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, (int, float))
+        or value < 0
+        or (minimum_exclusive and value == 0)
+        or value > MAX_POLL_DELAY
+    ):
+        qualifier = "greater than 0" if minimum_exclusive else "at least 0"
+        raise ClientException(
+            f"{name} must be {qualifier} and at most {MAX_POLL_DELAY} seconds"
+        )
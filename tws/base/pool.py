@@ -0,0 +1,175 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import threading
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from tws.base.batch import validate_concurrency
+from tws.base.client import ClientException, TWSClient
+from tws.base.session import SessionOptions, resolve_session_options
+from tws.base.transport import SharedTransport
+from tws.base.user_id_cache import UserIdCache
+
+ClientT = TypeVar("ClientT", bound=TWSClient)
+
+
+@dataclass
+class PoolStats:
+    """A snapshot of the activity of a client pool."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of requests for a client served by an open client."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _Entry(Generic[ClientT]):
+    def __init__(self, client: ClientT):
+        self.client = client
+        self.leases = 0
+        self.evicted = False
+
+
+class BaseClientPool(ABC, Generic[ClientT]):
+    """Hands out clients keyed by their API keys and API URL.
+
+    A client is created the first time its credentials are used, which
+    validates them, and reused by later requests for the same credentials. At
+    most `max_clients` clients are kept open; the least recently used client is
+    closed once it is no longer in use.
+
+    All clients send requests over one `SharedTransport` and share a
+    `UserIdCache`, so a client recreated after being evicted neither opens new
+    connections nor looks up its user ID again.
+    """
+
+    def __init__(
+        self,
+        max_clients: int = 128,
+        session_options: Optional[SessionOptions] = None,
+        transport: Optional[SharedTransport] = None,
+        user_id_cache: Optional[UserIdCache] = None,
+        **client_options: Any,
+    ):
+        """Initialize the pool.
+
+        Args:
+            max_clients: Maximum number of clients kept open
+            session_options: Optional `SessionOptions` of the clients and of the
+                transport created for them
+            transport: Optional `SharedTransport` used by the clients, created
+                by the pool and closed with it when not provided
+            user_id_cache: Optional `UserIdCache` used by the clients, created
+                by the pool when not provided
+            **client_options: Further arguments passed to every client
+
+        Raises:
+            ClientException: If invalid parameters are provided
+        """
+        validate_concurrency(max_clients, "Max clients")
+        if transport is not None and not isinstance(transport, SharedTransport):
+            raise ClientException("Transport must be a SharedTransport instance")
+        if user_id_cache is not None and not isinstance(user_id_cache, UserIdCache):
+            raise ClientException("User ID cache must be a UserIdCache instance")
+
+        self.max_clients = max_clients
+        self._session_options = resolve_session_options(session_options)
+        self._owns_transport = transport is None
+        self._transport = transport or SharedTransport(self._session_options)
+        self._user_id_cache = user_id_cache or UserIdCache()
+        self._client_options = client_options
+        self._entries: "OrderedDict[str, _Entry[ClientT]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _create_client(
+        self, public_key: str, secret_key: str, api_url: str, **options: Any
+    ) -> ClientT:
+        raise NotImplementedError()
+
+    def stats(self) -> PoolStats:
+        """Return the number of hits, misses and evictions and open clients."""
+        with self._lock:
+            return PoolStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(public_key: str, secret_key: str, api_url: str) -> str:
+        # API keys are not kept in plain text beyond the clients themselves
+        credentials = "\n".join([public_key, secret_key, api_url.rstrip("/")])
+        return hashlib.sha256(credentials.encode()).hexdigest()
+
+    def _checkout(
+        self, public_key: str, secret_key: str, api_url: str
+    ) -> Tuple["_Entry[ClientT]", List[ClientT]]:
+        """Lease the client of a set of credentials, creating it if needed.
+
+        Returns:
+            The leased entry and the evicted clients that are ready to close
+        """
+        key = self._key(public_key, secret_key, api_url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                client = self._create_client(
+                    public_key,
+                    secret_key,
+                    api_url,
+                    session_options=self._session_options,
+                    transport=self._transport,
+                    user_id_cache=self._user_id_cache,
+                    **self._client_options,
+                )
+                entry = _Entry(client)
+                self._entries[key] = entry
+                self._misses += 1
+            entry.leases += 1
+
+            closable = []
+            while len(self._entries) > self.max_clients:
+                _, evicted = self._entries.popitem(last=False)
+                evicted.evicted = True
+                self._evictions += 1
+                if evicted.leases == 0:
+                    closable.append(evicted.client)
+        return entry, closable
+
+    def _checkin(self, entry: "_Entry[ClientT]") -> bool:
+        """Return a leased client, and whether it was evicted and can be closed."""
+        with self._lock:
+            entry.leases -= 1
+            return entry.evicted and entry.leases == 0
+
+    def _drain(self) -> List[ClientT]:
+        """Remove every client, returning those that can be closed now.
+
+        Clients still in use are closed when their last lease is returned.
+        """
+        with self._lock:
+            closable = []
+            for entry in self._entries.values():
+                entry.evicted = True
+                if entry.leases == 0:
+                    closable.append(entry.client)
+            self._entries.clear()
+        return closable
@@ -0,0 +1,177 @@
+from dataclasses import dataclass, field
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import httpx
+
+from tws.base.client import ClientException
+from tws.base.retry import retry_after
+
+# Kinds of requests limited separately
+STARTS = "starts"
+POLLS = "polls"
+UPLOADS = "uploads"
+
+
+@dataclass
+class AdaptiveLimits:
+    """Rate and concurrency limits of one kind of request.
+
+    `rate` caps the requests started per second with a token bucket holding up
+    to `burst` tokens; None leaves the rate unlimited. The number of concurrent
+    requests adapts to the API: it grows by about one for every `concurrency`
+    requests that succeed, and is multiplied by `backoff` when a request is
+    rate limited, fails with a server error or times out, staying between
+    `min_concurrency` and `max_concurrency`.
+    """
+
+    rate: Optional[Union[int, float]] = None
+    burst: int = 10
+    initial_concurrency: int = 16
+    min_concurrency: int = 1
+    max_concurrency: int = 256
+    backoff: float = 0.5
+
+    def __post_init__(self):
+        if self.rate is not None and (
+            isinstance(self.rate, bool)
+            or not isinstance(self.rate, (int, float))
+            or self.rate <= 0
+        ):
+            raise ClientException("Rate must be a positive number of requests")
+        for name in (
+            "burst",
+            "initial_concurrency",
+            "min_concurrency",
+            "max_concurrency",
+        ):
+            value = getattr(self, name)
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                label = name.replace("_", " ").capitalize()
+                raise ClientException(f"{label} must be a positive integer")
+        if not (
+            self.min_concurrency <= self.initial_concurrency <= self.max_concurrency
+        ):
+            raise ClientException(
+                "Initial concurrency must be between min and max concurrency"
+            )
+        if (
+            isinstance(self.backoff, bool)
+            or not isinstance(self.backoff, (int, float))
+            or not 0 < self.backoff < 1
+        ):
+            raise ClientException("Backoff must be between 0 and 1")
+
+
+@dataclass
+class RateLimitPolicy:
+    """Limits applied separately to workflow starts, status polls and uploads."""
+
+    starts: AdaptiveLimits = field(default_factory=AdaptiveLimits)
+    polls: AdaptiveLimits = field(default_factory=AdaptiveLimits)
+    uploads: AdaptiveLimits = field(
+        default_factory=lambda: AdaptiveLimits(initial_concurrency=4)
+    )
+
+    def __post_init__(self):
+        for kind in (STARTS, POLLS, UPLOADS):
+            if not isinstance(getattr(self, kind), AdaptiveLimits):
+                raise ClientException(
+                    f"Rate limits of {kind} must be an AdaptiveLimits instance"
+                )
+
+    def limits(self) -> Dict[str, AdaptiveLimits]:
+        """Return the limits of each kind of request."""
+        return {kind: getattr(self, kind) for kind in (STARTS, POLLS, UPLOADS)}
+
+
+def resolve_rate_limit_policy(
+    policy: Optional[RateLimitPolicy],
+) -> Optional[RateLimitPolicy]:
+    """Validate the rate limit policy of a client.
+
+    Raises:
+        ClientException: If the policy is not a `RateLimitPolicy` instance
+    """
+    if policy is not None and not isinstance(policy, RateLimitPolicy):
+        raise ClientException("Rate limit must be a RateLimitPolicy instance")
+    return policy
+
+
+def request_kind(service: str, uri: str) -> Optional[str]:
+    """Return the kind of limit applying to an API request, if any."""
+    if service == "storage":
+        return UPLOADS
+    if uri == "rpc/start_workflow":
+        return STARTS
+    if uri == "workflow_instances":
+        return POLLS
+    return None
+
+
+def is_overload(error: BaseException) -> bool:
+    """Check whether a failed request indicates the API is overloaded."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TimeoutException)
+
+
+class LimiterState:
+    """The token bucket and adaptive concurrency limit of one kind of request.
+
+    Not thread safe, the sync and async limiters guard it with their own lock.
+    """
+
+    def __init__(self, limits: AdaptiveLimits):
+        self.limits = limits
+        self.limit = float(limits.initial_concurrency)
+        self.in_flight = 0
+        self._tokens = float(limits.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        # Incremented on every decrease, so requests that were already in
+        # flight when the limit decreased do not decrease it again
+        self._generation = 0
+
+    def try_acquire(self) -> Tuple[Optional[int], Optional[float]]:
+        """Try to start a request.
+
+        Returns:
+            The generation to pass to `release` if the request may start, and
+            otherwise the time in seconds to wait before trying again, or None
+            to wait until a request in flight completes
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return None, self._paused_until - now
+        if self.in_flight >= int(self.limit):
+            return None, None
+        rate = self.limits.rate
+        if rate is not None:
+            self._tokens = min(
+                self.limits.burst, self._tokens + (now - self._refilled_at) * rate
+            )
+            self._refilled_at = now
+            if self._tokens < 1:
+                return None, (1 - self._tokens) / rate
+            self._tokens -= 1
+        self.in_flight += 1
+        return self._generation, None
+
+    def release(self, generation: int, error: Optional[BaseException]) -> None:
+        """Record the outcome of a request started with `try_acquire`."""
+        self.in_flight -= 1
+        limits = self.limits
+        if error is None:
+            self.limit = min(limits.max_concurrency, self.limit + 1 / self.limit)
+        elif is_overload(error):
+            if generation == self._generation:
+                self.limit = max(limits.min_concurrency, self.limit * limits.backoff)
+                self._generation += 1
+            if isinstance(error, httpx.HTTPStatusError):
+                delay = retry_after(error.response)
+                if delay is not None:
+                    self._paused_until = max(
+                        self._paused_until, time.monotonic() + delay
+                    )
@@ -0,0 +1,119 @@
+import json
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlparse
+
+from tws.base.client import ClientException
+
+REALTIME_TOPIC = "realtime:tws-workflow-instances"
+
+# Clients must send a heartbeat at least every 60 seconds or the server closes
+# the connection.
+HEARTBEAT_INTERVAL = 25
+
+MISSING_DEPENDENCY_MESSAGE = (
+    "Realtime notifications require the websockets package, "
+    "install it with `pip install tws-sdk[realtime]`"
+)
+
+
+class RealtimeDisconnected(ClientException):
+    """Raised to waiters when the realtime connection is lost."""
+
+
+def realtime_url(api_url: str, public_key: str) -> str:
+    """Build the realtime websocket URL for a TWS API instance.
+
+    Args:
+        api_url: The base URL for the TWS API instance
+        public_key: The TWS public key
+
+    Returns:
+        The websocket URL
+    """
+    parsed = urlparse(api_url.rstrip("/"))
+    scheme = "wss" if parsed.scheme == "https" else "ws"
+    query = urlencode({"apikey": public_key, "vsn": "1.0.0"})
+    return f"{scheme}://{parsed.netloc}{parsed.path}/realtime/v1/websocket?{query}"
+
+
+def join_message(ref: str, access_token: str) -> str:
+    """Encode the message subscribing to workflow instance status changes."""
+    return json.dumps(
+        {
+            "topic": REALTIME_TOPIC,
+            "event": "phx_join",
+            "payload": {
+                "config": {
+                    "broadcast": {"self": False},
+                    "presence": {"key": ""},
+                    "postgres_changes": [
+                        {
+                            "event": "UPDATE",
+                            "schema": "public",
+                            "table": "workflow_instances",
+                        }
+                    ],
+                },
+                "access_token": access_token,
+            },
+            "ref": ref,
+        }
+    )
+
+
+def heartbeat_message(ref: str) -> str:
+    """Encode a heartbeat message keeping the connection alive."""
+    return json.dumps(
+        {"topic": "phoenix", "event": "heartbeat", "payload": {}, "ref": ref}
+    )
+
+
+def parse_join_reply(raw: Any, ref: str) -> Optional[bool]:
+    """Check whether a message is the reply to the join message.
+
+    Args:
+        raw: The raw websocket message
+        ref: The reference the join message was sent with
+
+    Returns:
+        True if the subscription succeeded, False if it was rejected, or None
+        if the message is not the join reply
+    """
+    message = _decode(raw)
+    if (
+        message is None
+        or message.get("event") != "phx_reply"
+        or message.get("ref") != ref
+    ):
+        return None
+    return (message.get("payload") or {}).get("status") == "ok"
+
+
+def parse_instance_update(raw: Any) -> Optional[Dict[str, Any]]:
+    """Extract the updated workflow instance from a realtime message.
+
+    Args:
+        raw: The raw websocket message
+
+    Returns:
+        The updated workflow instance row, or None if the message is not a
+        workflow instance update
+    """
+    message = _decode(raw)
+    if message is None or message.get("event") != "postgres_changes":
+        return None
+    data = (message.get("payload") or {}).get("data") or {}
+    if data.get("table") != "workflow_instances":
+        return None
+    record = data.get("record")
+    if not isinstance(record, dict) or "id" not in record:
+        return None
+    return record
+
+
+def _decode(raw: Any) -> Optional[Dict[str, Any]]:
+    try:
+        message = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    return message if isinstance(message, dict) else None
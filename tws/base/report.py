@@ -0,0 +1,155 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+import httpx
+
+
+@dataclass
+class RunReport:
+    """Where the time of a workflow run went.
+
+    Durations are in seconds, measured with `time.monotonic`. A run that
+    returned a cached result, or the result of an identical run in flight
+    (`coalesced`), made no requests of its own.
+    """
+
+    workflow_instance_id: Optional[str]
+    total_seconds: float
+    upload_seconds: Dict[str, float] = field(default_factory=dict)
+    start_seconds: Optional[float] = None
+    time_to_first_poll: Optional[float] = None
+    polls: int = 0
+    wasted_polls: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    cached: bool = False
+    coalesced: bool = False
+
+
+class RunRecorder:
+    """Collects the timings of a workflow run in progress.
+
+    Thread safe, as files are uploaded on the client's upload thread pool.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.cached = False
+        self.coalesced = False
+        self.polls = 0
+        self._workflow_instance_id: Optional[str] = None
+        self._upload_seconds: Dict[str, float] = {}
+        self._start_seconds: Optional[float] = None
+        self._workflow_started_at: Optional[float] = None
+        self._first_poll_at: Optional[float] = None
+        self._wasted_polls = 0
+        self._bytes_sent = 0
+        self._bytes_received = 0
+        self._lock = threading.Lock()
+
+    def upload(self, arg_name: str, seconds: float) -> None:
+        with self._lock:
+            self._upload_seconds[arg_name] = seconds
+
+    def start(self, seconds: float, workflow_instance_id: str) -> None:
+        with self._lock:
+            self._start_seconds = seconds
+            self._workflow_instance_id = workflow_instance_id
+            self._workflow_started_at = time.monotonic()
+
+    def poll(self, polls: int, wasted: int, first_sent_at: Optional[float]) -> None:
+        with self._lock:
+            self.polls += polls
+            self._wasted_polls += wasted
+            if self._first_poll_at is None:
+                self._first_poll_at = first_sent_at
+
+    def transfer(self, sent: int, received: int) -> None:
+        with self._lock:
+            self._bytes_sent += sent
+            self._bytes_received += received
+
+    def report(self) -> RunReport:
+        """Return the report of the run, up to now."""
+        with self._lock:
+            time_to_first_poll = None
+            if (
+                self._first_poll_at is not None
+                and self._workflow_started_at is not None
+            ):
+                time_to_first_poll = self._first_poll_at - self._workflow_started_at
+            return RunReport(
+                workflow_instance_id=self._workflow_instance_id,
+                total_seconds=time.monotonic() - self.started_at,
+                upload_seconds=dict(self._upload_seconds),
+                start_seconds=self._start_seconds,
+                time_to_first_poll=time_to_first_poll,
+                polls=self.polls,
+                wasted_polls=self._wasted_polls,
+                bytes_sent=self._bytes_sent,
+                bytes_received=self._bytes_received,
+                cached=self.cached,
+                coalesced=self.coalesced,
+            )
+
+
+# The workflow run in progress, if it is being recorded
+_recorder: ContextVar[Optional[RunRecorder]] = ContextVar(
+    "tws_run_recorder", default=None
+)
+
+
+@contextmanager
+def recording(recorder: Optional[RunRecorder]) -> Iterator[None]:
+    """Record the requests made within the context with the recorder, if any."""
+    token = _recorder.set(recorder)
+    try:
+        yield
+    finally:
+        _recorder.reset(token)
+
+
+def record_upload(arg_name: str, seconds: float) -> None:
+    """Record the upload of the file passed as a workflow argument."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.upload(arg_name, seconds)
+
+
+def record_coalesced() -> None:
+    """Record that the run returned the result of an identical run in flight."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.coalesced = True
+
+
+def record_start(seconds: float, workflow_instance_id: str) -> None:
+    """Record the request that started the workflow."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.start(seconds, workflow_instance_id)
+
+
+def record_polls(polls: int, wasted: int, first_sent_at: Optional[float]) -> None:
+    """Record status polls made for the run.
+
+    Args:
+        polls: The number of polls
+        wasted: The number of polls that found the workflow still running
+        first_sent_at: Monotonic time at which the first of them was sent
+    """
+    recorder = _recorder.get()
+    if recorder is not None and polls:
+        recorder.poll(polls, wasted, first_sent_at)
+
+
+def record_transfer(response: httpx.Response) -> None:
+    """Count the bytes of a request and its response towards the run."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        sent = int(response.request.headers.get("Content-Length", 0))
+        recorder.transfer(sent, len(response.content))
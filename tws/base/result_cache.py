@@ -0,0 +1,132 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional, Union
+
+from tws.base.client import ClientException
+from tws.base.digests import FileDigests
+from tws.base.store import CacheStore
+
+
+class ResultCache:
+    """Remembers the results of deterministic workflow executions.
+
+    Executions are identified by a hash of the workflow definition ID, the
+    workflow arguments and the SHA-256 digests of the input files, so running
+    a workflow again with the same inputs returns the earlier result without
+    executing the workflow. Keys are scoped to a namespace, so clients using
+    different API keys do not see each other's results.
+
+    Results are kept in an in-memory LRU and optionally in a SQLite database,
+    which persists them across processes. The database is bounded to
+    `max_disk_bytes` of results, evicting the oldest first. Results older than
+    `ttl` are not returned.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Union[int, float] = 60 * 60,
+        path: Optional[str] = None,
+        max_disk_bytes: int = 100 * 1024 * 1024,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of results kept in memory
+            ttl: Time in seconds after which a result is no longer returned
+            path: Optional SQLite database file results are persisted in
+            max_disk_bytes: Maximum total size of the results in the database
+
+        Raises:
+            ClientException: If invalid parameters are provided or the database
+                at `path` cannot be opened
+        """
+        self._store = CacheStore(
+            "result cache",
+            "results",
+            max_entries,
+            ttl,
+            path=path,
+            max_disk_bytes=max_disk_bytes,
+        )
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self._digests = FileDigests(max_entries)
+
+    def key(
+        self,
+        workflow_definition_id: str,
+        workflow_args: dict,
+        namespace: str,
+        files: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Compute the cache key of a workflow execution.
+
+        Args:
+            workflow_definition_id: The workflow definition to execute
+            workflow_args: The arguments passed to the workflow
+            namespace: Scope of the key, such as a digest of the API key the
+                workflow is executed with, as results are not shared between
+                users
+            files: Optional dictionary mapping workflow argument names to the
+                paths of input files, identified by their contents
+
+        Returns:
+            The cache key
+
+        Raises:
+            ClientException: If the arguments are not JSON serializable or an
+                input file does not exist
+        """
+        digests = {}
+        for arg_name, file_path in (files or {}).items():
+            try:
+                digests[arg_name] = self._digests.digest(file_path)
+            except OSError:
+                raise ClientException(f"File not found: {file_path}")
+
+        try:
+            canonical = json.dumps(
+                [namespace, workflow_definition_id, workflow_args, digests],
+                sort_keys=True,
+                separators=(",", ":"),
+                ensure_ascii=False,
+            )
+        except (TypeError, ValueError) as e:
+            raise ClientException(f"Workflow arguments cannot be cached: {e}")
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up the result of an earlier execution.
+
+        Args:
+            key: The cache key of the execution
+
+        Returns:
+            A copy of the result, or None if no result was stored within the TTL
+        """
+        encoded = self._store.get(key)
+        return json.loads(encoded) if encoded is not None else None
+
+    def put(self, key: str, result: Any) -> None:
+        """Store the result of an execution.
+
+        Args:
+            key: The cache key of the execution
+            result: The workflow result, which must be JSON serializable
+        """
+        self._store.put(key, json.dumps(result, separators=(",", ":")))
+
+    def invalidate(self, key: str) -> None:
+        """Forget the result of an execution."""
+        self._store.delete(key)
+
+    def clear(self) -> None:
+        """Forget all results, including those stored in the database."""
+        self._store.clear()
+        self._digests.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
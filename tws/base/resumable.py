@@ -0,0 +1,149 @@
+import base64
+import mimetypes
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+# Files larger than this many bytes are uploaded with the resumable protocol
+RESUMABLE_UPLOAD_THRESHOLD = 50 * 1024 * 1024
+
+# Size of the parts resumable uploads are sent in. The storage service only
+# accepts parts of exactly 6 MiB, except for the last one.
+RESUMABLE_PART_SIZE = 6 * 1024 * 1024
+
+# Number of consecutive failed attempts after which a resumable upload is
+# abandoned, and the base delay in seconds between attempts
+RESUMABLE_MAX_ATTEMPTS = 5
+RESUMABLE_RETRY_DELAY = 1
+
+# Endpoint of the storage service implementing the tus protocol
+RESUMABLE_UPLOAD_PATH = "/storage/v1/upload/resumable"
+
+TUS_VERSION = "1.0.0"
+
+# Statuses after which the upload can be resumed from the offset the server
+# reports: a conflicting offset, a locked upload, or a server error
+_RETRYABLE_STATUSES = frozenset({409, 423, 500, 502, 503, 504})
+
+
+def upload_metadata(bucket: str, object_name: str) -> str:
+    """Encode the `Upload-Metadata` header describing the stored object.
+
+    Args:
+        bucket: The storage bucket to upload to
+        object_name: The path of the object within the bucket
+
+    Returns:
+        The header value
+    """
+    content_type, _ = mimetypes.guess_type(object_name)
+    metadata = {
+        "bucketName": bucket,
+        "objectName": object_name,
+        "contentType": content_type or "application/octet-stream",
+    }
+    return ",".join(
+        f"{key} {base64.b64encode(value.encode()).decode()}"
+        for key, value in metadata.items()
+    )
+
+
+def creation_headers(
+    length: Optional[int] = None,
+    metadata: Optional[str] = None,
+    concat: Optional[str] = None,
+) -> Dict[str, str]:
+    """Return the headers of a request creating an upload.
+
+    Args:
+        length: The size of the upload in bytes, omitted for final
+            concatenations whose size is the sum of their parts
+        metadata: The encoded `Upload-Metadata`
+        concat: The `Upload-Concat` value, for uploads that are concatenated
+            into a single object
+    """
+    headers = {"Tus-Resumable": TUS_VERSION}
+    if length is not None:
+        headers["Upload-Length"] = str(length)
+    if metadata is not None:
+        headers["Upload-Metadata"] = metadata
+    if concat is not None:
+        headers["Upload-Concat"] = concat
+    return headers
+
+
+def patch_headers(offset: int, length: int) -> Dict[str, str]:
+    """Return the headers of a request sending `length` bytes from `offset`.
+
+    The length is declared up front, as the data is streamed from disk.
+    """
+    return {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(offset),
+        "Content-Type": "application/offset+octet-stream",
+        "Content-Length": str(length),
+    }
+
+
+def head_headers() -> Dict[str, str]:
+    """Return the headers of a request querying the offset of an upload."""
+    return {"Tus-Resumable": TUS_VERSION}
+
+
+def final_concat(upload_urls: Sequence[str]) -> str:
+    """Return the `Upload-Concat` value joining partial uploads in order."""
+    return "final;" + " ".join(upload_urls)
+
+
+def upload_location(response: httpx.Response) -> str:
+    """Read the absolute URL of an upload from its creation response."""
+    return str(response.url.join(response.headers["Location"]))
+
+
+def upload_offset(response: httpx.Response) -> int:
+    """Read the number of bytes the server has received from a response."""
+    return int(response.headers["Upload-Offset"])
+
+
+def supports_concatenation(response: httpx.Response) -> bool:
+    """Check whether a server's `OPTIONS` response advertises concatenation.
+
+    Concatenation lets the parts of a file be uploaded in parallel, as
+    separate partial uploads that are joined afterwards.
+    """
+    extensions = response.headers.get("Tus-Extension", "")
+    return "concatenation" in {extension.strip() for extension in extensions.split(",")}
+
+
+def plan_segments(
+    file_size: int, part_size: int, max_segments: int
+) -> List[Tuple[int, int]]:
+    """Split a file into at most `max_segments` contiguous segments.
+
+    Every segment but the last is a whole number of parts long, so each is
+    sent in parts of `part_size`.
+
+    Returns:
+        The `(start, length)` of each segment, in file order
+    """
+    parts = max(-(-file_size // part_size), 1)
+    segments = min(max_segments, parts)
+    parts_per_segment = -(-parts // segments)
+    segment_size = parts_per_segment * part_size
+
+    spans = []
+    for start in range(0, max(file_size, 1), segment_size):
+        spans.append((start, min(segment_size, file_size - start)))
+    return spans
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether a failed resumable upload request can be resumed."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _RETRYABLE_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+
+def retry_delay(attempt: int) -> float:
+    """Return the delay in seconds before retrying after `attempt` failures."""
+    return RESUMABLE_RETRY_DELAY * 2 ** (attempt - 1)
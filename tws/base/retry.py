@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from typing import Optional, Union
+
+import httpx
+
+from tws.base.client import ClientException
+
+# Methods that can be sent again without repeating their effect
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Statuses of transient failures, retried for idempotent requests
+TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Statuses with which the API rejects a request without processing it, which
+# makes retrying safe even for requests with side effects like starting a
+# workflow
+UNPROCESSED_STATUSES = frozenset({429, 503})
+
+# Errors raised before the request was sent
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@dataclass
+class RetryPolicy:
+    """How a client retries API requests that fail transiently.
+
+    Idempotent requests such as status polls are retried after connection
+    errors, timeouts and the statuses in `TRANSIENT_STATUSES`. Other requests,
+    like starting a workflow, are only retried when the request provably did
+    not reach the API: when connecting failed, or when the API rejected it as
+    rate limited or unavailable. Requests uploading files are not retried.
+
+    Retries wait with exponential backoff, or as long as a `Retry-After` header
+    asks up to `max_delay`. Each client also has a retry budget: every request
+    adds `budget_ratio` retries to it, up to `budget_min_retries`, and every
+    retry spends one. During an outage a client therefore sends at most
+    `budget_min_retries` retries plus `budget_ratio` per request, rather than
+    multiplying its load on the API by `max_attempts`.
+
+    Use `RetryPolicy(max_attempts=1)` to disable retries.
+    """
+
+    max_attempts: int = 4
+    initial_delay: Union[int, float] = 0.5
+    max_delay: Union[int, float] = 30
+    multiplier: Union[int, float] = 2
+    jitter: bool = True
+    budget_ratio: Union[int, float] = 0.2
+    budget_min_retries: int = 10
+
+    def __post_init__(self):
+        if (
+            isinstance(self.max_attempts, bool)
+            or not isinstance(self.max_attempts, int)
+            or self.max_attempts < 1
+        ):
+            raise ClientException("Max attempts must be a positive integer")
+        for name in ("initial_delay", "max_delay"):
+            value = getattr(self, name)
+            if (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or value <= 0
+            ):
+                label = name.replace("_", " ").capitalize()
+                raise ClientException(f"{label} must be a positive number of seconds")
+        if (
+            isinstance(self.multiplier, bool)
+            or not isinstance(self.multiplier, (int, float))
+            or self.multiplier < 1
+        ):
+            raise ClientException("Backoff multiplier must be at least 1")
+        if not isinstance(self.jitter, bool):
+            raise ClientException("Jitter must be a boolean")
+        if (
+            isinstance(self.budget_ratio, bool)
+            or not isinstance(self.budget_ratio, (int, float))
+            or self.budget_ratio < 0
+        ):
+            raise ClientException("Budget ratio must be a non-negative number")
+        if (
+            isinstance(self.budget_min_retries, bool)
+            or not isinstance(self.budget_min_retries, int)
+            or self.budget_min_retries < 0
+        ):
+            raise ClientException("Budget min retries must be a non-negative integer")
+
+    def delay(self, error: Exception, method: str, attempt: int) -> Optional[float]:
+        """Return the delay before retrying a failed request.
+
+        Args:
+            error: The error the request failed with
+            method: HTTP method of the request
+            attempt: Number of attempts made so far
+
+        Returns:
+            The delay in seconds, or None if the request must not be retried
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if isinstance(error, httpx.HTTPStatusError):
+            statuses = TRANSIENT_STATUSES if idempotent else UNPROCESSED_STATUSES
+            if error.response.status_code not in statuses:
+                return None
+            requested = retry_after(error.response)
+            if requested is not None:
+                return requested if requested <= self.max_delay else None
+        elif isinstance(error, httpx.TransportError):
+            if not idempotent and not isinstance(error, _UNSENT_ERRORS):
+                return None
+        else:
+            return None
+
+        backoff = min(
+            self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1)
+        )
+        return random.uniform(backoff / 2, backoff) if self.jitter else backoff
+
+
+class RetryBudget:
+    """Limits the retries of a client to a fraction of its requests."""
+
+    def __init__(self, ratio: float, min_retries: int):
+        self._ratio = ratio
+        self._capacity = max(min_retries, 1)
+        self._tokens = float(min_retries)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Record a request, which funds `ratio` of a retry."""
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + self._ratio)
+
+    def withdraw(self) -> bool:
+        """Spend a retry, returning whether the budget allowed it."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Return the delay in seconds requested by a `Retry-After` header, if any."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_retry_policy(policy: Optional[RetryPolicy]) -> RetryPolicy:
+    """Return the retry policy of a client, defaulting to `RetryPolicy()`.
+
+    Raises:
+        ClientException: If the policy is not a `RetryPolicy` instance
+    """
+    if policy is None:
+        return RetryPolicy()
+    if not isinstance(policy, RetryPolicy):
+        raise ClientException("Retry policy must be a RetryPolicy instance")
+    return policy
@@ -0,0 +1,81 @@
+from dataclasses import dataclass, fields
+from typing import Optional, Union
+
+import httpx
+
+from tws.base.client import ClientException
+
+
+@dataclass
+class SessionOptions:
+    """Connection pool, protocol and timeout settings of a client's HTTP session.
+
+    The defaults match those of httpx. Timeouts are in seconds, and a timeout
+    of None waits indefinitely.
+
+    With HTTP/2, concurrent requests to the API are multiplexed as streams over
+    a single connection per host, up to the number of concurrent streams the
+    server allows. Further requests wait for a stream to become free, or open
+    another connection within `max_connections`.
+    """
+
+    max_connections: Optional[int] = 100
+    max_keepalive_connections: Optional[int] = 20
+    keepalive_expiry: Optional[Union[int, float]] = 5.0
+    connect_timeout: Optional[Union[int, float]] = 5.0
+    read_timeout: Optional[Union[int, float]] = 5.0
+    write_timeout: Optional[Union[int, float]] = 5.0
+    pool_timeout: Optional[Union[int, float]] = 5.0
+    http2: bool = True
+
+    def __post_init__(self):
+        for name in ("max_connections", "max_keepalive_connections"):
+            value = getattr(self, name)
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, int) or value < 0
+            ):
+                label = name.replace("_", " ").capitalize()
+                raise ClientException(f"{label} must be a non-negative integer")
+        for field in fields(self):
+            if not field.name.endswith(("_timeout", "_expiry")):
+                continue
+            value = getattr(self, field.name)
+            if value is not None and (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or value <= 0
+            ):
+                label = field.name.replace("_", " ").capitalize()
+                raise ClientException(f"{label} must be a positive number of seconds")
+        if not isinstance(self.http2, bool):
+            raise ClientException("HTTP/2 must be a boolean")
+
+    def limits(self) -> httpx.Limits:
+        """Return the connection pool limits of the session."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        """Return the timeouts of the session."""
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+def resolve_session_options(options: Optional[SessionOptions]) -> SessionOptions:
+    """Return the session options of a client, defaulting to httpx's settings.
+
+    Raises:
+        ClientException: If the options are not a `SessionOptions` instance
+    """
+    if options is None:
+        return SessionOptions()
+    if not isinstance(options, SessionOptions):
+        raise ClientException("Session options must be a SessionOptions instance")
+    return options
@@ -0,0 +1,200 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import sqlite3
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple, Union
+
+from tws.base.client import ClientException
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+
+class CacheStore:
+    """Text values by key, in an in-memory LRU and optionally in SQLite.
+
+    The storage shared by `UploadCache` and `ResultCache`. Values older than
+    `ttl` are not returned. The database lets processes on the same machine
+    share values, and can be bounded to `max_disk_bytes` of values, evicting
+    the oldest first.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        max_entries: int,
+        ttl: Union[int, float],
+        path: Optional[str] = None,
+        max_disk_bytes: Optional[int] = None,
+    ):
+        """Initialize the store.
+
+        Args:
+            name: Name of the cache, used in error messages
+            table: Name of the database table the values are stored in
+            max_entries: Maximum number of values kept in memory
+            ttl: Time in seconds after which a value is no longer returned
+            path: Optional SQLite database file the values are stored in
+            max_disk_bytes: Optional maximum total size of the values in the
+                database
+
+        Raises:
+            ClientException: If invalid parameters are provided or the database
+                at `path` cannot be opened
+        """
+        if (
+            isinstance(max_entries, bool)
+            or not isinstance(max_entries, int)
+            or max_entries < 1
+        ):
+            raise ClientException("Max entries must be a positive integer")
+        if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0:
+            raise ClientException("TTL must be a positive number of seconds")
+        if max_disk_bytes is not None and (
+            isinstance(max_disk_bytes, bool)
+            or not isinstance(max_disk_bytes, int)
+            or max_disk_bytes < 1
+        ):
+            raise ClientException("Max disk bytes must be a positive integer")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self._table = table
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path is not None:
+            try:
+                with self._connect() as connection:
+                    connection.execute(_SCHEMA.format(table=table))
+            except sqlite3.Error as e:
+                raise ClientException(f"Failed to open {name}: {e}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value stored for a key within the TTL, if any."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] < self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                del self._entries[key]
+
+        if self.path is None:
+            return None
+
+        try:
+            with self._connect() as connection:
+                row = connection.execute(
+                    f"SELECT value, stored_at FROM {self._table} WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except sqlite3.Error:
+            # An unavailable database only costs a cache miss
+            return None
+        if row is None or now - row[1] >= self.ttl:
+            return None
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        """Store the value of a key."""
+        now = time.time()
+        self._remember(key, value, now)
+        if self.path is None:
+            return
+
+        size = len(value.encode())
+        if self.max_disk_bytes is not None and size > self.max_disk_bytes:
+            return
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    f"INSERT OR REPLACE INTO {self._table} "
+                    "(key, value, size, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, value, size, now),
+                )
+                connection.execute(
+                    f"DELETE FROM {self._table} WHERE stored_at <= ?",
+                    (now - self.ttl,),
+                )
+                if self.max_disk_bytes is not None:
+                    self._evict(connection, self.max_disk_bytes)
+        except sqlite3.Error:
+            # The value is still remembered by this process
+            pass
+
+    def delete(self, key: str) -> None:
+        """Forget the value of a key."""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.path is None:
+            return
+        try:
+            with self._connect() as connection:
+                connection.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+        except sqlite3.Error:
+            # The value is still forgotten by this process
+            pass
+
+    def clear(self) -> None:
+        """Forget all values, including those stored in the database."""
+        with self._lock:
+            self._entries.clear()
+        if self.path is None:
+            return
+        try:
+            with self._connect() as connection:
+                connection.execute(f"DELETE FROM {self._table}")
+        except sqlite3.Error:
+            # The values are still forgotten by this process
+            pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: str, value: str, stored_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _evict(self, connection: sqlite3.Connection, max_disk_bytes: int) -> None:
+        # Delete the oldest values until the rest fit within the size bound
+        (total,) = connection.execute(f"SELECT SUM(size) FROM {self._table}").fetchone()
+        excess = (total or 0) - max_disk_bytes
+        if excess <= 0:
+            return
+        evicted: List[Tuple[str]] = []
+        for key, size in connection.execute(
+            f"SELECT key, size FROM {self._table} ORDER BY stored_at"
+        ):
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+        connection.executemany(f"DELETE FROM {self._table} WHERE key = ?", evicted)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        assert self.path is not None
+        # A short lived connection per operation is safe to use from any thread
+        # and lets other processes write in between
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
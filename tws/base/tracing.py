@@ -0,0 +1,224 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+import threading
+from typing import Any, ContextManager, Dict, Iterator, Optional
+
+import httpx
+
+from tws.base.client import ClientException
+
+# Span names
+RUN_WORKFLOW = "tws.run_workflow"
+UPLOAD_FILE = "tws.upload_file"
+RPC = "tws.rpc"
+POLL = "tws.poll"
+
+# Span attributes
+WORKFLOW_DEFINITION_ID = "tws.workflow_definition_id"
+WORKFLOW_INSTANCE_ID = "tws.workflow_instance_id"
+WORKFLOW_STATUS = "tws.workflow_status"
+RPC_FUNCTION = "tws.rpc.function"
+FILE_SIZE = "tws.file.size"
+FILE_CACHED = "tws.file.cached"
+POLLS = "tws.polls"
+POLL_INSTANCES = "tws.poll.instances"
+BYTES_SENT = "tws.bytes_sent"
+BYTES_RECEIVED = "tws.bytes_received"
+
+MISSING_DEPENDENCY_MESSAGE = (
+    "OpenTelemetry tracing requires the opentelemetry-api package, "
+    "install it with `pip install tws-sdk[tracing]`"
+)
+
+
+class Span:
+    """An operation of a client reported to a `Tracer`.
+
+    The default implementation discards everything, subclasses report the
+    span to a tracing system.
+    """
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Annotate the span with a string, boolean or number."""
+
+    def record_exception(self, error: BaseException) -> None:
+        """Record the exception the operation failed with."""
+
+    def end(self) -> None:
+        """End the span, called once when the operation finishes."""
+
+
+class Tracer:
+    """Receives spans for the work a client does while running workflows.
+
+    Clients report a "tws.run_workflow" span for each `run_workflow` call,
+    with a "tws.upload_file" span for each uploaded file, a "tws.rpc" span for
+    starting the workflow and a "tws.poll" span for each status check. Spans
+    are annotated with the workflow definition and instance IDs, the bytes
+    sent and received, the number of polls and the final workflow status.
+
+    Subclass it and override `start_span` to report spans elsewhere, or use
+    `OpenTelemetryTracer`. The default implementation discards all spans.
+    """
+
+    def start_span(
+        self, name: str, attributes: Dict[str, Any], parent: Optional[Span]
+    ) -> Span:
+        """Start a span for an operation.
+
+        Args:
+            name: The name of the operation
+            attributes: The attributes known when the operation starts
+            parent: The span of the enclosing operation, if any
+
+        Returns:
+            The span, ended when the operation finishes
+        """
+        return Span()
+
+
+class _OpenTelemetrySpan(Span):
+    def __init__(self, span: Any, otel_trace: Any):
+        self.span = span
+        self._otel_trace = otel_trace
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.span.set_attribute(key, value)
+
+    def record_exception(self, error: BaseException) -> None:
+        self.span.record_exception(error)
+        status = self._otel_trace.Status(self._otel_trace.StatusCode.ERROR)
+        self.span.set_status(status)
+
+    def end(self) -> None:
+        self.span.end()
+
+
+class OpenTelemetryTracer(Tracer):
+    """Reports spans to OpenTelemetry.
+
+    Spans without a parent span of the client are children of the current
+    OpenTelemetry span, so runs show up within the traces of the caller.
+    Requires the `opentelemetry-api` package.
+    """
+
+    def __init__(self, tracer: Any = None):
+        """Initialize the tracer.
+
+        Args:
+            tracer: The OpenTelemetry tracer to create spans with, defaults to
+                the "tws" tracer of the global tracer provider
+
+        Raises:
+            ClientException: If the opentelemetry-api package is not installed
+        """
+        try:
+            from opentelemetry import trace as otel_trace
+        except ImportError:
+            raise ClientException(MISSING_DEPENDENCY_MESSAGE)
+        self._trace = otel_trace
+        self._tracer = tracer if tracer is not None else otel_trace.get_tracer("tws")
+
+    def start_span(
+        self, name: str, attributes: Dict[str, Any], parent: Optional[Span]
+    ) -> Span:
+        context = None
+        if isinstance(parent, _OpenTelemetrySpan):
+            context = self._trace.set_span_in_context(parent.span)
+        span = self._tracer.start_span(name, context=context, attributes=attributes)
+        return _OpenTelemetrySpan(span, self._trace)
+
+
+def resolve_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """Validate the tracer of a client.
+
+    Raises:
+        ClientException: If the tracer is not a `Tracer` instance
+    """
+    if tracer is not None and not isinstance(tracer, Tracer):
+        raise ClientException("Tracer must be a Tracer instance")
+    return tracer
+
+
+class _Scope:
+    """A span in progress, collecting the counters of the operations within."""
+
+    def __init__(self, span: Span, parent: Optional["_Scope"]):
+        self.span = span
+        self.parent = parent
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, amount: int) -> None:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def end(self, error: Optional[BaseException]) -> None:
+        with self._lock:
+            counters = dict(self._counters)
+        for key, value in counters.items():
+            self.span.set_attribute(key, value)
+        if error is not None:
+            self.span.record_exception(error)
+        self.span.end()
+
+
+# The innermost span in progress. Tasks inherit it, threads of the client's
+# pools are handed a copy of the context of the thread submitting the work.
+_current: ContextVar[Optional[_Scope]] = ContextVar("tws_span", default=None)
+
+_DISABLED: ContextManager[None] = nullcontext()
+
+
+def trace(
+    tracer: Optional[Tracer], name: str, attributes: Dict[str, Any]
+) -> ContextManager[None]:
+    """Trace the operation within the context as a span.
+
+    Does nothing without a tracer.
+    """
+    if tracer is None:
+        return _DISABLED
+    return _span(tracer, name, attributes)
+
+
+@contextmanager
+def _span(tracer: Tracer, name: str, attributes: Dict[str, Any]) -> Iterator[None]:
+    parent = _current.get()
+    scope = _Scope(
+        tracer.start_span(name, attributes, parent.span if parent else None), parent
+    )
+    token = _current.set(scope)
+    error: Optional[BaseException] = None
+    try:
+        yield
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _current.reset(token)
+        scope.end(error)
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Annotate the innermost span in progress, if any."""
+    scope = _current.get()
+    if scope is not None:
+        scope.span.set_attribute(key, value)
+
+
+def count(key: str, amount: int = 1) -> None:
+    """Add to a counter of the spans in progress, reported when they end."""
+    scope = _current.get()
+    while scope is not None:
+        scope.add(key, amount)
+        scope = scope.parent
+
+
+def count_transfer(response: httpx.Response) -> None:
+    """Count the bytes of a request and its response on the spans in progress."""
+    if _current.get() is None:
+        return
+    sent = int(response.request.headers.get("Content-Length", 0))
+    count(BYTES_SENT, sent)
+    count(BYTES_RECEIVED, len(response.content))
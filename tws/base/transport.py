@@ -0,0 +1,112 @@
+import threading
+from typing import Optional
+
+import httpx
+
+from tws.base.session import SessionOptions, resolve_session_options
+
+
+class _SyncTransportView(httpx.BaseTransport):
+    """Sends a client's requests through a shared transport it does not own."""
+
+    def __init__(self, transport: httpx.HTTPTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        # Closing a client leaves the shared connection pool open
+        pass
+
+
+class _AsyncTransportView(httpx.AsyncBaseTransport):
+    """Sends a client's requests through a shared transport it does not own."""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class SharedTransport:
+    """A connection pool and TLS context shared between clients.
+
+    Creating a client normally builds a new HTTP session, with its own SSL
+    context and connection pool, and its first request to the API pays for a
+    new TLS handshake. Clients created with the same `SharedTransport` send
+    their requests over a single pool instead, so creating a client is nearly
+    free and connections are reused between clients, including clients using
+    different API keys. Each client keeps its own headers and timeouts.
+
+    Closing a client leaves the shared pool open. Close the transport once
+    every client using it is closed. The async pool is bound to the event loop
+    it is first used in, so only share it between clients in the same loop.
+    """
+
+    def __init__(self, session_options: Optional[SessionOptions] = None):
+        """Initialize the transport.
+
+        Args:
+            session_options: Optional `SessionOptions` configuring the
+                connection pool and HTTP/2. The timeouts are taken from the
+                options of each client instead.
+
+        Raises:
+            ClientException: If invalid parameters are provided
+        """
+        self.session_options = resolve_session_options(session_options)
+        self._sync_transport: Optional[httpx.HTTPTransport] = None
+        self._async_transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._lock = threading.Lock()
+
+    def sync_transport(self) -> httpx.BaseTransport:
+        """Return a view of the synchronous pool for a client to send requests."""
+        with self._lock:
+            if self._sync_transport is None:
+                self._sync_transport = httpx.HTTPTransport(
+                    http2=self.session_options.http2,
+                    limits=self.session_options.limits(),
+                )
+            return _SyncTransportView(self._sync_transport)
+
+    def async_transport(self) -> httpx.AsyncBaseTransport:
+        """Return a view of the asynchronous pool for a client to send requests."""
+        with self._lock:
+            if self._async_transport is None:
+                self._async_transport = httpx.AsyncHTTPTransport(
+                    http2=self.session_options.http2,
+                    limits=self.session_options.limits(),
+                )
+            return _AsyncTransportView(self._async_transport)
+
+    def close(self) -> None:
+        """Close the synchronous connection pool."""
+        with self._lock:
+            transport, self._sync_transport = self._sync_transport, None
+        if transport is not None:
+            transport.close()
+
+    async def aclose(self) -> None:
+        """Close both connection pools."""
+        self.close()
+        with self._lock:
+            transport, self._async_transport = self._async_transport, None
+        if transport is not None:
+            await transport.aclose()
+
+    def __enter__(self) -> "SharedTransport":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "SharedTransport":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
@@ -0,0 +1,86 @@
+import os
+from typing import Optional, Union
+
+from tws.base.digests import FileDigests
+from tws.base.store import CacheStore
+
+
+class UploadCache:
+    """Remembers where files with a given content were uploaded to.
+
+    Files are identified by the SHA-256 digest of their contents, together
+    with their name and the user they were uploaded for, so uploading the same
+    document again reuses the storage path of the earlier upload. Digests are
+    reused while a file's size and modification time are unchanged, so
+    unchanged files are not hashed again.
+
+    Entries are kept in an in-memory LRU and optionally in a SQLite database,
+    which lets processes on the same machine share uploads. Entries older than
+    `ttl` are ignored, so files are uploaded again before the storage service
+    may have removed them.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Union[int, float] = 24 * 60 * 60,
+        path: Optional[str] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of uploads kept in memory
+            ttl: Time in seconds after which an upload is no longer reused
+            path: Optional SQLite database file shared between processes
+
+        Raises:
+            ClientException: If invalid parameters are provided or the database
+                at `path` cannot be opened
+        """
+        self._store = CacheStore("upload cache", "uploads", max_entries, ttl, path=path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._digests = FileDigests(max_entries)
+
+    def key(self, file_path: str, namespace: str) -> str:
+        """Compute the cache key of a file.
+
+        Args:
+            file_path: Path to the file
+            namespace: Scope of the key, such as the user the file is uploaded
+                for, as uploads are not shared between users
+
+        Returns:
+            The cache key
+        """
+        digest = self._digests.digest(file_path)
+        return f"{namespace}/{os.path.basename(file_path)}/{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up the storage path of an earlier upload.
+
+        Args:
+            key: The cache key of the file
+
+        Returns:
+            The storage path, or None if the file was not uploaded within the TTL
+        """
+        return self._store.get(key)
+
+    def put(self, key: str, storage_path: str) -> None:
+        """Record the storage path a file was uploaded to.
+
+        Args:
+            key: The cache key of the file
+            storage_path: The path returned by the upload
+        """
+        self._store.put(key, storage_path)
+
+    def clear(self) -> None:
+        """Forget all uploads, including those stored in the database."""
+        self._store.clear()
+        self._digests.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
@@ -0,0 +1,64 @@
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+from tws.base.client import ClientException
+
+
+class UserIdCache:
+    """Shares the user IDs looked up for API keys between clients.
+
+    Clients created with the same cache skip the user ID lookup when another
+    client already looked up the ID for the same API key, which saves a round
+    trip for short-lived clients. Pass the same instance to every client, for
+    example by creating it once at module level.
+
+    API keys are stored as SHA-256 digests rather than in plain text. Entries
+    older than `ttl` are looked up again.
+    """
+
+    def __init__(self, ttl: Union[int, float] = 60 * 60):
+        """Initialize the cache.
+
+        Args:
+            ttl: Time in seconds after which a user ID is looked up again
+
+        Raises:
+            ClientException: If invalid parameters are provided
+        """
+        if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0:
+            raise ClientException("TTL must be a positive number of seconds")
+
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str) -> Optional[str]:
+        """Return the user ID of an API key, or None if it is not known."""
+        digest = self._digest(api_key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] >= self.ttl:
+                del self._entries[digest]
+                return None
+            return entry[0]
+
+    def put(self, api_key: str, user_id: str) -> None:
+        """Record the user ID of an API key."""
+        with self._lock:
+            self._entries[self._digest(api_key)] = (user_id, time.monotonic())
+
+    def clear(self) -> None:
+        """Forget all user IDs."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _digest(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()
@@ -1,7 +1,11 @@
+import hashlib
 import re
 
 BASE64URL_REGEX = r"^([a-z0-9_-]{4})*($|[a-z0-9_-]{3}$|[a-z0-9_-]{2}$)$"
 
+# Size of the chunks files are read in while hashing them
+HASH_CHUNK_SIZE = 1024 * 1024
+
 
 def is_valid_jwt(value: str) -> bool:
     """Checks if value seems to be a JWT without attempting to decode it."""
@@ -20,3 +24,12 @@ def is_valid_jwt(value: str) -> bool:
             return False
 
     return True
+
+
+def file_sha256(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Computes the SHA-256 hex digest of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()